@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步分析任务
+分析任务提交到有界线程池中执行，请求线程立即返回任务 ID，
+客户端轮询任务状态、已完成模型对比例及部分结果；已结束任务的结果按 TTL 保留，且总数有上限
+"""
+
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+from analysis_result import AnalysisResult
+
+# 任务状态
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+
+# 默认并发执行的任务数
+DEFAULT_MAX_WORKERS = 2
+# 默认最多排队等待的任务数
+DEFAULT_MAX_PENDING = 16
+# 已结束任务的默认保留时间（秒）
+DEFAULT_RESULT_TTL = 30 * 60
+# 默认最多保留的已结束任务数（每个任务持有完整的分析结果，超出时先移除最早结束的任务）
+DEFAULT_MAX_FINISHED = 64
+
+
+class AnalysisJob:
+    """
+    单个分析任务的状态、进度与结果
+    """
+
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.state = JOB_QUEUED
+        self.stage: Optional[str] = None
+        self.completed_pairs = 0
+        self.total_pairs = 0
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        # 完成后的分析结果对象，用于导出报告（流式输出，不随状态查询返回）
+        self.analysis: Optional[AnalysisResult] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._partial: Optional[Callable[[], pd.DataFrame]] = None
+        self._lock = threading.Lock()
+
+    def set_stage(self, stage: str) -> None:
+        """
+        更新当前执行阶段（如 加载数据、统计检验）
+
+        Args:
+            stage: 阶段描述
+        """
+        with self._lock:
+            self.stage = stage
+
+    def report_pairs(self, completed: int, total: int,
+                     partial: Optional[Callable[[], pd.DataFrame]] = None) -> None:
+        """
+        更新模型对检验进度，可作为 analyze 的 progress 回调
+
+        Args:
+            completed: 已完成的模型对数
+            total: 模型对总数
+            partial: 返回已完成部分两两对比表的函数（查询时才调用）
+        """
+        with self._lock:
+            self.completed_pairs = completed
+            self.total_pairs = total
+            if partial is not None:
+                self._partial = partial
+
+    @property
+    def finished(self) -> bool:
+        """任务是否已结束（成功或失败）"""
+        return self.state in (JOB_COMPLETED, JOB_FAILED)
+
+    @property
+    def percent(self) -> float:
+        """已完成模型对的百分比"""
+        if self.state == JOB_COMPLETED:
+            return 100.0
+        if self.total_pairs == 0:
+            return 0.0
+        return round(100.0 * self.completed_pairs / self.total_pairs, 1)
+
+    def to_response(self) -> Dict:
+        """
+        转换为 /api/jobs/<id> 的响应格式
+
+        Returns:
+            Dict: 任务状态数据
+        """
+        with self._lock:
+            response = {
+                'jobId': self.id,
+                'state': self.state,
+                'stage': self.stage,
+                'progress': self.percent,
+                'completedPairs': self.completed_pairs,
+                'totalPairs': self.total_pairs
+            }
+            partial = self._partial
+            if self.state == JOB_COMPLETED:
+                response['result'] = self.result
+            elif self.state == JOB_FAILED:
+                response['error'] = self.error
+
+        if self.state == JOB_RUNNING and partial is not None:
+            partial_df = partial()
+            response['partialResults'] = {
+                'pairwiseComparison': partial_df.to_dict('records') if partial_df is not None else []
+            }
+        return response
+
+    def _finish(self, state: str, result: Optional[Dict] = None, error: Optional[str] = None) -> None:
+        """标记任务结束并释放部分结果引用"""
+        with self._lock:
+            # 先记录结束时间，其他线程看到已结束状态时结束时间已就绪
+            self.finished_at = time.time()
+            self.state = state
+            self.result = result
+            self.error = error
+            self._partial = None
+
+
+class JobManager:
+    """
+    有界线程池中的分析任务管理器，线程安全
+    """
+
+    def __init__(self,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 max_pending: int = DEFAULT_MAX_PENDING,
+                 result_ttl: float = DEFAULT_RESULT_TTL,
+                 max_finished: int = DEFAULT_MAX_FINISHED):
+        """
+        初始化任务管理器
+
+        Args:
+            max_workers: 并发执行的任务数
+            max_pending: 最多排队等待的任务数（不含执行中的任务）
+            result_ttl: 已结束任务的保留时间（秒）
+            max_finished: 最多保留的已结束任务数
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis')
+        self._jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, task: Callable[[AnalysisJob], Dict]) -> Optional[AnalysisJob]:
+        """
+        提交分析任务
+
+        Args:
+            task: 任务函数，接收任务对象（用于上报进度），返回结果字典；抛出异常视为失败
+
+        Returns:
+            Optional[AnalysisJob]: 新建的任务，队列已满时返回 None
+        """
+        with self._lock:
+            self._evict_expired()
+            active = sum(1 for job in self._jobs.values() if not job.finished)
+            if active >= self.max_workers + self.max_pending:
+                print(f"⚠️ 分析任务队列已满（{active} 个任务未完成）")
+                return None
+            job = AnalysisJob(uuid.uuid4().hex)
+            self._jobs[job.id] = job
+
+        self._executor.submit(self._run, job, task)
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        """
+        获取任务
+
+        Args:
+            job_id: 任务 ID
+
+        Returns:
+            Optional[AnalysisJob]: 任务对象，不存在或已过期返回 None
+        """
+        with self._lock:
+            self._evict_expired()
+            return self._jobs.get(job_id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭线程池"""
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job: AnalysisJob, task: Callable[[AnalysisJob], Dict]) -> None:
+        """在工作线程中执行任务并记录结果"""
+        job.state = JOB_RUNNING
+        try:
+            result = task(job)
+        except Exception as e:
+            traceback.print_exc()
+            job._finish(JOB_FAILED, error=f'分析失败: {str(e)}')
+        else:
+            job._finish(JOB_COMPLETED, result=result)
+        with self._lock:
+            self._evict_expired()
+
+    def _evict_expired(self) -> None:
+        """移除已超过保留时间的已结束任务，已结束任务超出上限时移除最早结束的任务（调用方需持有锁）"""
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and now - job.finished_at > self.result_ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+        
+        finished = sorted((job for job in self._jobs.values() if job.finished), key=lambda job: job.finished_at)
+        for job in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job.id]
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单次分析结果
+对同一数据集、字段组合、检验类型和显著性水平，所有模型对只检验一次，
+基本统计、两两对比表、基线对比表、最佳模型、显著对数和报告均由此派生
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from model_index import ModelIndex
+from multiple_testing import CORRECTION_COLUMNS, adjust_p_values
+from pairwise_engine import BASELINE_TEST_TYPES, baseline_table, pairwise_table, select_pairs
+
+
+class AnalysisResult:
+    """
+    模型对比分析结果
+    """
+
+    def __init__(self,
+                 score_columns: List[str],
+                 model_names: List[str],
+                 sample_count: int,
+                 stats_df: pd.DataFrame,
+                 idx_a: np.ndarray,
+                 idx_b: np.ndarray,
+                 pair_stats: Optional[Dict[str, np.ndarray]],
+                 test_type: str = 'wilcoxon',
+                 alpha: float = 0.05,
+                 baseline_model: Optional[str] = None,
+                 missing: str = 'listwise',
+                 bootstrap: Optional[Dict] = None,
+                 correction: Optional[str] = None,
+                 correction_scope: str = 'table',
+                 models: Optional[ModelIndex] = None):
+        """
+        初始化分析结果
+
+        Args:
+            score_columns: 分数字段列表
+            model_names: 与分数字段一一对应的模型名称
+            sample_count: 有效样本数
+            stats_df: 基本统计信息
+            idx_a: 全部模型对的第一个列下标
+            idx_b: 全部模型对的第二个列下标
+            pair_stats: 全部模型对的检验结果（run_pair_tests 格式），检验类型不支持时为None
+            test_type: 统计检验类型
+            alpha: 显著性水平
+            baseline_model: 基线模型字段名
+            missing: 缺失值处理方式（'pairwise' 时结果表包含每对的样本数）
+            bootstrap: 均值差异置信区间设置（resamples、method、seed），未计算时为None
+            correction: 多重比较校正方法，指定时结果表增加各方法校正后的 p 值列，并按该方法判断显著性
+            correction_scope: 校正范围，'table' 两两对比与基线对比各自校正；'combined' 合并为一族校正
+                （基线对比的模型对包含在全部模型对中，合并后的检验族即全部模型对）
+            models: 模型元数据索引，为None时由分数字段、模型名称和基线构建
+        """
+        self.score_columns = list(score_columns)
+        self.model_names = list(model_names)
+        self.sample_count = sample_count
+        self.stats_df = stats_df
+        self.idx_a = idx_a
+        self.idx_b = idx_b
+        self.pair_stats = pair_stats
+        self.test_type = test_type
+        self.alpha = alpha
+        self.baseline_model = baseline_model
+        self.missing = missing
+        self.bootstrap = bootstrap
+        self.correction = correction
+        self.correction_scope = correction_scope
+        self.models = models if models is not None else ModelIndex(score_columns, model_names, baseline_model)
+        if correction and pair_stats is not None:
+            # 校正只使用已计算的 p 值，两两对比的检验族为全部模型对
+            self.pair_stats = dict(pair_stats, **adjust_p_values(pair_stats['p_value']))
+
+        self.pairwise_df = self._build_pairwise()
+        self.baseline_df = self._build_baseline()
+
+    def _build_pairwise(self) -> Optional[pd.DataFrame]:
+        """两两对比结果表"""
+        if len(self.score_columns) < 2:
+            return None
+        if self.pair_stats is None:
+            return pd.DataFrame()
+        return pairwise_table(self.model_names, self.idx_a, self.idx_b,
+                              self.pair_stats, self.test_type, self.alpha,
+                              include_n=self.missing == 'pairwise', correction=self.correction)
+
+    def _build_baseline(self) -> Optional[pd.DataFrame]:
+        """基线对比结果表，由两两对比结果按方向换算得到"""
+        if not self.models.has_baseline:
+            return None
+        if self.pair_stats is None or self.test_type not in BASELINE_TEST_TYPES:
+            return pd.DataFrame()
+
+        baseline_idx = self.models.baseline_position
+        want_a = [i for i in range(len(self.score_columns)) if i != baseline_idx]
+        want_b = [baseline_idx] * len(want_a)
+        selected = select_pairs(self.pair_stats, self.idx_a, self.idx_b,
+                                want_a, want_b, self.test_type)
+        if self.correction and self.correction_scope == 'table':
+            # 基线对比单独作为一族，只在基线模型对中校正
+            selected.update(adjust_p_values(selected['p_value']))
+        return baseline_table(self.model_names, self.baseline_model, want_a,
+                              selected, self.test_type, self.alpha,
+                              include_n=self.missing == 'pairwise', correction=self.correction)
+
+    @property
+    def best_model(self) -> Optional[Dict]:
+        """平均得分最高的模型，包含 name 和 meanScore"""
+        if self.stats_df is None or len(self.stats_df) == 0:
+            return None
+        best_model_idx = self.stats_df['均值'].idxmax()
+        return {
+            'name': self.stats_df.loc[best_model_idx, '模型'],
+            'meanScore': float(self.stats_df.loc[best_model_idx, '均值'])
+        }
+
+    @property
+    def significant_pairs(self) -> pd.DataFrame:
+        """存在显著差异的模型对"""
+        if self.pairwise_df is None or len(self.pairwise_df) == 0:
+            return pd.DataFrame()
+        return self.pairwise_df[self.pairwise_df['是否显著'] == True]
+
+    @property
+    def significant_pairs_count(self) -> int:
+        """存在显著差异的模型对数量"""
+        return len(self.significant_pairs)
+
+    def text_report(self) -> str:
+        """
+        生成文本格式的分析报告
+
+        Returns:
+            str: 分析报告
+        """
+        report = []
+        report.append("=" * 60)
+        report.append("模型对比统计分析报告")
+        report.append("=" * 60)
+
+        # 基本信息
+        report.append(f"\n📊 数据概览:")
+        report.append(f"  - 样本数量: {self.sample_count}")
+        report.append(f"  - 模型数量: {len(self.score_columns)}")
+        report.append(f"  - 统计检验: {self.test_type}")
+        report.append(f"  - 显著性水平: α = {self.alpha}")
+        if self.missing == 'pairwise':
+            report.append("  - 缺失值处理: pairwise（每对模型只使用两者均有分数的样本）")
+        if self.bootstrap is not None:
+            report.append(f"  - 均值差异置信区间: {self.bootstrap['method']} bootstrap, "
+                          f"{self.bootstrap['resamples']} 次重采样, 置信水平 {1 - self.alpha:.0%}")
+        if self.correction:
+            scope = '两两对比与基线对比合并校正' if self.correction_scope == 'combined' else '各表分别校正'
+            report.append(f"  - 多重比较校正: {self.correction}（{scope}，按校正后 p 值判断显著性）")
+
+        # 基本统计信息
+        report.append(f"\n📈 基本统计信息:")
+        report.append(self.stats_df.to_string(index=False))
+
+        # 两两对比结果
+        if self.pairwise_df is not None:
+            report.append(f"\n🔍 两两模型对比结果:")
+            report.append(self.pairwise_df.to_string(index=False))
+
+        # 基线对比结果
+        if self.baseline_df is not None:
+            report.append(f"\n🎯 与基线模型 {self.baseline_model} 的对比结果:")
+            report.append(self.baseline_df.to_string(index=False))
+
+        # 总结
+        report.append(f"\n📝 分析总结:")
+        significant_pairs = self.significant_pairs
+        if len(significant_pairs) > 0:
+            report.append(f"  - 发现 {len(significant_pairs)} 对模型之间存在显著差异")
+            adjusted = (significant_pairs[CORRECTION_COLUMNS[self.correction]].tolist() if self.correction
+                        else [None] * len(significant_pairs))
+            for name_a, name_b, p_value, adjusted_p in zip(significant_pairs['模型1'].tolist(),
+                                                           significant_pairs['模型2'].tolist(),
+                                                           significant_pairs['p值'].tolist(), adjusted):
+                line = f"    * {name_a} vs {name_b}: p = {p_value:.4f}"
+                if self.correction:
+                    line += f", 校正后 p = {adjusted_p:.4f}"
+                report.append(line)
+        else:
+            report.append("  - 未发现模型间存在显著差异")
+
+        return "\n".join(report)
+
+    def to_response(self) -> Dict:
+        """
+        转换为 /api/analyze 的响应格式
+
+        Returns:
+            Dict: 响应数据
+        """
+        response = {
+            'dataOverview': {
+                'sampleCount': self.sample_count,
+                'modelCount': len(self.score_columns),
+                'testType': self.test_type,
+                'alpha': self.alpha,
+                'missingPolicy': self.missing
+            },
+            'basicStats': self.stats_df.to_dict('records') if self.stats_df is not None else [],
+            'pairwiseComparison': self.pairwise_df.to_dict('records') if self.pairwise_df is not None else [],
+            'baselineComparison': self.baseline_df.to_dict('records') if self.baseline_df is not None else []
+        }
+
+        if self.bootstrap is not None:
+            response['dataOverview']['bootstrap'] = dict(self.bootstrap, confidence=1 - self.alpha)
+        if self.correction:
+            response['dataOverview']['correction'] = {
+                'method': self.correction,
+                'scope': self.correction_scope,
+                'column': CORRECTION_COLUMNS[self.correction]
+            }
+
+        # 找出最佳模型
+        if self.best_model is not None:
+            response['bestModel'] = self.best_model
+
+        # 统计显著差异数量
+        if self.pairwise_df is not None:
+            response['significantPairsCount'] = self.significant_pairs_count
+
+        return response
+
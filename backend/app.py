@@ -5,10 +5,21 @@ Flask 后端服务
 提供 CSV 数据显著性分析 API 接口
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
 from model_comparison_tool import ModelComparisonTool
-import pandas as pd
+from dataset_cache import DatasetCache
+from analysis_jobs import JOB_COMPLETED, JobManager
+from dataset_registry import DatasetRegistry, DatasetSession
+from pairwise_engine import DEFAULT_N_PERMUTATIONS, DEFAULT_PERMUTATION_TOLERANCE, MISSING_POLICIES, TEST_NAMES
+from bootstrap import BOOTSTRAP_METHODS, DEFAULT_N_RESAMPLES
+from multiple_testing import CORRECTION_METHODS, CORRECTION_SCOPES
+from pair_cache import PairResultCache
+from shared_matrix import SharedMatrixStore
+from chart_data import HISTOGRAM_BINS
+from column_store import remove_column_store
+from upload_ingest import CsvIngest, iter_multipart_file
+from html_report import REPORT_PAGE_ROWS, HtmlReport
 import os
 import tempfile
 import traceback
@@ -31,78 +42,323 @@ UPLOAD_FOLDER = tempfile.gettempdir()
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 1024 * 1024 * 1024  # 最大 1024MB
 
-# 存储当前加载的 CSV 数据
-current_csv_file = None
-current_tool = None
+# 已解析数据集缓存（按上传内容哈希），最多占用 2048MB
+app.config['DATASET_CACHE_BYTES'] = 2048 * 1024 * 1024
+dataset_cache = DatasetCache(max_bytes=app.config['DATASET_CACHE_BYTES'])
+
+# 模型对检验结果缓存：增删模型列后重新分析时只检验新增的模型对
+app.config['PAIR_CACHE_MAX_PAIRS'] = 200000
+pair_cache = PairResultCache(max_pairs=app.config['PAIR_CACHE_MAX_PAIRS'])
+
+# 超过该大小的文件使用流式分块分析，不整表加载到内存
+app.config['STREAMING_THRESHOLD_BYTES'] = 512 * 1024 * 1024
+# 流式分析的内存上限
+app.config['STREAMING_MEMORY_BYTES'] = 256 * 1024 * 1024
+
+# 分析任务在后台线程池中执行：并发数、排队上限、结果保留时间（秒）
+app.config['ANALYSIS_WORKERS'] = 2
+app.config['ANALYSIS_MAX_PENDING'] = 16
+app.config['JOB_RESULT_TTL'] = 30 * 60
+# 最多保留的已结束任务数，超出时先移除最早结束的任务
+app.config['JOB_MAX_FINISHED'] = 64
+# 单个分析任务最多使用的检验进程数（请求中的 workers 不能超过该值）
+app.config['ANALYSIS_MAX_PROCESSES'] = os.cpu_count() or 1
+# 均值差异 bootstrap 置信区间允许的最大重采样次数
+app.config['BOOTSTRAP_MAX_RESAMPLES'] = 10000
+# 置换检验允许的最大符号翻转次数
+app.config['PERMUTATION_MAX_COUNT'] = 100000
+# 图表数据允许的最大直方图分箱数
+app.config['CHART_MAX_BINS'] = 200
+job_manager = JobManager(
+    max_workers=app.config['ANALYSIS_WORKERS'],
+    max_pending=app.config['ANALYSIS_MAX_PENDING'],
+    result_ttl=app.config['JOB_RESULT_TTL'],
+    max_finished=app.config['JOB_MAX_FINISHED']
+)
+
+# 上传数据集注册表：每次上传对应一个数据集 ID，闲置超过 2 小时回收
+# 多进程部署时各进程需共享同一存储目录
+app.config['DATASET_FOLDER'] = os.path.join(UPLOAD_FOLDER, 'significance_datasets')
+app.config['DATASET_IDLE_TTL'] = 2 * 60 * 60
+# 清理后的分数矩阵保存在数据集存储目录下，各工作进程和检验子进程映射同一文件
+app.config['SHARED_MATRICES_PER_DATASET'] = 8
+matrix_store = SharedMatrixStore(app.config['DATASET_FOLDER'],
+                                 max_per_dataset=app.config['SHARED_MATRICES_PER_DATASET'])
+dataset_registry = DatasetRegistry(
+    app.config['DATASET_FOLDER'],
+    cache=dataset_cache,
+    idle_ttl=app.config['DATASET_IDLE_TTL'],
+    pair_cache=pair_cache,
+    matrix_store=matrix_store
+)
+
+
+def dataset_tool(session, workers=None):
+    """
+    为数据集创建分析工具（共享数据集缓存、模型对结果缓存与清理后的分数矩阵），每个请求或任务使用独立实例，
+    使用完毕后调用 close 释放共享矩阵
+    
+    Args:
+        session: 数据集会话
+        workers: 两两检验的工作进程数
+        
+    Returns:
+        ModelComparisonTool: 分析工具
+    """
+    return ModelComparisonTool(session.csv_file_path, cache=dataset_cache,
+                               dataset_key=session.dataset_key, workers=workers,
+                               pair_cache=pair_cache, column_store=session.open_column_store(),
+                               matrix_store=matrix_store, dataset_id=session.id)
+
+
+def get_dataset(data):
+    """
+    按请求中的 datasetId 获取数据集
+    
+    Args:
+        data: 请求 JSON
+        
+    Returns:
+        DatasetSession: 数据集会话，不存在时返回 None
+    """
+    return dataset_registry.get((data or {}).get('datasetId'))
+
+
+def use_streaming(filename):
+    """文件是否超过流式分析阈值"""
+    return os.path.getsize(filename) > app.config['STREAMING_THRESHOLD_BYTES']
 
 
 @app.route('/api/upload', methods=['POST'])
 def upload_file():
-    """上传 CSV 文件并解析列"""
-    global current_csv_file, current_tool
-    
+    """上传 CSV 文件，边接收边解析列信息并写入列式存储，返回数据集 ID"""
+    ingest = None
     try:
-        if 'file' not in request.files:
+        boundary = request.mimetype_params.get('boundary')
+        if request.mimetype != 'multipart/form-data' or not boundary:
             return jsonify({'error': '没有上传文件'}), 400
         
-        file = request.files['file']
-        if file.filename == '':
+        # 直接读取请求流，不等整个请求体缓存完毕
+        parts = iter_multipart_file(request.stream, boundary)
+        upload_name = next(parts, None)
+        if upload_name is None:
+            return jsonify({'error': '没有上传文件'}), 400
+        
+        if upload_name == '':
             return jsonify({'error': '文件名为空'}), 400
         
-        if not file.filename.endswith('.csv'):
+        if not upload_name.endswith('.csv'):
             return jsonify({'error': '只支持 CSV 文件'}), 400
         
-        # 保存文件
-        filename = os.path.join(app.config['UPLOAD_FOLDER'], file.filename)
-        file.save(filename)
-        current_csv_file = filename
+        # 保存文件（按数据集 ID 命名，同名文件不会互相覆盖），同时按块解析：
+        # 列名、行数、数值列和列式存储在接收完毕时即已就绪，不再重新读取文件。
+        # 超过流式分析阈值的大文件不整表加载，也不生成列式存储
+        dataset_id = dataset_registry.new_id()
+        large = (request.content_length is not None
+                 and request.content_length > app.config['STREAMING_THRESHOLD_BYTES'])
+        ingest = CsvIngest(dataset_registry.upload_path(dataset_id),
+                           store_path=None if large else dataset_registry.column_store_path(dataset_id))
+        for data in parts:
+            ingest.feed(data)
+        if not ingest.finish():
+            ingest = None
+            return jsonify({'error': '解析 CSV 文件失败'}), 400
         
-        # 读取 CSV 获取列信息
-        df = pd.read_csv(filename)
-        columns = df.columns.tolist()
+        streaming = use_streaming(ingest.filename)
+        if streaming and ingest.column_store is not None:
+            # 未提供请求体长度时事先无法判断，写完后再删除
+            remove_column_store(ingest.column_store.path)
+            ingest.column_store = None
         
-        # 识别数值列（排除非数值列）
-        numeric_columns = []
-        for col in columns:
-            try:
-                # 尝试转换为数值类型，如果成功则为数值列
-                pd.to_numeric(df[col], errors='coerce')
-                # 检查是否大部分值可以转换为数值（至少50%）
-                numeric_values = pd.to_numeric(df[col], errors='coerce').notna().sum()
-                if numeric_values / len(df) >= 0.5:
-                    numeric_columns.append(col)
-            except:
-                continue
-        
-        # 初始化分析工具
-        current_tool = ModelComparisonTool(filename)
+        dataset_registry.register(DatasetSession(
+            dataset_id, ingest.filename, upload_name, ingest.dataset_key,
+            ingest.columns, ingest.numeric_columns, ingest.row_count, streaming=streaming,
+            column_store=ingest.column_store.path if ingest.column_store is not None else None
+        ))
         
         return jsonify({
             'message': '文件上传成功',
-            'filename': file.filename,
-            'columns': columns,
-            'numeric_columns': numeric_columns,
-            'rowCount': len(df)
+            'datasetId': dataset_id,
+            'filename': upload_name,
+            'columns': ingest.columns,
+            'numeric_columns': ingest.numeric_columns,
+            'rowCount': ingest.row_count
         })
     
     except Exception as e:
+        if ingest is not None:
+            ingest.abort()
         return jsonify({'error': f'上传文件失败: {str(e)}'}), 500
 
 
+def run_analysis(job, session, all_columns, model_names, baseline, test_type, alpha, workers=1,
+                 missing='listwise', bootstrap=None, permutation=None, correction=None,
+                 correction_scope='table'):
+    """
+    在后台线程中执行一次分析任务
+    
+    使用独立的分析工具实例（共享数据集缓存），避免与其他请求修改同一工具的字段设置。
+    
+    Args:
+        job: 分析任务，用于上报阶段和进度
+        session: 数据集会话
+        all_columns: 分数列（baseline 在首位）
+        model_names: 模型名称
+        baseline: 基线列
+        test_type: 统计检验类型
+        alpha: 显著性水平
+        workers: 两两检验的工作进程数（流式模式下不使用）
+        missing: 缺失值处理方式（流式模式下固定为 listwise）
+        bootstrap: 均值差异置信区间设置 {'resamples', 'method', 'seed'}，为None时不计算（流式模式下不使用）
+        permutation: 置换检验设置 {'permutations', 'seed', 'tolerance'}，为None时使用默认设置
+        correction: 多重比较校正方法，为None时不校正
+        correction_scope: 校正范围（'table' 或 'combined'）
+        
+    Returns:
+        dict: /api/analyze 结果
+    """
+    with dataset_registry.use(session):
+        tool = dataset_tool(session, workers=workers)
+        try:
+            if session.streaming:
+                # 大文件：流式分块分析，秩检验使用磁盘缓存
+                job.set_stage('loading')
+                tool.set_score_columns(all_columns, model_names)
+                streaming = tool.streaming_comparison(
+                    max_memory_bytes=app.config['STREAMING_MEMORY_BYTES'],
+                    spill=test_type != 'ttest'
+                )
+                if streaming is None:
+                    raise RuntimeError('加载数据失败')
+                try:
+                    job.set_stage('testing')
+                    result = streaming.analyze(
+                        test_type=test_type, alpha=alpha, baseline_model=baseline,
+                        progress=job.report_pairs, correction=correction,
+                        correction_scope=correction_scope,
+                        n_permutations=permutation['permutations'] if permutation else DEFAULT_N_PERMUTATIONS,
+                        permutation_seed=permutation['seed'] if permutation else None,
+                        tolerance=permutation['tolerance'] if permutation else DEFAULT_PERMUTATION_TOLERANCE
+                    )
+                finally:
+                    streaming.close()
+            else:
+                # 加载数据（缓存未命中时只解析所需的分数列，同一数据集的解析串行执行）
+                job.set_stage('loading')
+                with session.load_lock:
+                    df = tool.load_data(usecols=all_columns)
+                if df is None:
+                    raise RuntimeError('加载数据失败')
+                
+                tool.set_score_columns(all_columns, model_names)
+                
+                # 清理数据
+                score_df = tool.clean_score_data(missing=missing)
+                if score_df is None:
+                    raise RuntimeError('数据清理失败')
+                
+                # 基本统计、两两对比与基线对比（每对模型只检验一次）
+                job.set_stage('testing')
+                result = tool.analyze(
+                    score_df,
+                    test_type=test_type,
+                    alpha=alpha,
+                    baseline_model=baseline,
+                    progress=job.report_pairs,
+                    n_bootstrap=bootstrap['resamples'] if bootstrap else 0,
+                    ci_method=bootstrap['method'] if bootstrap else 'percentile',
+                    seed=bootstrap['seed'] if bootstrap else None,
+                    n_permutations=permutation['permutations'] if permutation else DEFAULT_N_PERMUTATIONS,
+                    permutation_seed=permutation['seed'] if permutation else None,
+                    tolerance=permutation['tolerance'] if permutation else DEFAULT_PERMUTATION_TOLERANCE,
+                    correction=correction,
+                    correction_scope=correction_scope
+                )
+        finally:
+            # 释放共享分数矩阵的引用
+            tool.close()
+    
+    job.analysis = result
+    return result.to_response()
+
+
+def parse_bootstrap(options):
+    """
+    校验请求中的 bootstrap 置信区间设置
+    
+    Args:
+        options: {'resamples': 重采样次数, 'method': 'percentile' 或 'bca', 'seed': 随机种子}
+        
+    Returns:
+        tuple: (规范化后的设置, 错误信息)，resamples 为 0 时设置为 None
+    """
+    if not isinstance(options, dict):
+        return None, 'bootstrap 必须为对象'
+    
+    resamples = options.get('resamples', DEFAULT_N_RESAMPLES)
+    method = options.get('method', 'percentile')
+    seed = options.get('seed')
+    max_resamples = app.config['BOOTSTRAP_MAX_RESAMPLES']
+    
+    if not isinstance(resamples, int) or isinstance(resamples, bool) or not 0 <= resamples <= max_resamples:
+        return None, f'bootstrap.resamples 必须为 0 到 {max_resamples} 之间的整数'
+    if method not in BOOTSTRAP_METHODS:
+        return None, f"bootstrap.method 必须为 {' 或 '.join(BOOTSTRAP_METHODS)}"
+    if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or seed < 0):
+        return None, 'bootstrap.seed 必须为非负整数'
+    
+    if resamples == 0:
+        return None, None
+    return {'resamples': resamples, 'method': method, 'seed': seed}, None
+
+
+def parse_permutation(options):
+    """
+    校验请求中的置换检验设置
+    
+    Args:
+        options: {'permutations': 符号翻转次数, 'seed': 随机种子, 'tolerance': 提前停止容差}
+        
+    Returns:
+        tuple: (规范化后的设置, 错误信息)
+    """
+    if not isinstance(options, dict):
+        return None, 'permutation 必须为对象'
+    
+    permutations = options.get('permutations', DEFAULT_N_PERMUTATIONS)
+    seed = options.get('seed')
+    tolerance = options.get('tolerance', DEFAULT_PERMUTATION_TOLERANCE)
+    max_count = app.config['PERMUTATION_MAX_COUNT']
+    
+    if not isinstance(permutations, int) or isinstance(permutations, bool) or not 1 <= permutations <= max_count:
+        return None, f'permutation.permutations 必须为 1 到 {max_count} 之间的整数'
+    if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or seed < 0):
+        return None, 'permutation.seed 必须为非负整数'
+    if not isinstance(tolerance, (int, float)) or isinstance(tolerance, bool) or not 0 <= tolerance < 1:
+        return None, 'permutation.tolerance 必须为 [0, 1) 之间的数值'
+    
+    return {'permutations': permutations, 'seed': seed, 'tolerance': float(tolerance)}, None
+
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze():
-    """执行显著性分析"""
-    global current_csv_file, current_tool
-    
+    """提交显著性分析任务，返回任务 ID（通过 /api/jobs/<id> 查询进度和结果）"""
     try:
-        if not current_csv_file or not current_tool:
+        data = request.json
+        session = get_dataset(data)
+        if session is None:
             return jsonify({'error': '请先上传 CSV 文件'}), 400
         
-        data = request.json
         baseline = data.get('baseline')
         data_columns = data.get('dataColumns', [])
         test_type = data.get('testType', 'wilcoxon')
         alpha = data.get('alpha', 0.05)
+        workers = data.get('workers', 1)
+        missing = data.get('missing', 'listwise')
+        bootstrap = data.get('bootstrap')
+        permutation = data.get('permutation')
+        correction = data.get('correction')
+        correction_scope = data.get('correctionScope', 'table')
         
         if not baseline:
             return jsonify({'error': '请选择 Baseline 列'}), 400
@@ -110,103 +366,186 @@ def analyze():
         if not data_columns or len(data_columns) == 0:
             return jsonify({'error': '请至少选择一个数据列'}), 400
         
-        # 加载数据
-        df = current_tool.load_data()
-        if df is None:
-            return jsonify({'error': '加载数据失败'}), 500
+        if test_type not in TEST_NAMES:
+            return jsonify({'error': f"testType 必须为 {'、'.join(TEST_NAMES)} 之一"}), 400
+        if not isinstance(alpha, (int, float)) or isinstance(alpha, bool) or not 0 < alpha < 1:
+            return jsonify({'error': 'alpha 必须为 (0, 1) 之间的数值'}), 400
+        if not isinstance(workers, int) or isinstance(workers, bool) or workers < 0:
+            return jsonify({'error': 'workers 必须为非负整数'}), 400
+        if missing not in MISSING_POLICIES:
+            return jsonify({'error': f"missing 必须为 {' 或 '.join(MISSING_POLICIES)}"}), 400
+        if correction is not None and correction not in CORRECTION_METHODS:
+            return jsonify({'error': f"correction 必须为 {'、'.join(CORRECTION_METHODS)} 之一"}), 400
+        if correction_scope not in CORRECTION_SCOPES:
+            return jsonify({'error': f"correctionScope 必须为 {' 或 '.join(CORRECTION_SCOPES)}"}), 400
+        
+        if bootstrap is not None:
+            bootstrap, error = parse_bootstrap(bootstrap)
+            if error:
+                return jsonify({'error': error}), 400
+        
+        if permutation is not None:
+            permutation, error = parse_permutation(permutation)
+            if error:
+                return jsonify({'error': error}), 400
+        
+        # 0 表示使用允许的最大进程数
+        max_processes = app.config['ANALYSIS_MAX_PROCESSES']
+        workers = min(workers, max_processes) if workers > 0 else max_processes
         
         # 设置分数列（包含 baseline 和其他数据列）
         all_columns = [baseline] + [col for col in data_columns if col != baseline]
-        model_names = all_columns.copy()
-        current_tool.set_score_columns(all_columns, model_names)
         
-        # 清理数据
-        score_df = current_tool.clean_score_data()
-        if score_df is None:
-            return jsonify({'error': '数据清理失败'}), 500
-        
-        # 计算基本统计信息
-        stats_df = current_tool.calculate_basic_stats(score_df)
+        model_names = all_columns.copy()
         
-        # 进行两两对比
-        pairwise_results = current_tool.pairwise_comparison(
-            score_df, 
-            test_type=test_type, 
-            alpha=alpha
+        job = job_manager.submit(
+            lambda job: run_analysis(job, session, all_columns, model_names,
+                                     baseline, test_type, alpha, workers, missing, bootstrap,
+                                     permutation, correction, correction_scope)
         )
+        if job is None:
+            return jsonify({'error': '分析任务过多，请稍后重试'}), 503
         
-        # 与基线模型对比
-        baseline_results = None
-        if baseline in all_columns:
-            baseline_results = current_tool.baseline_comparison(
-                score_df,
-                baseline,
-                test_type=test_type,
-                alpha=alpha
-            )
-        
-        # 构建响应
-        response = {
-            'dataOverview': {
-                'sampleCount': len(score_df),
-                'modelCount': len(all_columns),
-                'testType': test_type,
-                'alpha': alpha
-            },
-            'basicStats': stats_df.to_dict('records') if stats_df is not None else [],
-            'pairwiseComparison': pairwise_results.to_dict('records') if pairwise_results is not None else [],
-            'baselineComparison': baseline_results.to_dict('records') if baseline_results is not None else []
-        }
+        return jsonify({'jobId': job.id, 'state': job.state}), 202
+    
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': f'分析失败: {str(e)}'}), 500
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """查询分析任务状态、进度、部分结果及最终结果"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在或已过期'}), 404
+    return jsonify(job.to_response())
+
+
+@app.route('/api/jobs/<job_id>/report', methods=['GET'])
+def get_job_report(job_id):
+    """以流式响应导出已完成分析任务的 HTML 报告，表格超过 pageRows 行时其余行按页折叠"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在或已过期'}), 404
+    if job.state != JOB_COMPLETED or job.analysis is None:
+        return jsonify({'error': '任务尚未完成'}), 409
+    
+    page_rows = request.args.get('pageRows', REPORT_PAGE_ROWS, type=int)
+    if page_rows < 1:
+        return jsonify({'error': 'pageRows 必须为正整数'}), 400
+    
+    report = HtmlReport(job.analysis, page_rows=page_rows)
+    return Response(report.iter_html(), mimetype='text/html',
+                    headers={'Content-Disposition': f'attachment; filename=analysis_report_{job_id}.html'})
+
+
+@app.route('/api/charts', methods=['POST'])
+def chart_data():
+    """
+    返回前端绘图所需的汇总数据（箱线图五数概括、直方图频次、均值、相关系数矩阵），
+    由已缓存的分数列直接计算，不生成图片
+    """
+    try:
+        data = request.json
+        session = get_dataset(data)
+        if session is None:
+            return jsonify({'error': '请先上传 CSV 文件'}), 400
+        if session.streaming:
+            return jsonify({'error': '大文件使用流式分析，暂不支持图表数据'}), 400
+        
+        baseline = data.get('baseline')
+        data_columns = data.get('dataColumns', [])
+        missing = data.get('missing', 'listwise')
+        bins = data.get('bins', HISTOGRAM_BINS)
         
-        # 找出最佳模型
-        if stats_df is not None and len(stats_df) > 0:
-            best_model_idx = stats_df['均值'].idxmax()
-            response['bestModel'] = {
-                'name': stats_df.loc[best_model_idx, '模型'],
-                'meanScore': float(stats_df.loc[best_model_idx, '均值'])
-            }
+        if not data_columns and not baseline:
+            return jsonify({'error': '请至少选择一个数据列'}), 400
+        if missing not in MISSING_POLICIES:
+            return jsonify({'error': f"missing 必须为 {' 或 '.join(MISSING_POLICIES)}"}), 400
+        max_bins = app.config['CHART_MAX_BINS']
+        if not isinstance(bins, int) or isinstance(bins, bool) or not 1 <= bins <= max_bins:
+            return jsonify({'error': f'bins 必须为 1 到 {max_bins} 之间的整数'}), 400
         
-        # 统计显著差异数量
-        if pairwise_results is not None:
-            significant_count = len(pairwise_results[pairwise_results['是否显著'] == True])
-            response['significantPairsCount'] = significant_count
+        # 列顺序与 /api/analyze 一致（baseline 在首位）
+        all_columns = ([baseline] if baseline else []) + [col for col in data_columns if col != baseline]
         
-        return jsonify(response)
+        with dataset_registry.use(session):
+            tool = dataset_tool(session)
+            try:
+                with session.load_lock:
+                    df = tool.load_data(usecols=all_columns)
+                if df is None:
+                    return jsonify({'error': '加载数据失败'}), 400
+                tool.set_score_columns(all_columns, all_columns)
+                score_df = tool.clean_score_data(missing=missing)
+                if score_df is None:
+                    return jsonify({'error': '数据清理失败'}), 400
+                return jsonify(tool.chart_data(score_df, bins=bins))
+            finally:
+                tool.close()
     
     except Exception as e:
         traceback.print_exc()
-        return jsonify({'error': f'分析失败: {str(e)}'}), 500
+        return jsonify({'error': f'生成图表数据失败: {str(e)}'}), 500
 
 
 @app.route('/api/detect-columns', methods=['POST'])
 def detect_columns():
     """自动检测分数列"""
-    global current_tool
-    
     try:
-        if not current_tool:
+        data = request.json
+        session = get_dataset(data)
+        if session is None:
             return jsonify({'error': '请先上传 CSV 文件'}), 400
         
-        data = request.json
         pattern = data.get('pattern', '_score')
         
-        # 加载数据
-        df = current_tool.load_data()
-        if df is None:
-            return jsonify({'error': '加载数据失败'}), 500
-        
-        # 自动检测分数列
-        score_columns = current_tool.detect_score_columns(pattern=pattern)
+        # 自动检测分数列（只需表头，不加载数据）
+        with dataset_registry.use(session):
+            tool = dataset_tool(session)
+            score_columns = tool.detect_score_columns(pattern=pattern)
         
         return jsonify({
             'scoreColumns': score_columns,
-            'modelNames': current_tool.model_names
+            'modelNames': tool.model_names
         })
     
     except Exception as e:
         return jsonify({'error': f'检测列失败: {str(e)}'}), 500
 
 
+@app.route('/api/datasets/<dataset_id>', methods=['GET'])
+def get_dataset_info(dataset_id):
+    """查询数据集信息、内存占用、列式存储的磁盘占用及上传时统计的数值列概况"""
+    session = dataset_registry.get(dataset_id)
+    if session is None:
+        return jsonify({'error': '数据集不存在或已过期'}), 404
+    store = session.open_column_store()
+    return jsonify({
+        'datasetId': session.id,
+        'filename': session.filename,
+        'columns': session.columns,
+        'numeric_columns': session.numeric_columns,
+        'rowCount': session.row_count,
+        'streaming': session.streaming,
+        'residentBytes': dataset_registry.resident_bytes(session),
+        'columnStoreBytes': store.nbytes if store is not None else 0,
+        'columnStats': store.stats if store is not None else {}
+    })
+
+
+@app.route('/api/datasets/<dataset_id>', methods=['DELETE'])
+def delete_dataset(dataset_id):
+    """释放数据集（删除上传文件和缓存）"""
+    session = dataset_registry.get(dataset_id)
+    if session is None:
+        return jsonify({'error': '数据集不存在或已过期'}), 404
+    if not dataset_registry.remove(dataset_id):
+        return jsonify({'error': '数据集正在分析中，请稍后重试'}), 409
+    return jsonify({'message': '数据集已释放'})
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """健康检查"""
@@ -221,8 +560,12 @@ def index():
         'version': '1.0.0',
         'endpoints': {
             '/api/upload': 'POST - 上传 CSV 文件',
-            '/api/analyze': 'POST - 执行显著性分析',
+            '/api/analyze': 'POST - 提交显著性分析任务',
+            '/api/jobs/<id>': 'GET - 查询分析任务进度与结果',
+            '/api/jobs/<id>/report': 'GET - 导出分析任务的 HTML 报告（流式响应）',
+            '/api/charts': 'POST - 获取绘图所需的汇总数据',
             '/api/detect-columns': 'POST - 自动检测分数列',
+            '/api/datasets/<id>': 'GET - 查询数据集信息 / DELETE - 释放数据集',
             '/health': 'GET - 健康检查'
         }
     })
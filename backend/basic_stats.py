@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量基本统计
+在分数矩阵上按列块一次性计算样本数、均值、标准差、最小/最大值、中位数和四分位数：
+每列只排序一次，分位数与最值都从排序结果中取得，均值和方差各一次整块归约。
+结果与 pandas 逐列 dropna 后调用 mean/std/median/min/max/quantile 一致；
+含缺失值的列的均值和标准差因求和分组不同，可能有舍入误差级别的差异
+"""
+
+from typing import Dict
+
+import numpy as np
+
+from pairwise_engine import DEFAULT_BLOCK_BYTES, as_score_array
+
+# 排序副本、有效值掩码与离差数组，按单列数据的 3 倍估算块内存
+_BLOCK_COPIES = 3
+
+
+def quantile_sorted(sorted_block: np.ndarray, count: np.ndarray, q) -> np.ndarray:
+    """
+    从按列排序（缺失值在末尾）的矩阵中取线性插值分位数，与 numpy/pandas 的 'linear' 方法一致
+
+    Args:
+        sorted_block: 按列排序后的矩阵
+        count: 每列有效值个数
+        q: 分位点 (0-1)，可为与列数等长的数组（每列使用不同分位点）
+
+    Returns:
+        np.ndarray: 每列的分位数，无有效值的列为 NaN
+    """
+    columns = np.arange(sorted_block.shape[1])
+    last = np.maximum(count - 1, 0)
+    position = q * last
+    lower = np.floor(position).astype(np.intp)
+    upper = np.minimum(lower + 1, last)
+    gamma = position - lower
+    a = sorted_block[lower, columns]
+    b = sorted_block[upper, columns]
+    diff = b - a
+    # 与 numpy 的 _lerp 相同：gamma >= 0.5 时从上端点插值，保证单调性和端点精确
+    value = np.where(gamma >= 0.5, b - diff * (1 - gamma), a + diff * gamma)
+    return np.where(count > 0, value, np.nan)
+
+
+def column_statistics(matrix: np.ndarray, block_bytes: int = DEFAULT_BLOCK_BYTES) -> Dict[str, np.ndarray]:
+    """
+    计算分数矩阵每一列的基本统计量（忽略缺失值）
+
+    Args:
+        matrix: 形状为 (行数, 模型数) 的分数矩阵（float32 时按块转换为 float64 计算），缺失值为 NaN
+        block_bytes: 单个列块的近似内存上限
+
+    Returns:
+        Dict[str, np.ndarray]: 包含 count、mean、std、median、min、max、q25、q75 的数组字典
+    """
+    matrix = as_score_array(matrix)
+    n_rows, n_cols = matrix.shape
+    result = {key: np.full(n_cols, np.nan) for key in ('mean', 'std', 'median', 'min', 'max', 'q25', 'q75')}
+    result['count'] = np.zeros(n_cols, dtype=np.int64)
+    if n_rows == 0:
+        return result
+
+    width = max(1, int(block_bytes // max(1, n_rows * 8 * _BLOCK_COPIES)))
+    for start in range(0, n_cols, width):
+        sl = slice(start, min(start + width, n_cols))
+        block = matrix[:, sl].astype(np.float64, copy=False)
+
+        valid = ~np.isnan(block)
+        count = valid.sum(axis=0)
+        complete = bool((count == n_rows).all())
+
+        # 均值与方差：与 pandas nanmean/nanvar 相同的两遍算法，缺失值按 0 计入求和
+        values = block if complete else np.where(valid, block, 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = values.sum(axis=0) / count
+            deviation = mean - block
+            if not complete:
+                deviation = np.where(valid, deviation, 0.0)
+            variance = (deviation * deviation).sum(axis=0) / (count - 1)
+        result['count'][sl] = count
+        result['mean'][sl] = np.where(count > 0, mean, np.nan)
+        result['std'][sl] = np.where(count > 1, np.sqrt(variance), np.nan)
+
+        # 每列排序一次（缺失值排在末尾），最值与分位数均由排序结果取得
+        sorted_block = np.sort(block, axis=0)
+        columns = np.arange(sorted_block.shape[1])
+        result['min'][sl] = np.where(count > 0, sorted_block[0], np.nan)
+        result['max'][sl] = np.where(count > 0, sorted_block[np.maximum(count - 1, 0), columns], np.nan)
+        result['q25'][sl] = quantile_sorted(sorted_block, count, 0.25)
+        result['q75'][sl] = quantile_sorted(sorted_block, count, 0.75)
+
+        # 中位数：与 numpy median 相同，偶数个时取中间两个值的平均
+        lower = np.maximum(count - 1, 0) // 2
+        upper = np.maximum(count, 1) // 2
+        median = (sorted_block[lower, columns] + sorted_block[upper, columns]) / 2
+        result['median'][sl] = np.where(count > 0, median, np.nan)
+
+    return result
@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分析流程性能基准
+生成不同行数、模型数和缺失率的合成评测分数 CSV，分别计时各分析阶段及
+Flask 上传+分析的端到端耗时，记录各阶段内存峰值；另在新的解释器中测量
+后端入口和检验子进程模块的冷启动导入耗时与常驻内存。结果写入 JSON，
+并可与保存的基线结果对比，超过回归阈值时以非零状态退出
+
+使用方法：
+    python benchmark.py                                  # 快速网格
+    python benchmark.py --grid full --output bench.json  # 完整网格（1e3-1e7 行，2-200 个模型）
+    python benchmark.py --rows 100000 --models 50 --missing 0.1
+    python benchmark.py --compare benchmark_baseline.json --threshold 0.2
+    python benchmark.py --rows 1000 --models 2 --startup-repeat 5   # 冷启动测量多次取最短
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from bootstrap import bootstrap_mean_diff
+from model_comparison_tool import ModelComparisonTool
+from pairwise_engine import all_pairs
+from quick_analysis import generate_html_report
+
+# 快速网格：几分钟内完成，适合日常回归检查
+QUICK_GRID = {
+    'rows': [1_000, 10_000, 100_000],
+    'models': [2, 10, 50],
+    'missing': [0.0, 0.05],
+}
+# 完整网格
+FULL_GRID = {
+    'rows': [1_000, 10_000, 100_000, 1_000_000, 10_000_000],
+    'models': [2, 10, 50, 200],
+    'missing': [0.0, 0.05, 0.2],
+}
+# 跳过分数单元格数（行数 × 模型数）超过该值的组合
+DEFAULT_MAX_CELLS = 200_000_000
+# 只对不超过该行数的数据集运行 HTML 报告和 Flask 端到端阶段
+DEFAULT_END_TO_END_MAX_ROWS = 1_000_000
+# 生成 CSV 时每次写入的行数
+WRITE_CHUNK_ROWS = 100_000
+# 对比基线时忽略绝对差异小于该值（秒）的计时，避免噪声误报
+DEFAULT_MIN_DELTA = 0.01
+# Flask 任务轮询间隔（秒）
+JOB_POLL_INTERVAL = 0.005
+# bootstrap 置信区间阶段的默认重采样次数
+DEFAULT_BOOTSTRAP_RESAMPLES = 1000
+# 冷启动测量的模块：Flask 后端入口，以及 spawn 启动的检验子进程加载的模块
+STARTUP_MODULES = ['app', 'parallel_pairs']
+# 冷启动测量的默认次数（取最短耗时）
+DEFAULT_STARTUP_REPEAT = 3
+
+# 在新的解释器中导入模块，输出导入耗时、进程最大常驻内存及是否加载了绘图库
+_STARTUP_SCRIPT = """
+import importlib, json, sys, time
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+seconds = time.perf_counter() - start
+try:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss = rss if sys.platform == 'darwin' else rss * 1024
+except ImportError:
+    rss = None
+print(json.dumps({'seconds': seconds, 'rss_bytes': rss,
+                  'plotting_loaded': 'matplotlib' in sys.modules or 'seaborn' in sys.modules}))
+"""
+
+
+def score_columns(n_models: int) -> List[str]:
+    """合成数据集的分数字段名，第一个为基线"""
+    return [f"model_{i:03d}_score" for i in range(n_models)]
+
+
+def generate_csv(path: str, n_rows: int, n_models: int, missing_rate: float, seed: int = 0) -> str:
+    """
+    生成合成评测分数 CSV
+
+    每行是一条评测样本，分数 = 样本难度 + 模型水平 + 噪声（0-10 分，保留两位小数），
+    同一行各模型分数相关，与真实评测数据的配对结构一致；另含一个文本字段。
+
+    Args:
+        path: 输出路径
+        n_rows: 行数
+        n_models: 模型数
+        missing_rate: 每个分数单元格为空的概率
+        seed: 随机种子
+
+    Returns:
+        str: 输出路径
+    """
+    rng = np.random.default_rng(seed)
+    columns = score_columns(n_models)
+    skill = np.linspace(0.0, 0.5, n_models)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for start in range(0, n_rows, WRITE_CHUNK_ROWS):
+            size = min(WRITE_CHUNK_ROWS, n_rows - start)
+            difficulty = rng.normal(6.0, 1.5, size=(size, 1))
+            scores = np.clip(difficulty + skill + rng.normal(0.0, 1.0, size=(size, n_models)), 0.0, 10.0)
+            scores = np.round(scores, 2)
+            if missing_rate > 0:
+                scores[rng.random(scores.shape) < missing_rate] = np.nan
+            chunk = pd.DataFrame(scores, columns=columns)
+            chunk.insert(0, 'query', [f"q{i}" for i in range(start, start + size)])
+            chunk.to_csv(f, index=False, header=start == 0)
+    return path
+
+
+def dataset_path(data_dir: str, n_rows: int, n_models: int, missing_rate: float) -> str:
+    """合成数据集路径，同一参数组合的文件可在多次运行间复用"""
+    name = f"bench_r{n_rows}_m{n_models}_p{missing_rate:g}.csv"
+    path = os.path.join(data_dir, name)
+    if not os.path.exists(path):
+        generate_csv(path + '.tmp', n_rows, n_models, missing_rate)
+        os.replace(path + '.tmp', path)
+    return path
+
+
+class StageTimer:
+    """
+    逐阶段计时并记录内存峰值
+
+    每个阶段先不开启内存跟踪执行 repeat 次取最短耗时，再在 tracemalloc 下执行一次记录峰值。
+    """
+
+    def __init__(self, repeat: int = 1, measure_memory: bool = True, verbose: bool = False):
+        self.repeat = max(1, repeat)
+        self.measure_memory = measure_memory
+        self.verbose = verbose
+
+    def run(self, fn: Callable[[], object]) -> Tuple[object, float, Optional[int]]:
+        """
+        执行一个阶段
+
+        Args:
+            fn: 阶段函数（需可重复执行）
+
+        Returns:
+            Tuple[object, float, Optional[int]]: (最后一次的返回值, 最短耗时（秒）, 内存峰值（字节）)
+        """
+        best = float('inf')
+        value = None
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            value = self._quiet(fn)
+            best = min(best, time.perf_counter() - start)
+
+        peak = None
+        if self.measure_memory:
+            tracemalloc.start()
+            try:
+                value = self._quiet(fn)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        return value, best, peak
+
+    def _quiet(self, fn: Callable[[], object]) -> object:
+        """执行阶段函数，非 verbose 模式下屏蔽工具的进度输出"""
+        if self.verbose:
+            return fn()
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+
+
+def measure_startup(module: str, repeat: int = DEFAULT_STARTUP_REPEAT) -> Dict:
+    """
+    测量模块的冷启动开销：每次在新的 Python 解释器中导入模块
+
+    Args:
+        module: 模块名（相对于本目录）
+        repeat: 测量次数，耗时与常驻内存均取最小值
+
+    Returns:
+        Dict: 与分析阶段格式相同的结果记录（stage 为 startup:模块名，peak_bytes 为进程最大常驻内存）
+    """
+    samples = []
+    for _ in range(max(1, repeat)):
+        output = subprocess.run([sys.executable, '-c', _STARTUP_SCRIPT, module],
+                                cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    rss = [sample['rss_bytes'] for sample in samples if sample['rss_bytes'] is not None]
+    return {
+        'rows': 0,
+        'models': 0,
+        'missing_rate': 0.0,
+        'test_type': '-',
+        'stage': f"startup:{module}",
+        'seconds': min(sample['seconds'] for sample in samples),
+        'peak_bytes': min(rss) if rss else None,
+        'plotting_loaded': samples[-1]['plotting_loaded'],
+    }
+
+
+def run_flask_analysis(client, dataset_id: str, columns: List[str], test_type: str) -> Dict:
+    """通过 Flask 测试客户端提交分析任务并轮询至完成"""
+    response = client.post('/api/analyze', json={
+        'datasetId': dataset_id,
+        'baseline': columns[0],
+        'dataColumns': columns[1:],
+        'testType': test_type,
+        'alpha': 0.05
+    })
+    if response.status_code != 202:
+        raise RuntimeError(f"提交分析失败: {response.status_code} {response.get_json()}")
+    job_id = response.get_json()['jobId']
+    while True:
+        job = client.get(f'/api/jobs/{job_id}').get_json()
+        if job['state'] == 'completed':
+            return job['result']
+        if job['state'] == 'failed':
+            raise RuntimeError(job.get('error'))
+        time.sleep(JOB_POLL_INTERVAL)
+
+
+def benchmark_dataset(path: str, n_rows: int, n_models: int, missing_rate: float,
+                      test_type: str, timer: StageTimer,
+                      end_to_end: bool, flask_client=None,
+                      bootstrap_resamples: int = DEFAULT_BOOTSTRAP_RESAMPLES) -> List[Dict]:
+    """
+    对一个合成数据集计时全部阶段
+
+    Args:
+        path: CSV 路径
+        n_rows: 行数
+        n_models: 模型数
+        missing_rate: 缺失率
+        test_type: 统计检验类型
+        timer: 阶段计时器
+        end_to_end: 是否运行 HTML 报告和 Flask 端到端阶段
+        flask_client: Flask 测试客户端，为 None 时跳过 Flask 阶段
+        bootstrap_resamples: bootstrap 置信区间阶段的重采样次数，0 表示跳过（随端到端阶段一起运行）
+
+    Returns:
+        List[Dict]: 各阶段结果记录
+    """
+    columns = score_columns(n_models)
+    baseline = columns[0]
+    tool = ModelComparisonTool(path)
+    records = []
+
+    def record(stage: str, fn: Callable[[], object]):
+        value, seconds, peak = timer.run(fn)
+        records.append({
+            'rows': n_rows,
+            'models': n_models,
+            'missing_rate': missing_rate,
+            'test_type': test_type,
+            'stage': stage,
+            'seconds': seconds,
+            'peak_bytes': peak,
+        })
+        print(f"  {stage:<24} {seconds:10.4f}s" + (f" {peak / 1024 / 1024:10.1f}MB" if peak is not None else ""))
+        return value
+
+    record('load_data', tool.load_data)
+    record('detect_numeric_columns', tool.detect_numeric_columns)
+    record('load_data_usecols', lambda: tool.load_data(usecols=columns))
+    timer._quiet(lambda: tool.set_score_columns(columns, columns))
+    score_df = record('clean_score_data', tool.clean_score_data)
+    record('calculate_basic_stats', lambda: tool.calculate_basic_stats(score_df))
+    record('pairwise_comparison', lambda: tool.pairwise_comparison(score_df, test_type))
+    record('baseline_comparison', lambda: tool.baseline_comparison(score_df, baseline, test_type))
+    result = record('analyze', lambda: tool.analyze(score_df, test_type, 0.05, baseline))
+
+    if end_to_end and bootstrap_resamples > 0:
+        idx_a, idx_b = all_pairs(n_models)
+        record('bootstrap_ci', lambda: bootstrap_mean_diff(tool.score_matrix, idx_a, idx_b,
+                                                           n_resamples=bootstrap_resamples, seed=0))
+
+    if end_to_end:
+        record('generate_html_report', lambda: generate_html_report(
+            result.stats_df, score_df, tool, baseline, test_type, 0.05, result=result))
+
+        if flask_client is not None:
+            dataset_ids = []
+
+            def upload():
+                with open(path, 'rb') as f:
+                    response = flask_client.post('/api/upload', data={'file': (f, os.path.basename(path))},
+                                                 content_type='multipart/form-data')
+                if response.status_code != 200:
+                    raise RuntimeError(f"上传失败: {response.status_code} {response.get_json()}")
+                dataset_ids.append(response.get_json()['datasetId'])
+                return dataset_ids[-1]
+
+            dataset_id = record('flask_upload', upload)
+            record('flask_analyze', lambda: run_flask_analysis(flask_client, dataset_id, columns, test_type))
+            record('flask_end_to_end', lambda: run_flask_analysis(flask_client, upload(), columns, test_type))
+
+            # 释放本次上传的数据集（文件和缓存）
+            for uploaded_id in dataset_ids:
+                flask_client.delete(f'/api/datasets/{uploaded_id}')
+
+    return records
+
+
+def run_benchmarks(grid: Dict[str, List], test_types: List[str], data_dir: str,
+                   timer: StageTimer, max_cells: int, end_to_end_max_rows: int,
+                   flask: bool, bootstrap_resamples: int = DEFAULT_BOOTSTRAP_RESAMPLES,
+                   startup_repeat: int = DEFAULT_STARTUP_REPEAT) -> Dict:
+    """
+    运行整个网格（startup_repeat 大于 0 时先测量冷启动）
+
+    Returns:
+        Dict: 包含 meta 和 results 的基准结果
+    """
+    results = []
+    skipped = []
+    # 冷启动需在本进程导入 app 之前、于独立解释器中测量
+    for module in STARTUP_MODULES if startup_repeat > 0 else []:
+        record = measure_startup(module, startup_repeat)
+        results.append(record)
+        line = f"🚀 冷启动 {module:<18} {record['seconds']:10.4f}s"
+        if record['peak_bytes'] is not None:
+            line += f" {record['peak_bytes'] / 1024 / 1024:10.1f}MB"
+        print(line + ("（已加载绘图库）" if record['plotting_loaded'] else ""))
+
+    flask_client = None
+    if flask:
+        import app as flask_app
+        flask_client = flask_app.app.test_client()
+        # Flask 阶段测量完整分析，不复用之前阶段缓存的模型对结果
+        flask_app.pair_cache.max_pairs = 0
+    for n_rows in grid['rows']:
+        for n_models in grid['models']:
+            for missing_rate in grid['missing']:
+                if n_rows * n_models > max_cells:
+                    skipped.append({'rows': n_rows, 'models': n_models, 'missing_rate': missing_rate})
+                    print(f"⏭️  跳过 {n_rows} 行 × {n_models} 模型（超过 --max-cells）")
+                    continue
+                path = dataset_path(data_dir, n_rows, n_models, missing_rate)
+                for test_type in test_types:
+                    print(f"⏱️  {n_rows} 行 × {n_models} 模型，缺失率 {missing_rate:g}，{test_type}")
+                    results.extend(benchmark_dataset(
+                        path, n_rows, n_models, missing_rate, test_type, timer,
+                        end_to_end=n_rows <= end_to_end_max_rows, flask_client=flask_client,
+                        bootstrap_resamples=bootstrap_resamples
+                    ))
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': timer.repeat,
+            'grid': grid,
+            'test_types': test_types,
+            'bootstrap_resamples': bootstrap_resamples,
+            'startup_repeat': startup_repeat,
+            'skipped': skipped,
+        },
+        'results': results,
+    }
+
+
+def result_key(record: Dict) -> Tuple:
+    """用于与基线结果匹配的键"""
+    return (record['rows'], record['models'], record['missing_rate'], record['test_type'], record['stage'])
+
+
+def compare_results(current: Dict, baseline: Dict, threshold: float,
+                    min_delta: float = DEFAULT_MIN_DELTA) -> List[Dict]:
+    """
+    与基线结果对比
+
+    耗时超过基线 (1 + threshold) 倍且绝对差异超过 min_delta 秒，或内存峰值超过基线
+    (1 + threshold) 倍时视为回归。
+
+    Args:
+        current: 本次结果
+        baseline: 基线结果
+        threshold: 回归阈值（相对比例）
+        min_delta: 计时的最小绝对差异（秒）
+
+    Returns:
+        List[Dict]: 回归记录
+    """
+    baseline_records = {result_key(r): r for r in baseline['results']}
+    regressions = []
+    for record in current['results']:
+        base = baseline_records.get(result_key(record))
+        if base is None:
+            continue
+        slower = (record['seconds'] > base['seconds'] * (1 + threshold)
+                  and record['seconds'] - base['seconds'] > min_delta)
+        bigger = (record.get('peak_bytes') is not None and base.get('peak_bytes')
+                  and record['peak_bytes'] > base['peak_bytes'] * (1 + threshold))
+        if slower or bigger:
+            regressions.append({
+                'key': result_key(record),
+                'seconds': record['seconds'],
+                'baseline_seconds': base['seconds'],
+                'peak_bytes': record.get('peak_bytes'),
+                'baseline_peak_bytes': base.get('peak_bytes'),
+            })
+    return regressions
+
+
+def parse_list(value: str, cast: Callable) -> List:
+    """解析逗号分隔的参数列表，支持 1e5 形式的整数"""
+    return [cast(float(item)) if cast is int else cast(item) for item in value.split(',') if item]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    主函数
+
+    Returns:
+        int: 进程退出码（存在回归时为 1）
+    """
+    parser = argparse.ArgumentParser(description='模型对比分析流程性能基准')
+    parser.add_argument('--grid', choices=['quick', 'full'], default='quick', help='预设参数网格')
+    parser.add_argument('--rows', help='逗号分隔的行数列表，覆盖预设网格')
+    parser.add_argument('--models', help='逗号分隔的模型数列表，覆盖预设网格')
+    parser.add_argument('--missing', help='逗号分隔的缺失率列表，覆盖预设网格')
+    parser.add_argument('--test-types', default='wilcoxon', help='逗号分隔的检验类型')
+    parser.add_argument('--repeat', type=int, default=1, help='每个阶段计时次数（取最短）')
+    parser.add_argument('--no-memory', action='store_true', help='不记录内存峰值')
+    parser.add_argument('--no-flask', action='store_true', help='跳过 Flask 端到端阶段')
+    parser.add_argument('--max-cells', type=float, default=DEFAULT_MAX_CELLS,
+                        help='跳过行数×模型数超过该值的组合')
+    parser.add_argument('--end-to-end-max-rows', type=float, default=DEFAULT_END_TO_END_MAX_ROWS,
+                        help='超过该行数时跳过 HTML 报告和 Flask 阶段')
+    parser.add_argument('--bootstrap-resamples', type=int, default=DEFAULT_BOOTSTRAP_RESAMPLES,
+                        help='bootstrap 置信区间阶段的重采样次数（0 表示跳过）')
+    parser.add_argument('--startup-repeat', type=int, default=DEFAULT_STARTUP_REPEAT,
+                        help='冷启动测量次数（0 表示跳过）')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'significance_benchmark'),
+                        help='合成数据集目录（可在多次运行间复用）')
+    parser.add_argument('--output', default='benchmark_results.json', help='结果输出路径')
+    parser.add_argument('--compare', help='基线结果 JSON 路径')
+    parser.add_argument('--threshold', type=float, default=0.2, help='回归阈值（相对比例）')
+    parser.add_argument('--min-delta', type=float, default=DEFAULT_MIN_DELTA, help='忽略的最小计时差异（秒）')
+    parser.add_argument('--verbose', action='store_true', help='显示分析工具的输出')
+    args = parser.parse_args(argv)
+
+    grid = dict(FULL_GRID if args.grid == 'full' else QUICK_GRID)
+    if args.rows:
+        grid['rows'] = parse_list(args.rows, int)
+    if args.models:
+        grid['models'] = parse_list(args.models, int)
+    if args.missing:
+        grid['missing'] = parse_list(args.missing, float)
+    if min(grid['models']) < 2:
+        parser.error('模型数至少为 2')
+    os.makedirs(args.data_dir, exist_ok=True)
+
+    timer = StageTimer(repeat=args.repeat, measure_memory=not args.no_memory, verbose=args.verbose)
+    results = run_benchmarks(grid, parse_list(args.test_types, str), args.data_dir, timer,
+                             int(args.max_cells), int(args.end_to_end_max_rows), flask=not args.no_flask,
+                             bootstrap_resamples=args.bootstrap_resamples,
+                             startup_repeat=args.startup_repeat)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"💾 基准结果已保存到: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print(f"❌ 发现 {len(regressions)} 项性能回归（阈值 {args.threshold:.0%}）:")
+            for reg in regressions:
+                rows, models, missing_rate, test_type, stage = reg['key']
+                line = (f"  - {rows} 行 × {models} 模型, 缺失率 {missing_rate:g}, {test_type}, {stage}: "
+                        f"{reg['baseline_seconds']:.4f}s -> {reg['seconds']:.4f}s")
+                if reg['peak_bytes'] is not None and reg['baseline_peak_bytes']:
+                    line += (f", 内存 {reg['baseline_peak_bytes'] / 1024 / 1024:.1f}MB"
+                             f" -> {reg['peak_bytes'] / 1024 / 1024:.1f}MB")
+                print(line)
+            return 1
+        print(f"✅ 未发现超过 {args.threshold:.0%} 的性能回归")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
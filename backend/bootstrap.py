@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量 bootstrap 置信区间
+按行重采样一次生成重采样计数矩阵，所有模型对共用同一批重采样：
+重采样均值由计数矩阵与分数矩阵的矩阵乘积得到，不逐对、逐次重采样。
+重采样分批生成，内存占用与重采样次数无关；同一随机种子的结果可复现
+"""
+
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import special
+
+from basic_stats import quantile_sorted
+from pairwise_engine import DEFAULT_BLOCK_BYTES, as_score_array
+
+# 置信区间方法：percentile 百分位法；bca 偏差校正加速法
+BOOTSTRAP_METHODS = ('percentile', 'bca')
+# 默认重采样次数
+DEFAULT_N_RESAMPLES = 2000
+
+# BCa 偏差校正中判定重采样估计与原估计相等的相对容差
+_TIE_TOLERANCE = 1e-9
+
+# 下标矩阵、计数矩阵及其 float64 副本，按每个重采样行 3 份估算批内存
+_BATCH_COPIES = 3
+
+
+def _resample_counts(seed_seq: np.random.SeedSequence,
+                     n_resamples: int,
+                     n_rows: int,
+                     batch: int) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    分批生成重采样计数矩阵：第 r 行第 i 列为第 r 次重采样中第 i 行被抽中的次数
+
+    每次调用都从同一种子重新开始，因此多次遍历得到完全相同的重采样
+
+    Args:
+        seed_seq: 随机种子序列
+        n_resamples: 重采样次数
+        n_rows: 数据行数
+        batch: 每批的重采样次数
+
+    Returns:
+        Iterator[Tuple[int, np.ndarray]]: (本批起始序号, 形状为 (本批次数, 行数) 的 float64 计数矩阵)
+    """
+    rng = np.random.Generator(np.random.PCG64(seed_seq))
+    for start in range(0, n_resamples, batch):
+        size = min(batch, n_resamples - start)
+        indices = rng.integers(0, n_rows, size=(size, n_rows))
+        indices += np.arange(size)[:, None] * n_rows
+        counts = np.bincount(indices.ravel(), minlength=size * n_rows)
+        yield start, counts.reshape(size, n_rows).astype(np.float64)
+
+
+def _resampled_column_means(matrix: np.ndarray,
+                            cols: np.ndarray,
+                            seed_seq: np.random.SeedSequence,
+                            n_resamples: int,
+                            batch: int,
+                            block_bytes: int) -> np.ndarray:
+    """
+    无缺失值的列在每次重采样下的均值，形状为 (重采样次数, 模型数)，未计算的列为 NaN
+    """
+    n_rows = matrix.shape[0]
+    means = np.full((n_resamples, matrix.shape[1]), np.nan)
+    width = max(1, int(block_bytes // max(1, n_rows * 8)))
+    for col_start in range(0, len(cols), width):
+        block_cols = cols[col_start:col_start + width]
+        columns = matrix[:, block_cols].astype(np.float64, copy=False)
+        for start, counts in _resample_counts(seed_seq, n_resamples, n_rows, batch):
+            means[start:start + len(counts), block_cols] = counts @ columns / n_rows
+    return means
+
+
+def _resampled_pair_means(diff: np.ndarray,
+                          valid: np.ndarray,
+                          seed_seq: np.random.SeedSequence,
+                          n_resamples: int,
+                          batch: int) -> np.ndarray:
+    """
+    存在缺失值时每次重采样下各模型对的均值差异（只计入两列均有效的行），
+    形状为 (重采样次数, 模型对数)；重采样未抽中任何有效行时为 NaN
+    """
+    n_rows = diff.shape[0]
+    weights = valid.astype(np.float64)
+    means = np.empty((n_resamples, diff.shape[1]))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for start, counts in _resample_counts(seed_seq, n_resamples, n_rows, batch):
+            means[start:start + len(counts)] = (counts @ diff) / (counts @ weights)
+    return means
+
+
+def _bca_levels(resampled: np.ndarray,
+                theta: np.ndarray,
+                diff: np.ndarray,
+                valid: np.ndarray,
+                n: np.ndarray,
+                count: np.ndarray,
+                alpha: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    BCa 法调整后的上下分位点，偏差校正与加速常数的计算方式与 scipy.stats.bootstrap 一致
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (下限分位点, 上限分位点)
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # 偏差校正：重采样估计低于原估计的比例（相等计一半）；离散分数的重采样均值常与原估计
+        # 精确相等，按差异量级留出舍入容差，避免求和顺序不同的舍入误差改变计数
+        tolerance = _TIE_TOLERANCE * np.abs(diff).max(axis=0)
+        below = ((resampled < theta - tolerance).sum(axis=0)
+                 + (resampled <= theta + tolerance).sum(axis=0))
+        z0 = special.ndtri(below / (2.0 * count))
+
+        # 加速常数：逐行刀切的均值差异有闭式解，无效行的刀切值等于原估计
+        jackknife = np.where(valid, (n * theta - diff) / (n - 1), theta)
+        deviation = jackknife.mean(axis=0) - jackknife
+        num = (deviation ** 3).sum(axis=0)
+        den = 6.0 * (deviation ** 2).sum(axis=0) ** 1.5
+        acceleration = np.where(den > 0, num / den, 0.0)
+
+        levels = []
+        for z_alpha in (special.ndtri(alpha), special.ndtri(1 - alpha)):
+            shifted = z0 + z_alpha
+            levels.append(special.ndtr(z0 + shifted / (1 - acceleration * shifted)))
+    return levels[0], levels[1]
+
+
+def bootstrap_mean_diff(matrix: np.ndarray,
+                        idx_a: Sequence[int],
+                        idx_b: Sequence[int],
+                        n_resamples: int = DEFAULT_N_RESAMPLES,
+                        confidence: float = 0.95,
+                        method: str = 'percentile',
+                        seed: Optional[int] = None,
+                        block_bytes: int = DEFAULT_BLOCK_BYTES) -> Dict[str, np.ndarray]:
+    """
+    计算每个模型对均值差异（模型a - 模型b）的 bootstrap 置信区间
+
+    按行配对重采样，所有模型对共用同一批重采样。两列均无缺失值的模型对，
+    每批重采样只做一次计数矩阵与分数矩阵的乘积，重采样差异由列均值相减得到；
+    涉及含缺失值列的模型对只计入两列均有效的行（与 run_pair_tests 相同），
+    按模型对分块与计数矩阵相乘。
+
+    Args:
+        matrix: 形状为 (行数, 模型数) 的分数矩阵，缺失值为 NaN
+        idx_a: 每对第一个模型的列下标
+        idx_b: 每对第二个模型的列下标
+        n_resamples: 重采样次数
+        confidence: 置信水平
+        method: 置信区间方法 ('percentile', 'bca')
+        seed: 随机种子，为None时每次调用结果不同
+        block_bytes: 单个计算块的近似内存上限
+
+    Returns:
+        Dict[str, np.ndarray]: 包含 ci_low、ci_high 的数组字典，无法计算的模型对为 NaN
+    """
+    if method not in BOOTSTRAP_METHODS:
+        raise ValueError(f"不支持的置信区间方法: {method}")
+
+    matrix = as_score_array(matrix)
+    idx_a = np.asarray(idx_a, dtype=np.intp)
+    idx_b = np.asarray(idx_b, dtype=np.intp)
+    n_rows = matrix.shape[0]
+    n_pairs = len(idx_a)
+    result = {'ci_low': np.full(n_pairs, np.nan), 'ci_high': np.full(n_pairs, np.nan)}
+    if n_pairs == 0 or n_rows == 0 or n_resamples <= 0:
+        return result
+
+    # 同一种子序列可重复生成相同的重采样，供各计算块共用
+    seed_seq = np.random.SeedSequence(seed)
+    batch = max(1, int(block_bytes // max(1, n_rows * 8 * _BATCH_COPIES)))
+    used = np.unique(np.concatenate([idx_a, idx_b]))
+    complete_cols = np.zeros(matrix.shape[1], dtype=bool)
+    complete_cols[used] = [not np.isnan(matrix[:, j]).any() for j in used]
+    pair_complete = complete_cols[idx_a] & complete_cols[idx_b]
+    column_means = None
+    if pair_complete.any():
+        column_means = _resampled_column_means(matrix, np.flatnonzero(complete_cols), seed_seq,
+                                               n_resamples, batch, block_bytes)
+
+    alpha = (1 - confidence) / 2
+    # 重采样结果及其排序副本，加上 a、b、差异、掩码和刀切值各一份
+    width = max(1, int(block_bytes // max(1, 8 * (2 * n_resamples + 6 * n_rows))))
+    # 无缺失值与含缺失值的模型对分别分块，只有后者需要逐块重新生成重采样
+    for pairs in (np.flatnonzero(pair_complete), np.flatnonzero(~pair_complete)):
+        for start in range(0, len(pairs), width):
+            _interval_block(matrix, idx_a, idx_b, pairs[start:start + width], column_means,
+                            seed_seq, n_resamples, batch, alpha, method, result)
+
+    return result
+
+
+def _interval_block(matrix: np.ndarray,
+                    idx_a: np.ndarray,
+                    idx_b: np.ndarray,
+                    pairs: np.ndarray,
+                    column_means: Optional[np.ndarray],
+                    seed_seq: np.random.SeedSequence,
+                    n_resamples: int,
+                    batch: int,
+                    alpha: float,
+                    method: str,
+                    result: Dict[str, np.ndarray]) -> None:
+    """计算一块模型对的置信区间并写入 result"""
+    a = matrix[:, idx_a[pairs]].astype(np.float64, copy=False)
+    b = matrix[:, idx_b[pairs]].astype(np.float64, copy=False)
+    valid = ~(np.isnan(a) | np.isnan(b))
+    diff = np.where(valid, a - b, 0.0)
+    del a, b
+    n = valid.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        theta = diff.sum(axis=0) / n
+
+    if valid.all():
+        resampled = column_means[:, idx_a[pairs]] - column_means[:, idx_b[pairs]]
+    else:
+        resampled = _resampled_pair_means(diff, valid, seed_seq, n_resamples, batch)
+    count = (~np.isnan(resampled)).sum(axis=0)
+
+    if method == 'bca':
+        q_low, q_high = _bca_levels(resampled, theta, diff, valid, n, count, alpha)
+    else:
+        q_low = np.full(len(theta), alpha)
+        q_high = np.full(len(theta), 1 - alpha)
+
+    # 排序后缺失值在末尾，分位数只取前 count 个有效重采样
+    resampled.sort(axis=0)
+    computable = (count > 0) & ~np.isnan(q_low) & ~np.isnan(q_high)
+    low = quantile_sorted(resampled, count, np.nan_to_num(q_low))
+    high = quantile_sorted(resampled, count, np.nan_to_num(q_high))
+    result['ci_low'][pairs] = np.where(computable, low, np.nan)
+    result['ci_high'][pairs] = np.where(computable, high, np.nan)
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图表数据预计算
+在分数矩阵上用 NumPy 一次性计算各类图表所需的汇总数据：箱线图五数概括与须线、
+统一分箱的直方图频次、均值和相关系数矩阵。绘图只使用这些汇总数据，不再逐列处理原始分数。
+本模块不依赖 matplotlib
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from basic_stats import column_statistics
+from dataset_cache import new_content_hash
+from pairwise_engine import DEFAULT_BLOCK_BYTES, as_score_array
+
+# 直方图分箱数（所有模型共用同一组分箱边界）
+HISTOGRAM_BINS = 20
+# 图表数据 JSON 中分数统计量保留的有效数字位数
+PAYLOAD_SIGNIFICANT_DIGITS = 6
+# 相关系数保留的小数位数
+CORRELATION_DECIMALS = 4
+# 箱线图须线长度（四分位距的倍数），与 matplotlib/pandas 默认值一致
+WHISKER_IQR = 1.5
+# 方差不超过平方和的该比例时视为常数（只剩舍入误差），相关系数为 NaN，与 pandas 一致
+VARIANCE_RTOL = 1e-12
+
+# 单列数据及其掩码、下标等临时数组，按单列数据的 3 倍估算块内存
+_BLOCK_COPIES = 3
+
+
+def _column_blocks(n_rows: int, n_cols: int, block_bytes: int):
+    """按内存上限把列划分为若干块"""
+    width = max(1, int(block_bytes // max(1, n_rows * 8 * _BLOCK_COPIES)))
+    for start in range(0, n_cols, width):
+        yield slice(start, min(start + width, n_cols))
+
+
+def _row_blocks(n_rows: int, n_cols: int, block_bytes: int):
+    """按内存上限把行划分为若干块"""
+    height = max(1, int(block_bytes // max(1, n_cols * 8 * _BLOCK_COPIES)))
+    for start in range(0, n_rows, height):
+        yield slice(start, min(start + height, n_rows))
+
+
+def box_statistics(matrix: np.ndarray,
+                   stats: Dict[str, np.ndarray],
+                   block_bytes: int = DEFAULT_BLOCK_BYTES) -> Dict[str, np.ndarray]:
+    """
+    计算每列箱线图的须线端点与离群值个数，规则与 matplotlib.cbook.boxplot_stats 一致：
+    须线延伸到距四分位数 1.5 倍四分位距以内的最远数据点
+
+    Args:
+        matrix: 形状为 (行数, 模型数) 的分数矩阵，缺失值为 NaN
+        stats: column_statistics 的结果（使用其中的 q25、q75）
+        block_bytes: 单个列块的近似内存上限
+
+    Returns:
+        Dict[str, np.ndarray]: 包含 whisker_low、whisker_high、outliers 的数组字典
+    """
+    matrix = as_score_array(matrix)
+    n_rows, n_cols = matrix.shape
+    iqr = stats['q75'] - stats['q25']
+    low_fence = stats['q25'] - WHISKER_IQR * iqr
+    high_fence = stats['q75'] + WHISKER_IQR * iqr
+    result = {'whisker_low': np.full(n_cols, np.nan), 'whisker_high': np.full(n_cols, np.nan),
+              'outliers': np.zeros(n_cols, dtype=np.int64)}
+
+    for sl in _column_blocks(n_rows, n_cols, block_bytes):
+        block = matrix[:, sl].astype(np.float64, copy=False)
+        # NaN 与任何值比较均为 False，缺失值不会落入须线范围
+        low = np.where(block >= low_fence[sl], block, np.inf).min(axis=0, initial=np.inf)
+        high = np.where(block <= high_fence[sl], block, -np.inf).max(axis=0, initial=-np.inf)
+        # 范围内没有数据点或须线端点越过四分位数时，须线收缩到四分位数
+        low = np.where(np.isinf(low) | (low > stats['q25'][sl]), stats['q25'][sl], low)
+        high = np.where(np.isinf(high) | (high < stats['q75'][sl]), stats['q75'][sl], high)
+        result['whisker_low'][sl] = low
+        result['whisker_high'][sl] = high
+        result['outliers'][sl] = ((block < low) | (block > high)).sum(axis=0)
+    return result
+
+
+def outlier_values(matrix: np.ndarray, whisker_low: np.ndarray, whisker_high: np.ndarray) -> List[np.ndarray]:
+    """
+    每列须线以外的离群值（去重后），供绘制箱线图离群点使用
+
+    离散分数常有大量重复的离群值，去重后绘制结果不变而标记数大幅减少
+
+    Args:
+        matrix: 分数矩阵
+        whisker_low: 每列须线下端
+        whisker_high: 每列须线上端
+
+    Returns:
+        List[np.ndarray]: 每列的离群值数组
+    """
+    matrix = as_score_array(matrix)
+    outliers = []
+    for j in range(matrix.shape[1]):
+        column = matrix[:, j]
+        outliers.append(np.unique(column[(column < whisker_low[j]) | (column > whisker_high[j])]
+                                  .astype(np.float64)))
+    return outliers
+
+
+def histogram_edges(stats: Dict[str, np.ndarray], bins: int = HISTOGRAM_BINS) -> np.ndarray:
+    """
+    所有模型共用的直方图分箱边界：覆盖全部有效分数，与 np.histogram 对该范围的等宽分箱一致
+
+    Args:
+        stats: column_statistics 的结果（使用其中的 min、max）
+        bins: 分箱数
+
+    Returns:
+        np.ndarray: 长度为 bins + 1 的分箱边界
+    """
+    present = stats['count'] > 0
+    if not present.any():
+        return np.linspace(0.0, 1.0, bins + 1)
+    lo = float(stats['min'][present].min())
+    hi = float(stats['max'][present].max())
+    if lo == hi:
+        lo, hi = lo - 0.5, hi + 0.5
+    return np.linspace(lo, hi, bins + 1)
+
+
+def histogram_counts(matrix: np.ndarray,
+                     edges: np.ndarray,
+                     block_bytes: int = DEFAULT_BLOCK_BYTES) -> np.ndarray:
+    """
+    按统一分箱边界计算每列的直方图频次，结果与逐列调用 np.histogram(列, edges) 一致
+
+    Args:
+        matrix: 形状为 (行数, 模型数) 的分数矩阵，缺失值为 NaN
+        edges: 等宽分箱边界（histogram_edges 的结果）
+        block_bytes: 单个列块的近似内存上限
+
+    Returns:
+        np.ndarray: 形状为 (模型数, 分箱数) 的 int64 频次矩阵
+    """
+    matrix = as_score_array(matrix)
+    n_rows, n_cols = matrix.shape
+    bins = len(edges) - 1
+    first, last = edges[0], edges[-1]
+    norm = bins / (last - first)
+    counts = np.zeros((n_cols, bins), dtype=np.int64)
+
+    for sl in _column_blocks(n_rows, n_cols, block_bytes):
+        block = matrix[:, sl].astype(np.float64, copy=False)
+        keep = (block >= first) & (block <= last)
+        values = block[keep]
+        columns = np.nonzero(keep)[1]
+        # 与 np.histogram 的等宽分箱相同：先按比例定位，再用边界比较修正舍入误差
+        indices = ((values - first) * norm).astype(np.intp)
+        indices[indices == bins] -= 1
+        indices[values < edges[indices]] -= 1
+        indices[(values >= edges[indices + 1]) & (indices != bins - 1)] += 1
+        width = sl.stop - sl.start
+        counts[sl] = np.bincount(columns * bins + indices, minlength=width * bins).reshape(width, bins)
+    return counts
+
+
+def correlation_matrix(matrix: np.ndarray,
+                       stats: Optional[Dict[str, np.ndarray]] = None,
+                       block_bytes: int = DEFAULT_BLOCK_BYTES) -> np.ndarray:
+    """
+    Pearson 相关系数矩阵，与 pandas DataFrame.corr() 一致：每对只使用两列均有效的行
+
+    按行分块累加矩阵乘积：无缺失值时为中心化后的叉积矩阵；
+    含缺失值时用有效值掩码的矩阵乘积同时得到每对的样本数、和与平方和
+
+    Args:
+        matrix: 形状为 (行数, 模型数) 的分数矩阵，缺失值为 NaN
+        stats: column_statistics 的结果（使用其中的 count、mean），为None时重新计算
+        block_bytes: 单个行块的近似内存上限
+
+    Returns:
+        np.ndarray: 形状为 (模型数, 模型数) 的相关系数矩阵，有效样本不足或方差为 0 的对为 NaN
+    """
+    matrix = as_score_array(matrix)
+    n_rows, n_cols = matrix.shape
+    if stats is None:
+        stats = column_statistics(matrix, block_bytes=block_bytes)
+    # 先减去各列均值，含缺失值时按和与平方和计算也不会出现严重的相消误差
+    center = np.nan_to_num(stats['mean'])
+    complete = bool((stats['count'] == n_rows).all())
+
+    products = np.zeros((n_cols, n_cols))
+    if complete:
+        for sl in _row_blocks(n_rows, n_cols, block_bytes):
+            block = matrix[sl].astype(np.float64) - center
+            products += block.T @ block
+        variance = np.diag(products)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = products / np.sqrt(np.outer(variance, variance))
+        n = np.full((n_cols, n_cols), n_rows)
+        # 列均值不精确时常数列中心化后仍有微小残差，按未中心化的平方和判断
+        constant = variance <= VARIANCE_RTOL * (variance + n_rows * center * center)
+        degenerate = constant[:, None] | constant[None, :]
+    else:
+        n = np.zeros((n_cols, n_cols))
+        sums = np.zeros((n_cols, n_cols))
+        squares = np.zeros((n_cols, n_cols))
+        for sl in _row_blocks(n_rows, n_cols, block_bytes):
+            block = matrix[sl].astype(np.float64) - center
+            valid = ~np.isnan(block)
+            weights = valid.astype(np.float64)
+            block[~valid] = 0.0
+            n += weights.T @ weights
+            # sums[i, j]：第 i 列在两列均有效的行上的和
+            sums += block.T @ weights
+            squares += (block * block).T @ weights
+            products += block.T @ block
+        with np.errstate(invalid='ignore', divide='ignore'):
+            covariance = products - sums * sums.T / n
+            variance_a = squares - sums * sums / n
+            corr = covariance / np.sqrt(variance_a * variance_a.T)
+        # 两列共同有效的行上为常数时，相减只剩舍入误差，不能据此计算相关系数
+        constant = variance_a <= VARIANCE_RTOL * squares
+        degenerate = constant | constant.T
+
+    corr = np.where((n >= 2) & ~degenerate, np.clip(corr, -1.0, 1.0), np.nan)
+    diagonal = np.diag_indices(n_cols)
+    corr[diagonal] = np.where(np.isnan(corr[diagonal]), np.nan, 1.0)
+    return corr
+
+
+def chart_data(matrix: np.ndarray,
+               bins: int = HISTOGRAM_BINS,
+               block_bytes: int = DEFAULT_BLOCK_BYTES) -> Dict[str, np.ndarray]:
+    """
+    一次性计算四类图表所需的全部汇总数据
+
+    Args:
+        matrix: 形状为 (行数, 模型数) 的分数矩阵，缺失值为 NaN
+        bins: 直方图分箱数
+        block_bytes: 单个计算块的近似内存上限
+
+    Returns:
+        Dict[str, np.ndarray]: 包含 count、mean、min、q25、median、q75、max、whisker_low、
+        whisker_high、outliers、bin_edges、histogram（模型数 x 分箱数）、correlation（模型数 x 模型数）
+    """
+    matrix = as_score_array(matrix)
+    stats = column_statistics(matrix, block_bytes=block_bytes)
+    data = {key: stats[key] for key in ('count', 'mean', 'min', 'q25', 'median', 'q75', 'max')}
+    data.update(box_statistics(matrix, stats, block_bytes=block_bytes))
+    data['bin_edges'] = histogram_edges(stats, bins)
+    data['histogram'] = histogram_counts(matrix, data['bin_edges'], block_bytes=block_bytes)
+    data['correlation'] = correlation_matrix(matrix, stats, block_bytes=block_bytes)
+    return data
+
+
+def chart_digest(matrix: np.ndarray, names: Sequence[str], block_bytes: int = DEFAULT_BLOCK_BYTES) -> str:
+    """
+    分析数据哈希：由分数矩阵内容与模型名称决定，作为渲染结果的缓存键
+
+    Args:
+        matrix: 分数矩阵
+        names: 各列对应的模型名称
+        block_bytes: 单个列块的近似内存上限
+
+    Returns:
+        str: 十六进制哈希值
+    """
+    matrix = np.asarray(matrix)
+    digest = new_content_hash()
+    digest.update(f'{matrix.dtype.str}|{matrix.shape}|'.encode())
+    digest.update('\x1f'.join(names).encode('utf-8'))
+    for sl in _column_blocks(matrix.shape[0], matrix.shape[1], block_bytes):
+        digest.update(np.ascontiguousarray(matrix[:, sl]))
+    return digest.hexdigest()
+
+
+def _compact(values: np.ndarray, spec: str) -> List:
+    """将数组转换为 JSON 列表：按格式说明截短浮点数，NaN 转为 None"""
+    return [None if np.isnan(value) else float(format(value, spec)) for value in np.asarray(values, dtype=np.float64)]
+
+
+def chart_payload(data: Dict[str, np.ndarray], names: Sequence[str], sample_count: Optional[int] = None) -> Dict:
+    """
+    转换为 /api/charts 的响应格式：各列表按模型顺序排列，统计量截短到 6 位有效数字，
+    相关系数保留 4 位小数，缺失值为 null
+
+    Args:
+        data: chart_data 的结果
+        names: 各列对应的模型名称
+        sample_count: 数据行数
+
+    Returns:
+        Dict: 响应数据
+    """
+    stat = f'.{PAYLOAD_SIGNIFICANT_DIGITS}g'
+    corr = f'.{CORRELATION_DECIMALS}f'
+    return {
+        'models': list(names),
+        'sampleCount': sample_count,
+        'count': data['count'].tolist(),
+        'mean': _compact(data['mean'], stat),
+        'box': {
+            'min': _compact(data['min'], stat),
+            'q1': _compact(data['q25'], stat),
+            'median': _compact(data['median'], stat),
+            'q3': _compact(data['q75'], stat),
+            'max': _compact(data['max'], stat),
+            'whiskerLow': _compact(data['whisker_low'], stat),
+            'whiskerHigh': _compact(data['whisker_high'], stat),
+            'outliers': data['outliers'].tolist()
+        },
+        'histogram': {
+            'edges': _compact(data['bin_edges'], stat),
+            'counts': data['histogram'].tolist()
+        },
+        'correlation': [_compact(row, corr) for row in data['correlation']]
+    }
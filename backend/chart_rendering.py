@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分析图表渲染
+四个子图（箱线图、直方图、均值条形图、相关性热力图）只使用 chart_data 预先计算的汇总数据绘制，
+各自渲染为独立图像（Agg 后端，可多进程并行），再拼接为一张总图。
+模型较多时自动放大画布并省略数值标注；渲染结果按分析数据哈希缓存
+"""
+
+import base64
+import io
+import multiprocessing
+import re
+import threading
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+from chart_data import chart_data, chart_digest, outlier_values
+from parallel_pairs import resolve_workers
+
+# 支持的图片格式
+CHART_FORMATS = ('png', 'svg')
+# 默认分辨率
+DEFAULT_DPI = 300
+# 子图顺序（总图中按 2x2 排列）
+PANELS = ('box', 'histogram', 'means', 'correlation')
+# 模型数超过该值时不标注热力图相关系数与均值数值
+ANNOTATION_MAX_MODELS = 20
+# 模型数不超过该值时直方图叠加绘制，否则绘制为 模型 x 分箱 的频次热图
+HISTOGRAM_OVERLAY_MAX_MODELS = 10
+# 每个模型在刻度方向上占用的画布长度（英寸）
+INCHES_PER_MODEL = 0.2
+# 渲染结果缓存默认的内存上限
+DEFAULT_CHART_CACHE_BYTES = 256 * 1024 * 1024
+
+# 中文字体候选
+FONT_FAMILY = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
+# 总图标题
+FIGURE_TITLE = '模型对比分析可视化'
+# 总图顶部标题栏的高度（英寸）
+TITLE_HEIGHT_INCHES = 0.6
+
+_PANEL_TITLES = {
+    'box': '模型得分分布箱线图',
+    'histogram': '模型得分分布直方图',
+    'means': '模型平均得分对比',
+    'correlation': '模型得分相关性热力图'
+}
+
+
+@lru_cache(maxsize=None)
+def configure_matplotlib():
+    """
+    按需加载 matplotlib 并设置中文字体
+
+    Returns:
+        matplotlib 模块
+    """
+    import matplotlib
+
+    matplotlib.rcParams['font.sans-serif'] = FONT_FAMILY
+    matplotlib.rcParams['axes.unicode_minus'] = False
+    # 候选字体均缺失时中文显示为方框，不再为每个字符重复告警（含多进程渲染的子进程）
+    warnings.filterwarnings('ignore', message='Glyph .* missing from font')
+    return matplotlib
+
+
+class ChartCache:
+    """
+    线程安全的渲染结果 LRU 缓存，按图片字节数限制总大小
+
+    键为 (分析数据哈希, 格式, 分辨率)，值为拼接后的总图
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CHART_CACHE_BYTES):
+        """
+        初始化缓存
+
+        Args:
+            max_bytes: 缓存图片的总字节数上限
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """查询渲染结果，命中的条目标记为最近使用"""
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+            return image
+
+    def put(self, key: Hashable, image: bytes) -> None:
+        """缓存渲染结果，超过总大小上限时淘汰最久未使用的条目"""
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = image
+            self._bytes += len(image)
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def _tick_style(n_models: int) -> Dict:
+    """模型名称刻度标签的旋转角度与字号"""
+    if n_models <= ANNOTATION_MAX_MODELS:
+        return {'rotation': 45, 'ha': 'right'}
+    return {'rotation': 90, 'fontsize': 7}
+
+
+def panel_size(panel: str, n_models: int) -> tuple:
+    """
+    子图画布尺寸（英寸），随模型数增大，使模型较多时刻度标签不重叠
+
+    Args:
+        panel: 子图名称
+        n_models: 模型数
+
+    Returns:
+        tuple: (宽, 高)
+    """
+    extent = INCHES_PER_MODEL * n_models
+    if panel == 'correlation':
+        side = max(7.5, extent + 3)
+        return side, side - 1
+    if panel == 'histogram':
+        if n_models <= HISTOGRAM_OVERLAY_MAX_MODELS:
+            return 7.5, 6
+        return 7.5, max(6, extent + 2)
+    return max(7.5, extent + 2), 6
+
+
+def draw_panel(fig, ax, panel: str, data: Dict, names: Sequence[str]) -> None:
+    """
+    在给定坐标轴上绘制一个子图
+
+    Args:
+        fig: 坐标轴所在的 matplotlib Figure（用于颜色条）
+        ax: matplotlib 坐标轴
+        panel: 子图名称（见 PANELS）
+        data: chart_data 的结果，箱线图另需 fliers（每列离群值）
+        names: 各列对应的模型名称
+    """
+    names = list(names)
+    k = len(names)
+    positions = np.arange(k)
+    ax.set_title(_PANEL_TITLES[panel])
+
+    if panel == 'box':
+        boxes = [{'label': name, 'med': data['median'][j], 'q1': data['q25'][j], 'q3': data['q75'][j],
+                  'whislo': data['whisker_low'][j], 'whishi': data['whisker_high'][j],
+                  'fliers': data['fliers'][j]}
+                 for j, name in enumerate(names) if data['count'][j] > 0]
+        if boxes:
+            ax.bxp(boxes, positions=[j + 1 for j in range(k) if data['count'][j] > 0],
+                   flierprops={'markersize': 3})
+        ax.set_xticks(positions + 1)
+        ax.set_xticklabels(names, **_tick_style(k))
+        ax.set_ylabel('得分')
+        ax.grid(True, alpha=0.3)
+
+    elif panel == 'histogram':
+        edges = data['bin_edges']
+        counts = data['histogram']
+        if k <= HISTOGRAM_OVERLAY_MAX_MODELS:
+            for j, name in enumerate(names):
+                ax.stairs(counts[j], edges, fill=True, alpha=0.6, label=name)
+            ax.set_ylabel('频次')
+            if k:
+                ax.legend()
+        else:
+            # 网格按单元格绘制，不随输出分辨率重采样
+            mesh = ax.pcolormesh(edges, np.arange(k + 1) - 0.5, counts, cmap='viridis')
+            ax.invert_yaxis()
+            fig.colorbar(mesh, ax=ax, label='频次')
+            ax.set_yticks(positions)
+            ax.set_yticklabels(names, fontsize=7)
+        ax.set_xlabel('得分')
+
+    elif panel == 'means':
+        bars = ax.bar(positions, data['mean'])
+        ax.set_xlabel('模型')
+        ax.set_ylabel('平均得分')
+        ax.set_xticks(positions)
+        ax.set_xticklabels(names, **_tick_style(k))
+        if k <= ANNOTATION_MAX_MODELS:
+            ax.bar_label(bars, labels=[f'{mean:.3f}' for mean in data['mean']])
+
+    elif panel == 'correlation':
+        corr = data['correlation']
+        cells = np.arange(k + 1) - 0.5
+        mesh = ax.pcolormesh(cells, cells, np.ma.masked_invalid(corr), cmap='coolwarm', vmin=-1, vmax=1)
+        ax.set_aspect('equal')
+        ax.invert_yaxis()
+        # 与正方形热力图等高的颜色条
+        fig.colorbar(mesh, ax=ax, fraction=0.046, pad=0.04)
+        ax.set_xticks(positions)
+        ax.set_xticklabels(names, **_tick_style(k))
+        ax.set_yticks(positions)
+        ax.set_yticklabels(names, fontsize=None if k <= ANNOTATION_MAX_MODELS else 7)
+        if k <= ANNOTATION_MAX_MODELS:
+            for i in range(k):
+                for j in range(k):
+                    if not np.isnan(corr[i, j]):
+                        ax.text(j, i, f'{corr[i, j]:.2f}', ha='center', va='center', fontsize=8)
+
+    else:
+        raise ValueError(f"不支持的子图: {panel}")
+
+
+def _draw_figure(panel: str, data: Dict, names: Sequence[str]):
+    """在独立的 Agg 画布上绘制一个子图（不经过 pyplot，可在任意线程或子进程中调用）"""
+    configure_matplotlib()
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=panel_size(panel, len(names)), facecolor='white')
+    FigureCanvasAgg(fig)
+    draw_panel(fig, fig.add_subplot(), panel, data, names)
+    fig.tight_layout()
+    return fig
+
+
+def render_panel(panel: str, data: Dict, names: Sequence[str], fmt: str = 'png', dpi: int = DEFAULT_DPI) -> bytes:
+    """
+    将一个子图渲染为独立图像
+
+    Args:
+        panel: 子图名称
+        data: draw_panel 使用的图表数据
+        names: 各列对应的模型名称
+        fmt: 图片格式 ('png', 'svg')
+        dpi: 分辨率
+
+    Returns:
+        bytes: 图片内容
+    """
+    fig = _draw_figure(panel, data, names)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=dpi)
+    return buffer.getvalue()
+
+
+def _render_image(panel: str, data: Dict, names: Sequence[str], fmt: str, dpi: int):
+    """
+    渲染待拼接的子图：PNG 返回 Agg 画布的 RGB 像素（拼接后只编码一次），SVG 返回图片内容
+    """
+    if fmt != 'png':
+        return render_panel(panel, data, names, fmt, dpi)
+    fig = _draw_figure(panel, data, names)
+    fig.set_dpi(dpi)
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba())[:, :, :3].copy()
+
+
+def _panel_data(panel: str, data: Dict) -> Dict:
+    """子图绘制所需的数据子集，多进程渲染时只序列化该部分"""
+    keys = {
+        'box': ('count', 'median', 'q25', 'q75', 'whisker_low', 'whisker_high', 'fliers'),
+        'histogram': ('bin_edges', 'histogram'),
+        'means': ('mean',),
+        'correlation': ('correlation',)
+    }[panel]
+    return {key: data[key] for key in keys}
+
+
+def render_panels(data: Dict,
+                  names: Sequence[str],
+                  fmt: str = 'png',
+                  dpi: int = DEFAULT_DPI,
+                  workers: Optional[int] = None) -> Dict:
+    """
+    渲染全部子图供 compose_figure 拼接，workers 大于 1 时每个子图在独立进程中渲染
+
+    Args:
+        data: draw_panel 使用的图表数据
+        names: 各列对应的模型名称
+        fmt: 图片格式
+        dpi: 分辨率
+        workers: 工作进程数（见 resolve_workers）
+
+    Returns:
+        Dict: 子图名称到图像的映射（PNG 为 RGB 像素数组，SVG 为图片内容）
+    """
+    workers = min(resolve_workers(workers), len(PANELS))
+    names = list(names)
+    if workers <= 1:
+        return {panel: _render_image(panel, data, names, fmt, dpi) for panel in PANELS}
+
+    # spawn 启动的子进程不继承 Flask 等线程状态；只传递各子图所需的汇总数据
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = {panel: executor.submit(_render_image, panel, _panel_data(panel, data), names, fmt, dpi)
+                   for panel in PANELS}
+        return {panel: future.result() for panel, future in futures.items()}
+
+
+def _grid_cells(sizes: List[tuple]) -> tuple:
+    """2x2 排列时每个子图的左上角坐标 (x, y) 与总图尺寸 (宽, 高)"""
+    widths = [max(sizes[0][0], sizes[2][0]), max(sizes[1][0], sizes[3][0])]
+    heights = [max(sizes[0][1], sizes[1][1]), max(sizes[2][1], sizes[3][1])]
+    origins = [(0, 0), (widths[0], 0), (0, heights[0]), (widths[0], heights[0])]
+    return origins, (sum(widths), sum(heights))
+
+
+_SVG_SIZE = re.compile(rb'<svg[^>]*?width="([\d.]+)pt"[^>]*?height="([\d.]+)pt"')
+
+
+def _render_title(width: float, fmt: str, dpi: int):
+    """
+    渲染总图顶部的标题栏（与交互显示时的 suptitle 相同），宽度单位与子图一致：
+    PNG 为像素（返回 RGB 像素数组），SVG 为磅（返回图片内容）
+    """
+    configure_matplotlib()
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(width / (dpi if fmt == 'png' else 72), TITLE_HEIGHT_INCHES), facecolor='white')
+    FigureCanvasAgg(fig)
+    fig.text(0.5, 0.5, FIGURE_TITLE, ha='center', va='center', fontsize=16, fontweight='bold')
+    if fmt != 'png':
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, dpi=dpi)
+        return buffer.getvalue()
+    fig.set_dpi(dpi)
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba())[:, :, :3]
+
+
+def compose_figure(images: Dict, fmt: str = 'png', dpi: int = DEFAULT_DPI) -> bytes:
+    """
+    将四个子图按 2x2 拼接为一张总图，顶部加标题栏
+
+    PNG 在像素数组上拼接后编码一次；SVG 将各子图作为内嵌图像引用，子图内部的元素 id 互不冲突
+
+    Args:
+        images: render_panels 的结果
+        fmt: 图片格式
+        dpi: 分辨率（写入 PNG 元数据）
+
+    Returns:
+        bytes: 总图内容
+    """
+    parts = [images[panel] for panel in PANELS]
+    if fmt == 'png':
+        from matplotlib.image import imsave
+
+        origins, (width, height) = _grid_cells([(part.shape[1], part.shape[0]) for part in parts])
+        title = _render_title(width, fmt, dpi)[:, :width]
+        top = title.shape[0]
+        pixels = np.full((top + height, width, 3), 255, dtype=np.uint8)
+        pixels[:top, :title.shape[1]] = title
+        for (x, y), part in zip(origins, parts):
+            pixels[top + y:top + y + part.shape[0], x:x + part.shape[1]] = part
+        buffer = io.BytesIO()
+        imsave(buffer, pixels, format='png', dpi=dpi)
+        return buffer.getvalue()
+
+    sizes = [tuple(float(v) for v in _SVG_SIZE.search(part).groups()) for part in parts]
+    origins, (width, height) = _grid_cells(sizes)
+    title = _render_title(width, fmt, dpi)
+    top = float(_SVG_SIZE.search(title).group(2))
+    placed = [((0.0, 0.0), (width, top), title)]
+    placed += [((x, top + y), size, part) for (x, y), size, part in zip(origins, sizes, parts)]
+    height += top
+    elements = [
+        f'<image x="{x}" y="{y}" width="{w}" height="{h}" '
+        f'href="data:image/svg+xml;base64,{base64.b64encode(part).decode("ascii")}"/>'
+        for (x, y), (w, h), part in placed
+    ]
+    return (f'<?xml version="1.0" encoding="utf-8"?>\n'
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}pt" height="{height}pt" '
+            f'viewBox="0 0 {width} {height}">\n'
+            f'<rect width="100%" height="100%" fill="white"/>\n'
+            + '\n'.join(elements) + '\n</svg>\n').encode('utf-8')
+
+
+def prepare_chart_data(matrix: np.ndarray) -> Dict:
+    """计算绘制全部子图所需的数据（chart_data 加上箱线图离群值）"""
+    data = chart_data(matrix)
+    data['fliers'] = outlier_values(matrix, data['whisker_low'], data['whisker_high'])
+    return data
+
+
+def render_figure(matrix: np.ndarray,
+                  names: Sequence[str],
+                  fmt: str = 'png',
+                  dpi: int = DEFAULT_DPI,
+                  workers: Optional[int] = None,
+                  cache: Optional[ChartCache] = None) -> bytes:
+    """
+    渲染分析总图，结果按分析数据哈希缓存
+
+    Args:
+        matrix: 形状为 (行数, 模型数) 的分数矩阵，缺失值为 NaN
+        names: 各列对应的模型名称
+        fmt: 图片格式 ('png', 'svg')
+        dpi: 分辨率
+        workers: 子图渲染的工作进程数（见 resolve_workers）
+        cache: 渲染结果缓存，为None时不缓存
+
+    Returns:
+        bytes: 总图内容
+    """
+    if fmt not in CHART_FORMATS:
+        raise ValueError(f"不支持的图片格式: {fmt}")
+
+    key = (chart_digest(matrix, names), fmt, dpi) if cache is not None else None
+    if cache is not None:
+        figure = cache.get(key)
+        if figure is not None:
+            return figure
+
+    images = render_panels(prepare_chart_data(matrix), names, fmt, dpi, workers)
+    figure = compose_figure(images, fmt, dpi)
+    if cache is not None:
+        cache.put(key, figure)
+    return figure
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数值列识别
+一次性对所有列分类：已是数值类型的列直接统计非空比例，
+对象类型的列先抽样判断，只有比例接近阈值的列才进行全量转换确认
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+# 判定为数值列所需的可转换比例
+NUMERIC_RATIO_THRESHOLD = 0.5
+# 对象类型列的抽样行数
+DETECTION_SAMPLE_SIZE = 2000
+# 抽样比例与阈值的差距小于该值时，进行全量转换确认
+DETECTION_MARGIN = 0.1
+
+
+def classify_numeric_columns(df: pd.DataFrame,
+                             threshold: float = NUMERIC_RATIO_THRESHOLD,
+                             sample_size: int = DETECTION_SAMPLE_SIZE,
+                             margin: float = DETECTION_MARGIN,
+                             seed: int = 0) -> Tuple[List[str], Dict[str, np.ndarray]]:
+    """
+    识别数值列（至少 threshold 比例的值可以转换为数值）
+
+    Args:
+        df: 数据框
+        threshold: 可转换比例阈值
+        sample_size: 对象类型列的抽样行数
+        margin: 需要全量确认的比例区间半宽
+        seed: 抽样随机种子
+
+    Returns:
+        Tuple[List[str], Dict[str, np.ndarray]]: (数值列列表（保持原列顺序），
+            识别过程中已得到的数值化数组（列名 -> float64 数组）)
+    """
+    n_rows = len(df)
+    if n_rows == 0:
+        return [], {}
+
+    numeric = set()
+    coerced: Dict[str, np.ndarray] = {}
+    columns = list(df.columns)
+
+    # 已是数值类型的列：一次统计全部非空数量
+    numeric_dtype_cols = [col for col in columns if is_numeric_dtype(df[col].dtype)]
+    if numeric_dtype_cols:
+        ratios = df[numeric_dtype_cols].notna().sum().to_numpy() / n_rows
+        for col, ratio in zip(numeric_dtype_cols, ratios):
+            if ratio >= threshold:
+                numeric.add(col)
+                if df[col].dtype == np.float64:
+                    coerced[col] = df[col].to_numpy()
+
+    # 对象类型的列：先抽样，接近阈值时再全量确认
+    numeric_dtype_set = set(numeric_dtype_cols)
+    other_cols = [col for col in columns if col not in numeric_dtype_set]
+    if other_cols:
+        if n_rows > sample_size:
+            rows = np.sort(np.random.default_rng(seed).choice(n_rows, sample_size, replace=False))
+            sample = df[other_cols].iloc[rows]
+        else:
+            sample = df[other_cols]
+        sample_ratios = sample.apply(lambda s: pd.to_numeric(s, errors='coerce').notna().mean())
+
+        for col in other_cols:
+            ratio = sample_ratios[col]
+            if n_rows <= sample_size or abs(ratio - threshold) < margin:
+                values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64)
+                coerced[col] = values
+                ratio = np.count_nonzero(~np.isnan(values)) / n_rows
+            if ratio >= threshold:
+                numeric.add(col)
+
+    return [col for col in columns if col in numeric], coerced
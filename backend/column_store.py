@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列式二进制数据集存储
+上传的 CSV 解析一次后，每个数值列保存为一个 .npy 文件，连同元数据清单放在同一目录下；
+之后按列内存映射加载，不再重新解析 CSV，重启后端后也能直接打开，且只读取所选列所在的页；
+上传时可以边解析边按块追加写入（见 ColumnStoreWriter），行数在写完后才确定
+"""
+
+import json
+import os
+import shutil
+import struct
+import uuid
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# 存储格式版本（格式变化时旧存储不再使用，退回解析 CSV）
+COLUMN_STORE_VERSION = 1
+# 元数据清单文件名
+MANIFEST_NAME = 'manifest.json'
+# .npy 文件头的固定长度（64 字节对齐），行数确定后原位改写，数据起始位置不变
+NPY_HEADER_BYTES = 128
+
+
+class ColumnStore:
+    """
+    单个数据集的列式存储：数值列的 .npy 文件及元数据清单
+    """
+
+    def __init__(self, path: str, manifest: Dict):
+        """
+        初始化存储（通过 open 或 ColumnStoreWriter.finish 创建）
+
+        Args:
+            path: 存储目录
+            manifest: 元数据清单内容
+        """
+        self.path = path
+        self.dataset_key: str = manifest['datasetKey']
+        self.encoding: str = manifest['encoding']
+        self.row_count: int = manifest['rowCount']
+        self.columns: List[str] = list(manifest['columns'])
+        # 列名 → .npy 文件名（只包含已存储的数值列）
+        self.files: Dict[str, str] = dict(manifest['stored'])
+        # 列名 → 写入时统计的 {count, mean, min, max}（旧存储或未统计时为空）
+        self.stats: Dict[str, Dict] = dict(manifest.get('stats') or {})
+
+    @classmethod
+    def open(cls, path: Optional[str]) -> Optional['ColumnStore']:
+        """
+        打开已有的列式存储
+
+        Args:
+            path: 存储目录
+
+        Returns:
+            Optional[ColumnStore]: 存储，目录不存在、清单损坏或版本不符时返回 None
+        """
+        if not path:
+            return None
+        try:
+            with open(os.path.join(path, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') != COLUMN_STORE_VERSION:
+                return None
+            return cls(path, manifest)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def has(self, columns: Sequence[str]) -> bool:
+        """指定的列是否都已存储"""
+        return all(column in self.files for column in columns)
+
+    def column(self, column: str) -> np.ndarray:
+        """
+        以只读内存映射方式打开一列
+
+        Args:
+            column: 列名
+
+        Returns:
+            np.ndarray: float64 内存映射数组
+        """
+        return np.load(os.path.join(self.path, self.files[column]), mmap_mode='r')
+
+    def frame(self, columns: Sequence[str]) -> pd.DataFrame:
+        """
+        由内存映射列组成数据框（不复制数据，只在访问时读取对应的页）
+
+        Args:
+            columns: 列名（须都已存储）
+
+        Returns:
+            pd.DataFrame: 数据框
+        """
+        columns = list(dict.fromkeys(columns))
+        return pd.DataFrame({column: self.column(column) for column in columns},
+                            index=pd.RangeIndex(self.row_count), copy=False)
+
+    @property
+    def nbytes(self) -> int:
+        """存储占用的磁盘字节数"""
+        total = 0
+        for file_name in self.files.values():
+            try:
+                total += os.path.getsize(os.path.join(self.path, file_name))
+            except OSError:
+                pass
+        return total
+
+
+def remove_column_store(path: Optional[str]) -> None:
+    """删除列式存储目录（不存在时忽略）"""
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _npy_header(row_count: int) -> bytes:
+    """一维 float64 数组的 .npy 文件头（版本 1.0，填充到 NPY_HEADER_BYTES 字节）"""
+    header = repr({'descr': np.dtype(np.float64).str, 'fortran_order': False, 'shape': (row_count,)})
+    prefix = np.lib.format.magic(1, 0)
+    header_len = NPY_HEADER_BYTES - len(prefix) - 2
+    return prefix + struct.pack('<H', header_len) + header.ljust(header_len - 1).encode('latin1') + b'\n'
+
+
+class ColumnStoreWriter:
+    """
+    按块追加写入列式存储：每列一个 .npy 文件，先写入占位文件头，
+    finish 时按实际行数改写文件头、删除不保留的列并写入清单，整体替换到目标目录
+    """
+
+    def __init__(self, path: str, columns: Sequence[str], dataset_key: str,
+                 encoding: str = 'utf-8', store_columns: Optional[Sequence[str]] = None):
+        """
+        创建临时目录并打开各列文件
+
+        Args:
+            path: 存储目录
+            columns: 原数据的全部列名（按原顺序）
+            dataset_key: 原文件内容哈希
+            encoding: 原文件编码
+            store_columns: 要写入的列，为None时写入全部列（finish 时再决定保留哪些）
+        """
+        self.path = path
+        self.columns = list(columns)
+        self.dataset_key = dataset_key
+        self.encoding = encoding
+        self.row_count = 0
+        self._tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+        os.makedirs(self._tmp_path)
+        wanted = set(self.columns if store_columns is None else store_columns)
+        # 列名 → 文件名（按原列位置命名，列名可以包含任意字符）
+        self._files: Dict[str, str] = {}
+        self._handles = {}
+        try:
+            for i, column in enumerate(self.columns):
+                if column not in wanted:
+                    continue
+                file_name = f"c{i:05d}.npy"
+                handle = open(os.path.join(self._tmp_path, file_name), 'wb')
+                self._handles[column] = handle
+                self._files[column] = file_name
+                handle.write(_npy_header(0))
+        except BaseException:
+            self.abort()
+            raise
+
+    def append(self, values: Dict[str, np.ndarray]) -> None:
+        """
+        追加一块数据
+
+        Args:
+            values: 写入的每一列 → 等长的数组（转换为 float64）
+        """
+        row_counts = {len(values[column]) for column in self._handles}
+        if len(row_counts) > 1:
+            raise ValueError('各列长度不一致')
+        for column, handle in self._handles.items():
+            handle.write(np.ascontiguousarray(values[column], dtype=np.float64).data)
+        self.row_count += row_counts.pop() if row_counts else 0
+
+    def finish(self, keep: Optional[Sequence[str]] = None,
+               stats: Optional[Dict[str, Dict]] = None) -> ColumnStore:
+        """
+        完成写入并替换到目标目录
+
+        Args:
+            keep: 保留的列，为None时保留全部已写入的列
+            stats: 列名 → 统计信息，写入清单
+
+        Returns:
+            ColumnStore: 写入完成的存储
+        """
+        keep = set(self._files if keep is None else keep)
+        try:
+            stored = {}
+            for column, handle in self._handles.items():
+                if column in keep:
+                    handle.seek(0)
+                    handle.write(_npy_header(self.row_count))
+                    stored[column] = self._files[column]
+                handle.close()
+            self._handles = {}
+            for column, file_name in self._files.items():
+                if column not in stored:
+                    os.remove(os.path.join(self._tmp_path, file_name))
+
+            manifest = {
+                'version': COLUMN_STORE_VERSION,
+                'datasetKey': self.dataset_key,
+                'encoding': self.encoding,
+                'rowCount': self.row_count,
+                'columns': self.columns,
+                'stored': stored
+            }
+            if stats:
+                manifest['stats'] = {column: stats[column] for column in stored if column in stats}
+            with open(os.path.join(self._tmp_path, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+
+            remove_column_store(self.path)
+            os.replace(self._tmp_path, self.path)
+        except BaseException:
+            self.abort()
+            raise
+        return ColumnStore(self.path, manifest)
+
+    def abort(self) -> None:
+        """放弃写入，删除临时目录"""
+        for handle in self._handles.values():
+            handle.close()
+        self._handles = {}
+        shutil.rmtree(self._tmp_path, ignore_errors=True)
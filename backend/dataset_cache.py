@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+已解析数据集缓存
+按上传内容哈希缓存解析后的数据框及数值化后的列，避免每次分析重复读取 CSV
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# 计算文件哈希时每次读取的字节数
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def new_content_hash():
+    """
+    创建用于数据集内容哈希的哈希对象
+
+    Returns:
+        hashlib 哈希对象
+    """
+    return hashlib.blake2b(digest_size=20)
+
+
+def file_digest(file_path: str) -> str:
+    """
+    计算文件内容哈希
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        str: 十六进制哈希值
+    """
+    digest = new_content_hash()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CachedDataset:
+    """
+    单个已解析的数据集：原始数据框及按需数值化的列
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.numeric: Dict[str, np.ndarray] = {}
+        self.nbytes = int(df.memory_usage(index=True, deep=True).sum())
+
+    def numeric_column(self, column: str) -> np.ndarray:
+        """
+        获取数值化后的列（无法转换的值为 NaN），首次访问时转换并缓存
+
+        Args:
+            column: 列名
+
+        Returns:
+            np.ndarray: float64 数组
+        """
+        values = self.numeric.get(column)
+        if values is None:
+            values = pd.to_numeric(self.df[column], errors='coerce').to_numpy(dtype=np.float64)
+            self.store_numeric(column, values)
+        return values
+
+    def store_numeric(self, column: str, values: np.ndarray) -> None:
+        """
+        缓存已数值化的列
+
+        Args:
+            column: 列名
+            values: float64 数组（可以是原数据框列的视图）
+        """
+        if column in self.numeric:
+            return
+        self.numeric[column] = values
+        # 原数据框的视图不额外占用内存
+        if values.base is None:
+            self.nbytes += values.nbytes
+
+
+class DatasetCache:
+    """
+    线程安全的 LRU 数据集缓存，按总内存占用和条目数淘汰
+    """
+
+    def __init__(self, max_bytes: int = 2 * 1024 * 1024 * 1024, max_entries: int = 16):
+        """
+        初始化缓存
+
+        Args:
+            max_bytes: 缓存数据总大小上限（字节）
+            max_entries: 最多缓存的数据集数量
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedDataset]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedDataset]:
+        """
+        获取缓存的数据集，命中时标记为最近使用
+
+        Args:
+            key: 数据集键
+
+        Returns:
+            Optional[CachedDataset]: 缓存条目，未命中返回 None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, df: pd.DataFrame) -> CachedDataset:
+        """
+        缓存数据框
+
+        Args:
+            key: 数据集键
+            df: 解析后的数据框
+
+        Returns:
+            CachedDataset: 新建的缓存条目
+        """
+        entry = CachedDataset(df)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+        return entry
+
+    def discard(self, key: str) -> None:
+        """移除指定数据集"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_dataset(self, dataset_key: str) -> None:
+        """移除同一数据集（内容哈希）的全部缓存条目，包括各列投影"""
+        prefix = f"{dataset_key}:"
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def dataset_bytes(self, dataset_key: str) -> int:
+        """同一数据集（内容哈希）的缓存条目占用的总字节数"""
+        prefix = f"{dataset_key}:"
+        with self._lock:
+            return sum(entry.nbytes for key, entry in self._entries.items() if key.startswith(prefix))
+
+    def total_bytes(self) -> int:
+        """当前缓存占用的总字节数"""
+        with self._lock:
+            return sum(entry.nbytes for entry in self._entries.values())
+
+    def _evict(self) -> None:
+        """淘汰最久未使用的条目直至满足容量限制（至少保留最新的一个）"""
+        while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries
+                or sum(entry.nbytes for entry in self._entries.values()) > self.max_bytes):
+            self._entries.popitem(last=False)
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据集会话注册表
+每次上传生成独立的数据集 ID，分析和列检测按 ID 访问各自的数据，互不覆盖。
+数据集信息写入磁盘清单，同一存储目录下的多个进程都可以按 ID 找到数据集；
+上传时转换出的列式二进制存储随清单一起记录，重启后直接按列内存映射加载；
+长时间未访问的数据集连同文件、列式存储、共享分数矩阵和缓存一起回收
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from column_store import ColumnStore, remove_column_store
+from dataset_cache import DatasetCache
+from pair_cache import PairResultCache
+from shared_matrix import SharedMatrixStore
+
+# 默认闲置回收时间（秒）
+DEFAULT_IDLE_TTL = 2 * 60 * 60
+# 两次闲置扫描的最小间隔（秒）
+EVICTION_INTERVAL = 60
+
+# 数据集 ID 格式（防止通过 ID 访问存储目录以外的路径）
+DATASET_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class DatasetSession:
+    """
+    单个上传数据集：文件位置、内容哈希、列信息及访问状态
+    """
+
+    def __init__(self,
+                 dataset_id: str,
+                 csv_file_path: str,
+                 filename: str,
+                 dataset_key: str,
+                 columns: List[str],
+                 numeric_columns: List[str],
+                 row_count: int,
+                 streaming: bool = False,
+                 created_at: Optional[float] = None,
+                 column_store: Optional[str] = None):
+        """
+        初始化数据集会话
+
+        Args:
+            dataset_id: 数据集 ID
+            csv_file_path: 上传文件的保存路径
+            filename: 上传时的原始文件名
+            dataset_key: 文件内容哈希（数据集缓存键）
+            columns: 列名列表
+            numeric_columns: 数值列列表
+            row_count: 行数
+            streaming: 是否使用流式分块分析
+            created_at: 上传时间戳
+            column_store: 列式二进制存储目录，未转换时为None
+        """
+        self.id = dataset_id
+        self.csv_file_path = csv_file_path
+        self.filename = filename
+        self.dataset_key = dataset_key
+        self.columns = list(columns)
+        self.numeric_columns = list(numeric_columns)
+        self.row_count = row_count
+        self.streaming = streaming
+        self.created_at = created_at if created_at is not None else time.time()
+        self.column_store = column_store
+        self._store: Optional[ColumnStore] = None
+        self.last_access = time.time()
+        # 同一数据集的解析串行执行，避免并发请求重复读取同一文件
+        self.load_lock = threading.Lock()
+        self._active = 0
+
+    @property
+    def in_use(self) -> bool:
+        """是否有请求或分析任务正在使用该数据集"""
+        return self._active > 0
+
+    def open_column_store(self) -> Optional[ColumnStore]:
+        """打开列式存储（首次调用时读取其清单），没有或已损坏时返回 None"""
+        if self._store is None and self.column_store:
+            self._store = ColumnStore.open(self.column_store)
+        return self._store
+
+    def to_manifest(self) -> Dict:
+        """转换为磁盘清单内容"""
+        return {
+            'id': self.id,
+            'csvFilePath': self.csv_file_path,
+            'filename': self.filename,
+            'datasetKey': self.dataset_key,
+            'columns': self.columns,
+            'numericColumns': self.numeric_columns,
+            'rowCount': self.row_count,
+            'streaming': self.streaming,
+            'createdAt': self.created_at,
+            'columnStore': self.column_store
+        }
+
+    @classmethod
+    def from_manifest(cls, manifest: Dict) -> 'DatasetSession':
+        """由磁盘清单内容恢复会话"""
+        return cls(
+            manifest['id'], manifest['csvFilePath'], manifest['filename'],
+            manifest['datasetKey'], manifest['columns'], manifest['numericColumns'],
+            manifest['rowCount'], streaming=manifest.get('streaming', False),
+            created_at=manifest.get('createdAt'), column_store=manifest.get('columnStore')
+        )
+
+
+class DatasetRegistry:
+    """
+    线程安全的数据集会话注册表
+
+    数据集解析结果只保存在共享的 DatasetCache 中（受其总字节上限约束），
+    会话本身只记录元数据，因此内存占用可以按数据集统计并统一回收。
+    """
+
+    def __init__(self, storage_dir: str,
+                 cache: Optional[DatasetCache] = None,
+                 idle_ttl: float = DEFAULT_IDLE_TTL,
+                 pair_cache: Optional[PairResultCache] = None,
+                 matrix_store: Optional[SharedMatrixStore] = None):
+        """
+        初始化注册表
+
+        Args:
+            storage_dir: 上传文件及清单的存储目录（多进程部署时需共享同一目录）
+            cache: 已解析数据集缓存
+            idle_ttl: 闲置回收时间（秒）
+            pair_cache: 模型对检验结果缓存，数据集回收时一并清除
+            matrix_store: 共享的清理后分数矩阵存储，数据集回收时删除其矩阵文件
+        """
+        self.storage_dir = storage_dir
+        self.cache = cache
+        self.idle_ttl = idle_ttl
+        self.pair_cache = pair_cache
+        self.matrix_store = matrix_store
+        self._sessions: Dict[str, DatasetSession] = {}
+        self._lock = threading.Lock()
+        self._last_eviction = 0.0
+        os.makedirs(storage_dir, exist_ok=True)
+
+    def new_id(self) -> str:
+        """生成新的数据集 ID"""
+        return uuid.uuid4().hex
+
+    def upload_path(self, dataset_id: str) -> str:
+        """数据集上传文件的保存路径"""
+        return os.path.join(self.storage_dir, f"{dataset_id}.csv")
+
+    def column_store_path(self, dataset_id: str) -> str:
+        """数据集列式存储的目录"""
+        return os.path.join(self.storage_dir, f"{dataset_id}.columns")
+
+    def _manifest_path(self, dataset_id: str) -> str:
+        return os.path.join(self.storage_dir, f"{dataset_id}.json")
+
+    def register(self, session: DatasetSession) -> DatasetSession:
+        """
+        注册上传完成的数据集，并写入磁盘清单
+
+        Args:
+            session: 数据集会话
+
+        Returns:
+            DatasetSession: 已注册的会话
+        """
+        manifest_path = self._manifest_path(session.id)
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(session.to_manifest(), f, ensure_ascii=False)
+        os.replace(tmp_path, manifest_path)
+
+        with self._lock:
+            self._sessions[session.id] = session
+        self.evict_idle()
+        return session
+
+    def get(self, dataset_id: Optional[str]) -> Optional[DatasetSession]:
+        """
+        按 ID 获取数据集，本进程未加载时从磁盘清单恢复
+
+        Args:
+            dataset_id: 数据集 ID
+
+        Returns:
+            Optional[DatasetSession]: 数据集会话，不存在或已回收返回 None
+        """
+        if not dataset_id or not DATASET_ID_PATTERN.match(dataset_id):
+            return None
+        self.evict_idle()
+
+        with self._lock:
+            session = self._sessions.get(dataset_id)
+            if session is None:
+                session = self._load_manifest(dataset_id)
+                if session is None:
+                    return None
+                self._sessions[dataset_id] = session
+            self._touch(session)
+            return session
+
+    @contextmanager
+    def use(self, session: DatasetSession) -> Iterator[DatasetSession]:
+        """
+        标记数据集正在使用，期间不会被闲置回收
+
+        Args:
+            session: 数据集会话
+        """
+        with self._lock:
+            session._active += 1
+            self._touch(session)
+        try:
+            yield session
+        finally:
+            with self._lock:
+                session._active -= 1
+                self._touch(session)
+
+    def resident_bytes(self, session: DatasetSession) -> int:
+        """数据集在缓存中占用的字节数"""
+        if self.cache is None:
+            return 0
+        return self.cache.dataset_bytes(session.dataset_key)
+
+    def total_bytes(self) -> int:
+        """全部数据集在缓存中占用的总字节数"""
+        return self.cache.total_bytes() if self.cache is not None else 0
+
+    def remove(self, dataset_id: str) -> bool:
+        """
+        移除数据集：删除上传文件、列式存储、共享分数矩阵、清单，并在没有其他数据集共享内容时释放缓存
+
+        Args:
+            dataset_id: 数据集 ID
+
+        Returns:
+            bool: 是否移除成功（数据集不存在或正在使用时返回 False）
+        """
+        session = self.get(dataset_id)
+        if session is None:
+            return False
+        with self._lock:
+            if session.in_use:
+                return False
+            self._drop(session)
+        return True
+
+    def evict_idle(self, force: bool = False) -> None:
+        """
+        回收超过闲置时间且未在使用的数据集（按最近访问时间判断，包括其他进程的访问）
+
+        Args:
+            force: 为 True 时忽略扫描间隔立即扫描
+        """
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_eviction < EVICTION_INTERVAL:
+                return
+            self._last_eviction = now
+
+            for name in os.listdir(self.storage_dir):
+                dataset_id, ext = os.path.splitext(name)
+                if ext != '.json' or not DATASET_ID_PATTERN.match(dataset_id):
+                    continue
+                session = self._sessions.get(dataset_id)
+                if session is not None and session.in_use:
+                    continue
+                try:
+                    last_access = os.path.getmtime(os.path.join(self.storage_dir, name))
+                except OSError:
+                    continue
+                if now - last_access <= self.idle_ttl:
+                    continue
+                if session is None:
+                    session = self._load_manifest(dataset_id)
+                if session is not None:
+                    print(f"🗑️  回收闲置数据集 {session.filename} ({dataset_id})")
+                    self._drop(session)
+
+    def _touch(self, session: DatasetSession) -> None:
+        """更新最近访问时间（清单文件的修改时间供其他进程判断闲置）"""
+        session.last_access = time.time()
+        try:
+            os.utime(self._manifest_path(session.id))
+        except OSError:
+            pass
+
+    def _load_manifest(self, dataset_id: str) -> Optional[DatasetSession]:
+        """读取磁盘清单（调用方需持有锁）"""
+        try:
+            with open(self._manifest_path(dataset_id), 'r', encoding='utf-8') as f:
+                return DatasetSession.from_manifest(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _drop(self, session: DatasetSession) -> None:
+        """删除数据集文件、列式存储、共享分数矩阵、清单、缓存及模型对检验结果（调用方需持有锁）"""
+        self._sessions.pop(session.id, None)
+        for path in (self._manifest_path(session.id), session.csv_file_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        remove_column_store(session.column_store)
+        if self.matrix_store is not None:
+            self.matrix_store.discard_dataset(session.id)
+        shared = any(other.dataset_key == session.dataset_key for other in self._sessions.values())
+        if self.cache is not None and not shared:
+            self.cache.discard_dataset(session.dataset_key)
+        if self.pair_cache is not None and not shared:
+            self.pair_cache.discard_dataset(session.dataset_key)
@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML 分析报告
+报告由模板逐段生成并写出，不在内存中拼接整份文档；表格行按列批量格式化后套用行模板，
+行数超过分页大小的表格只展开第一页，其余各页折叠在 <details> 中；
+模型名称来自上传文件的列名，写入报告前均经过 HTML 转义
+"""
+
+from html import escape
+from typing import Iterator, List, Sequence, TextIO
+
+import pandas as pd
+
+from analysis_result import AnalysisResult
+from multiple_testing import CORRECTION_COLUMNS
+
+# 表格（及显著差异列表）每页的行数，超过时其余行按页折叠
+REPORT_PAGE_ROWS = 500
+
+# 报告头部与样式
+REPORT_HEAD = """
+<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>模型显著性对比报告</title>
+    <style>
+        body {
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            line-height: 1.6;
+            margin: 0;
+            padding: 20px;
+            background-color: #f5f5f5;
+        }
+        .container {
+            max-width: 1200px;
+            margin: 0 auto;
+            background: white;
+            padding: 30px;
+            border-radius: 10px;
+            box-shadow: 0 0 20px rgba(0,0,0,0.1);
+        }
+        h1 {
+            color: #2c3e50;
+            text-align: center;
+            border-bottom: 3px solid #3498db;
+            padding-bottom: 10px;
+            margin-bottom: 30px;
+        }
+        h2 {
+            color: #34495e;
+            border-left: 4px solid #3498db;
+            padding-left: 15px;
+            margin-top: 30px;
+        }
+        h3 {
+            color: #7f8c8d;
+            margin-top: 25px;
+        }
+        .info-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+            gap: 15px;
+            margin: 20px 0;
+        }
+        .info-card {
+            background: #ecf0f1;
+            padding: 15px;
+            border-radius: 8px;
+            text-align: center;
+        }
+        .info-card strong {
+            color: #2c3e50;
+            font-size: 1.2em;
+        }
+        table {
+            width: 100%;
+            border-collapse: collapse;
+            margin: 20px 0;
+            background: white;
+            border-radius: 8px;
+            overflow: hidden;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }
+        th {
+            background: #3498db;
+            color: white;
+            padding: 15px;
+            text-align: left;
+            font-weight: 600;
+        }
+        td {
+            padding: 12px 15px;
+            border-bottom: 1px solid #ecf0f1;
+        }
+        tr:nth-child(even) {
+            background: #f8f9fa;
+        }
+        tr:hover {
+            background: #e8f4f8;
+        }
+        .best-model {
+            background: linear-gradient(135deg, #f39c12, #e67e22);
+            color: white;
+            padding: 20px;
+            border-radius: 10px;
+            text-align: center;
+            margin: 20px 0;
+            font-size: 1.2em;
+        }
+        .significant {
+            color: #27ae60;
+            font-weight: bold;
+        }
+        .not-significant {
+            color: #e74c3c;
+            font-weight: bold;
+        }
+        .summary {
+            background: #ecf0f1;
+            padding: 20px;
+            border-radius: 8px;
+            margin: 20px 0;
+        }
+        .footer {
+            text-align: center;
+            color: #7f8c8d;
+            margin-top: 30px;
+            padding-top: 20px;
+            border-top: 1px solid #ecf0f1;
+        }
+        .emoji {
+            font-size: 1.2em;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1><span class="emoji">📊</span> 模型显著性对比报告</h1>
+        """
+
+# 数据概览
+OVERVIEW_TEMPLATE = """
+        <h2><span class="emoji">📊</span> 数据概览</h2>
+        <div class="info-grid">
+            <div class="info-card">
+                <strong>{sample_count}</strong><br>样本数量
+            </div>
+            <div class="info-card">
+                <strong>{model_count}</strong><br>模型数量
+            </div>
+            <div class="info-card">
+                <strong>{test_type}</strong><br>统计检验
+            </div>
+            <div class="info-card">
+                <strong>α = {alpha}</strong><br>显著性水平
+            </div>
+        </div>
+        """
+
+# 表头单元格、数据单元格与行
+HEADER_CELL = """
+                    <th>{}</th>"""
+CELL = """
+                    <td>{}</td>"""
+STRONG_CELL = """
+                    <td><strong>{}</strong></td>"""
+CI_CELL = """
+                    <td>[{}, {}]</td>"""
+FLAG_CELL = """
+                    <td class="{}">{}</td>"""
+ROW_OPEN = """
+                <tr>"""
+ROW_CLOSE = """
+                </tr>"""
+
+TABLE_OPEN = """
+        <table>
+            <thead>
+                <tr>{header}
+                </tr>
+            </thead>
+            <tbody>"""
+TABLE_CLOSE = """
+            </tbody>
+        </table>"""
+
+# 折叠的分页
+PAGE_OPEN = """
+        <details>
+            <summary>第 {start}–{end} 行（共 {total} 行）</summary>"""
+PAGE_CLOSE = """
+        </details>"""
+
+BEST_MODEL_TEMPLATE = """
+        <div class="best-model">
+            <span class="emoji">🏆</span> 最佳模型: <strong>{name}</strong> (平均得分: {score:.2f})
+        </div>"""
+
+SIGNIFICANT_OPEN = """
+        <h3><span class="emoji">📋</span> 显著差异总结</h3>
+        <div class="summary">
+            <p>发现 <strong>{count}</strong> 对模型存在显著差异:</p>
+            <ul>"""
+SIGNIFICANT_ITEM = """
+                <li><strong>{}</strong> {} <strong>{}</strong> 
+                    (差异: {}, p = {})</li>"""
+LIST_CLOSE = """
+            </ul>"""
+SUMMARY_CLOSE = """
+        </div>"""
+LIST_PAGE_OPEN = """
+            <details>
+                <summary>第 {start}–{end} 项（共 {total} 项）</summary>"""
+LIST_PAGE_CLOSE = """
+                </ul>
+            </details>"""
+
+BASELINE_INTRO_TEMPLATE = """
+        <h2><span class="emoji">🎯</span> 与基线模型对比</h2>
+        <div class="summary">
+            <p><strong>基线模型</strong>: {name}</p>
+            <p><em>注：基线模型作为对比基准，其他模型的表现将与此模型进行比较</em></p>
+        </div>"""
+BETTER_ITEM = """
+            <p><strong>{}</strong>: 差异 = {}, p = {}</p>"""
+
+FOOTER_TEMPLATE = """
+        </div>
+        
+        <div class="footer">
+            <p>报告生成时间: {timestamp}</p>
+        </div>
+    </div>
+</body>
+</html>"""
+
+
+def _format_column(values: pd.Series, spec: str = '') -> List[str]:
+    """按格式说明批量格式化一列"""
+    return [format(value, spec) for value in values.tolist()]
+
+
+def _flag_columns(values: pd.Series) -> List[List[str]]:
+    """是/否标记列的样式类与文本"""
+    flags = values.tolist()
+    return [["significant" if flag else "not-significant" for flag in flags],
+            ["✅ 是" if flag else "❌ 否" for flag in flags]]
+
+
+def _render_rows(template: str, columns: Sequence[Sequence[str]]) -> List[str]:
+    """按行模板把各列渲染为表格行"""
+    return list(map(template.format, *columns))
+
+
+def _iter_folded_pages(items: List[str], page_rows: int, page_open: str, reopen: str,
+                       close: str) -> Iterator[str]:
+    """
+    第一页之后的各页，每页折叠在一个 <details> 中
+
+    Args:
+        items: 已渲染的行
+        page_rows: 每页行数
+        page_open: 折叠页开始模板（start、end、total）
+        reopen: 折叠页内重新打开表格或列表的标记
+        close: 折叠页结束标记（包含关闭表格或列表）
+
+    Yields:
+        str: 报告片段
+    """
+    total = len(items)
+    for start in range(page_rows, total, page_rows):
+        end = min(start + page_rows, total)
+        yield page_open.format(start=start + 1, end=end, total=total) + reopen + "".join(items[start:end]) + close
+
+
+class HtmlReport:
+    """
+    HTML 格式的分析报告，由单次分析结果派生
+    """
+
+    def __init__(self, result: AnalysisResult, page_rows: int = REPORT_PAGE_ROWS):
+        """
+        初始化报告
+
+        Args:
+            result: 已完成的分析结果
+            page_rows: 表格每页的行数，超过时其余行按页折叠
+        """
+        self.result = result
+        self.page_rows = max(1, int(page_rows))
+        # 模型元数据索引（显示名称、基线标记），各表格按列查找
+        self.models = result.models
+
+        # 计算了 bootstrap 置信区间时，对比表增加均值差异置信区间列
+        self.show_ci = result.bootstrap is not None
+        # 指定了多重比较校正时，对比表在 p 值后增加各方法校正后的 p 值列
+        self.show_adjusted = result.correction is not None
+
+    def iter_html(self) -> Iterator[str]:
+        """
+        逐段生成报告
+
+        Yields:
+            str: 报告片段，依次拼接即为完整文档
+        """
+        result = self.result
+        yield REPORT_HEAD
+        yield OVERVIEW_TEMPLATE.format(sample_count=result.sample_count, model_count=len(result.stats_df),
+                                       test_type=result.test_type, alpha=result.alpha)
+        yield from self._iter_stats()
+        yield from self._iter_pairwise()
+        if self.models.has_baseline:
+            yield from self._iter_baseline()
+        yield from self._iter_summary()
+        yield FOOTER_TEMPLATE.format(timestamp=pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+    def write(self, file: TextIO) -> None:
+        """
+        把报告逐段写入文件
+
+        Args:
+            file: 以文本模式打开的文件对象
+        """
+        for chunk in self.iter_html():
+            file.write(chunk)
+
+    def to_html(self) -> str:
+        """
+        生成完整的报告
+
+        Returns:
+            str: HTML格式的报告
+        """
+        return "".join(self.iter_html())
+
+    def _mark_baseline(self, names: pd.Series) -> List[str]:
+        """模型名称列（HTML 转义），基线模型后加标记"""
+        names = names.tolist()
+        return [f"{escape(str(name))} ✅" if flag else escape(str(name))
+                for name, flag in zip(names, self.models.baseline_flags(names))]
+
+    def _headers(self, *names: str) -> str:
+        return "".join(HEADER_CELL.format(name) for name in names)
+
+    def _comparison_header(self, leading: Sequence[str], trailing: Sequence[str]) -> str:
+        """对比表表头：前置列、均值差异（及置信区间）、统计量、p 值（及校正 p 值）、显著性列"""
+        header = self._headers(*leading, '均值差异')
+        if self.show_ci:
+            header += self._headers('差异置信区间')
+        header += self._headers('检验统计量', 'p值')
+        if self.show_adjusted:
+            header += self._headers(*CORRECTION_COLUMNS.values())
+        return header + self._headers(*trailing)
+
+    def _comparison_cells(self, df: pd.DataFrame, leading: List[str],
+                          leading_columns: List[List[str]], flags: Sequence[str]):
+        """对比表的行模板与各列格式化后的值"""
+        cells = list(leading) + [CELL]
+        columns = list(leading_columns) + [_format_column(df['均值差异'], '.4f')]
+        if self.show_ci:
+            cells.append(CI_CELL)
+            columns += [_format_column(df['差异CI下限'], '.4f'), _format_column(df['差异CI上限'], '.4f')]
+        cells += [CELL, CELL]
+        columns += [_format_column(df['检验统计量'], '.4f'), _format_column(df['p值'], '.4f')]
+        if self.show_adjusted:
+            for column in CORRECTION_COLUMNS.values():
+                cells.append(CELL)
+                columns.append(_format_column(df[column], '.4f'))
+        for flag in flags:
+            cells.append(FLAG_CELL)
+            columns += _flag_columns(df[flag])
+        return ROW_OPEN + "".join(cells) + ROW_CLOSE, columns
+
+    def _iter_stats(self) -> Iterator[str]:
+        """得分情况表与最佳模型"""
+        stats_df = self.result.stats_df
+        yield """
+        <h2><span class="emoji">📈</span> 得分情况</h2>"""
+        header = self._headers('模型', '样本数', '均值(百分制)', '标准差', '中位数', '25%分位数', '75%分位数')
+        template = ROW_OPEN + STRONG_CELL + CELL * 6 + ROW_CLOSE
+        rows = _render_rows(template, [
+            self._mark_baseline(stats_df['模型']),
+            _format_column(stats_df['样本数']),
+            _format_column(stats_df['均值'] * 50, '.2f'),
+            _format_column(stats_df['标准差'], '.2f'),
+            _format_column(stats_df['中位数'], '.2f'),
+            _format_column(stats_df['25%分位数'], '.2f'),
+            _format_column(stats_df['75%分位数'], '.2f'),
+        ])
+        yield from self._iter_table_rows(header, rows)
+
+        best_model = self.result.best_model
+        if best_model is not None:
+            yield BEST_MODEL_TEMPLATE.format(name=escape(str(best_model['name'])),
+                                             score=best_model['meanScore'] * 50)
+
+    def _iter_table_rows(self, header: str, rows: List[str]) -> Iterator[str]:
+        """表格第一页展开，其余各页折叠"""
+        yield TABLE_OPEN.format(header=header)
+        yield "".join(rows[:self.page_rows])
+        yield TABLE_CLOSE
+        yield from _iter_folded_pages(rows, self.page_rows, PAGE_OPEN, TABLE_OPEN.format(header=header),
+                                      TABLE_CLOSE + PAGE_CLOSE)
+
+    def _iter_pairwise(self) -> Iterator[str]:
+        """两两对比表与显著差异总结"""
+        pairwise_df = self.result.pairwise_df
+        header = self._comparison_header(['模型1', '模型2', '模型1均值', '模型2均值'], ['是否显著'])
+        yield """
+        <h2><span class="emoji">🔍</span> 两两模型对比</h2>"""
+
+        if pairwise_df is None or len(pairwise_df) == 0:
+            yield TABLE_OPEN.format(header=header) + TABLE_CLOSE + """
+        <p>无法进行两两对比分析</p>"""
+            return
+
+        template, columns = self._comparison_cells(
+            pairwise_df, [STRONG_CELL, STRONG_CELL, CELL, CELL],
+            [self._mark_baseline(pairwise_df['模型1']), self._mark_baseline(pairwise_df['模型2']),
+             _format_column(pairwise_df['模型1均值'], '.4f'), _format_column(pairwise_df['模型2均值'], '.4f')],
+            ['是否显著'])
+        yield from self._iter_table_rows(header, _render_rows(template, columns))
+
+        significant_pairs = pairwise_df[pairwise_df['是否显著'] == True]
+        if len(significant_pairs) == 0:
+            yield """
+        <h3><span class="emoji">📋</span> 显著差异总结</h3>
+        <div class="summary">
+            <p>未发现模型间存在显著差异</p>
+        </div>"""
+            return
+
+        items = _render_rows(SIGNIFICANT_ITEM, [
+            self._mark_baseline(significant_pairs['模型1']),
+            ["优于" if diff > 0 else "劣于" for diff in significant_pairs['均值差异'].tolist()],
+            self._mark_baseline(significant_pairs['模型2']),
+            _format_column(significant_pairs['均值差异'], '.4f'),
+            _format_column(significant_pairs['p值'], '.4f'),
+        ])
+        yield SIGNIFICANT_OPEN.format(count=len(significant_pairs))
+        yield "".join(items[:self.page_rows])
+        yield LIST_CLOSE
+        yield from _iter_folded_pages(items, self.page_rows, LIST_PAGE_OPEN, """
+                <ul>""", LIST_PAGE_CLOSE)
+        yield SUMMARY_CLOSE
+
+    def _iter_baseline(self) -> Iterator[str]:
+        """基线对比表与优于基线的模型"""
+        result = self.result
+        baseline_name = escape(str(self.models.baseline_name))
+        header = self._comparison_header(['模型', '模型均值', f'基线均值({baseline_name})'],
+                                         ['是否显著', '优于基线'])
+        yield BASELINE_INTRO_TEMPLATE.format(name=baseline_name)
+
+        baseline_df = result.baseline_df
+        if baseline_df is None or len(baseline_df) == 0:
+            yield TABLE_OPEN.format(header=header) + TABLE_CLOSE + """
+        <p>无法进行基线对比分析</p>"""
+            return
+
+        template, columns = self._comparison_cells(
+            baseline_df, [STRONG_CELL, CELL, CELL],
+            [self._mark_baseline(baseline_df['模型']), _format_column(baseline_df['模型均值'], '.4f'),
+             _format_column(baseline_df['基线均值'], '.4f')],
+            ['是否显著', '优于基线'])
+        yield from self._iter_table_rows(header, _render_rows(template, columns))
+
+        better_models = baseline_df[baseline_df['优于基线'] == True]
+        if len(better_models) == 0:
+            yield """
+        <h3><span class="emoji">😔</span> 基线对比结果</h3>
+        <div class="summary">
+            <p>没有模型显著优于基线</p>
+        </div>"""
+            return
+
+        yield """
+        <h3><span class="emoji">🎉</span> 优于基线的模型</h3>
+        <div class="summary">"""
+        yield "".join(_render_rows(BETTER_ITEM, [
+            self._mark_baseline(better_models['模型']),
+            _format_column(better_models['均值差异'], '.4f'),
+            _format_column(better_models['p值'], '.4f'),
+        ]))
+        yield """
+        </div>"""
+
+    def _iter_summary(self) -> Iterator[str]:
+        """分析总结"""
+        pairwise_df = self.result.pairwise_df
+        yield """
+        <h2><span class="emoji">📝</span> 分析总结</h2>
+        <div class="summary">"""
+        if pairwise_df is None:
+            yield """
+            <p>无法进行完整的对比分析</p>"""
+            return
+
+        significant_count = self.result.significant_pairs_count
+        yield f"""
+            <ul>
+                <li>共进行了 <strong>{len(pairwise_df)}</strong> 对模型对比</li>
+                <li>发现 <strong>{significant_count}</strong> 对模型存在显著差异</li>"""
+        if significant_count > 0:
+            yield """
+                <li>模型间存在显著差异，建议进一步分析具体原因</li>"""
+        else:
+            yield """
+                <li>模型间未发现显著差异，可能需要更多样本或调整评估标准</li>"""
+        yield """
+            </ul>"""
@@ -7,52 +7,182 @@
 
 import pandas as pd
 import numpy as np
-from scipy import stats
-from scipy.stats import wilcoxon, ttest_rel, mannwhitneyu
-import matplotlib.pyplot as plt
-import seaborn as sns
-from typing import List, Dict, Tuple, Optional, Union
+from functools import lru_cache
+from typing import Callable, List, Dict, Tuple, Optional, Union
+from analysis_result import AnalysisResult
+from basic_stats import column_statistics
+from chart_data import HISTOGRAM_BINS, chart_data, chart_payload
+from chart_rendering import (CHART_FORMATS, DEFAULT_DPI, FIGURE_TITLE, PANELS, ChartCache, configure_matplotlib,
+                             draw_panel, panel_size, prepare_chart_data, render_figure)
+from bootstrap import BOOTSTRAP_METHODS, bootstrap_mean_diff
+from column_detection import NUMERIC_RATIO_THRESHOLD, classify_numeric_columns
+from column_store import ColumnStore
+from dataset_cache import DatasetCache, file_digest, new_content_hash
+from model_index import ModelIndex
+from multiple_testing import CORRECTION_METHODS, CORRECTION_SCOPES, adjust_p_values
+from pair_cache import PairResultCache, cached_progress, merge_pair_stats
+from shared_matrix import SharedMatrix, SharedMatrixStore, matrix_key
+from streaming_analysis import DEFAULT_MAX_MEMORY_BYTES, DEFAULT_RESERVOIR_SIZE, StreamingComparison
+from pairwise_engine import (BASELINE_TEST_TYPES, DEFAULT_N_PERMUTATIONS, DEFAULT_PERMUTATION_TOLERANCE,
+                             MISSING_POLICIES, TEST_NAMES, all_pairs, baseline_table, compact_columns,
+                             pack_validity, pairwise_table, partial_progress, to_score_matrix)
+from parallel_pairs import run_pair_tests_parallel
+import importlib.util
 import warnings
 warnings.filterwarnings('ignore')
 
-# 设置中文字体
-plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+@lru_cache(maxsize=None)
+def _load_pyplot():
+    """按需加载 pyplot（字体设置见 configure_matplotlib）"""
+    configure_matplotlib()
+    import matplotlib.pyplot as plt
+    return plt
+
+def _resolve_csv_engine(engine: str) -> str:
+    """
+    检查 CSV 解析引擎是否可用，pyarrow 未安装时退回 pandas 默认引擎
+    """
+    if engine == 'pyarrow' and importlib.util.find_spec('pyarrow') is None:
+        print("⚠️  未安装 pyarrow，使用默认 CSV 解析引擎")
+        return 'c'
+    return engine
 
 class ModelComparisonTool:
     """
     模型对比统计分析工具类
     """
     
-    def __init__(self, csv_file_path: str, encoding: str = 'utf-8'):
+    def __init__(self, csv_file_path: str, encoding: str = 'utf-8',
+                 cache: Optional[DatasetCache] = None,
+                 dataset_key: Optional[str] = None,
+                 workers: Optional[int] = None,
+                 pair_cache: Optional[PairResultCache] = None,
+                 chart_cache: Optional[ChartCache] = None,
+                 column_store: Optional[ColumnStore] = None,
+                 matrix_store: Optional[SharedMatrixStore] = None,
+                 dataset_id: Optional[str] = None):
         """
         初始化工具
         
         Args:
             csv_file_path: CSV文件路径
             encoding: 文件编码，默认为utf-8
+            cache: 已解析数据集缓存，为None时每次都重新读取文件
+            dataset_key: 文件内容哈希，为None且启用缓存时在首次加载时计算
+            workers: 两两检验的工作进程数，None 或 1 为单进程，0 表示使用全部 CPU 核心
+            pair_cache: 模型对检验结果缓存（需同时提供 dataset_key），为None时每次都重新检验全部模型对
+            chart_cache: 图表渲染结果缓存，为None时每次都重新渲染
+            column_store: 该文件的列式二进制存储，所选列都已存储时按列内存映射加载，不解析CSV
+            matrix_store: 共享的清理后分数矩阵存储（需同时提供 dataset_id 和 dataset_key），
+                同一字段组合清理后的矩阵保存为文件，各进程映射同一份物理页；使用完毕后调用 close 释放
+            dataset_id: 数据集 ID（共享矩阵文件按数据集组织，数据集回收时一并删除）
         """
         self.csv_file_path = csv_file_path
         self.encoding = encoding
+        self.cache = cache
+        self.dataset_key = dataset_key
+        self.workers = workers
+        self.pair_cache = pair_cache
+        self.chart_cache = chart_cache
+        self.column_store = column_store
+        self.matrix_store = matrix_store
+        self.dataset_id = dataset_id
+        self._shared: Optional[SharedMatrix] = None
         self.df = None
+        self.columns = []
         self.score_columns = []
         self.model_names = []
-        
-    def load_data(self) -> pd.DataFrame:
+        self.score_matrix = None
+        self.valid_rows = None
+        self.valid_bits = None
+        self.missing_policy = 'listwise'
+        self._score_df = None
+        self._cached = None
+        
+    def load_data(self, usecols: Optional[List[str]] = None,
+                  engine: Optional[str] = None) -> pd.DataFrame:
         """
         加载CSV数据
         
+        启用缓存时，同一内容的文件只解析一次。指定 usecols 时先读取表头，
+        再仅以 float64 类型解析所需的分数字段，内存和耗时只与所选列相关。
+        缓存未命中且所选列都在列式存储中时，直接内存映射各列，不解析CSV。
+        
+        Args:
+            usecols: 只加载的列，为None时加载全部列
+            engine: CSV 解析引擎，如 'pyarrow'（需安装 pyarrow），为None时使用 pandas 默认引擎
+            
         Returns:
             pd.DataFrame: 加载的数据框
         """
         try:
-            self.df = pd.read_csv(self.csv_file_path, encoding=self.encoding)
+            if usecols is not None:
+                self.columns = self.read_header()
+                missing_cols = [col for col in usecols if col not in self.columns]
+                if missing_cols:
+                    print(f"❌ 以下字段不存在: {missing_cols}")
+                    return None
+            
+            if self.cache is not None:
+                if self.dataset_key is None:
+                    self.dataset_key = file_digest(self.csv_file_path)
+                full_key = f"{self.dataset_key}:{self.encoding}"
+                cache_key = full_key if usecols is None else f"{full_key}:{'|'.join(usecols)}"
+                # 完整数据已缓存时，投影加载直接复用
+                self._cached = self.cache.get(full_key) or self.cache.get(cache_key)
+                if self._cached is not None:
+                    self.df = self._cached.df
+                    print(f"♻️  使用缓存数据，共 {len(self.df)} 行，{len(self.df.columns)} 列")
+                    return self.df
+            
+            if usecols is not None and self.column_store is not None and self.column_store.has(usecols):
+                # 内存映射的列只在读取时占用页缓存，不放入数据集缓存
+                self._cached = None
+                self.df = self.column_store.frame(usecols)
+                print(f"⚡ 使用列式存储，共 {len(self.df)} 行，{len(self.df.columns)} 列")
+                return self.df
+            
+            read_kwargs = {'encoding': self.encoding}
+            if engine is not None:
+                read_kwargs['engine'] = _resolve_csv_engine(engine)
+            if usecols is None:
+                self.df = pd.read_csv(self.csv_file_path, **read_kwargs)
+            else:
+                self.df = self._read_score_columns(usecols, read_kwargs)
+            
+            if self.cache is not None:
+                self._cached = self.cache.put(cache_key, self.df)
             print(f"✅ 成功加载数据，共 {len(self.df)} 行，{len(self.df.columns)} 列")
             return self.df
         except Exception as e:
             print(f"❌ 加载数据失败: {e}")
             return None
     
+    def read_header(self) -> List[str]:
+        """
+        只读取CSV表头（有列式存储时直接使用其清单中的列名）
+        
+        Returns:
+            List[str]: 列名列表
+        """
+        if self.column_store is not None:
+            return list(self.column_store.columns)
+        return pd.read_csv(self.csv_file_path, encoding=self.encoding, nrows=0).columns.tolist()
+    
+    def _read_score_columns(self, usecols: List[str], read_kwargs: Dict) -> pd.DataFrame:
+        """
+        以 float64 类型解析指定列，列中含非数值内容时退回到按推断类型解析
+        """
+        usecols = list(dict.fromkeys(usecols))
+        try:
+            df = pd.read_csv(self.csv_file_path, usecols=usecols,
+                             dtype={col: np.float64 for col in usecols}, **read_kwargs)
+        except (ValueError, TypeError):
+            print("⚠️  分数字段包含非数值内容，按推断类型解析")
+            df = pd.read_csv(self.csv_file_path, usecols=usecols, **read_kwargs)
+        # usecols 不保证列顺序，按请求顺序排列
+        return df[usecols]
+    
     def detect_score_columns(self, pattern: str = "分_") -> List[str]:
         """
         自动检测分数字段
@@ -63,12 +193,9 @@ class ModelComparisonTool:
         Returns:
             List[str]: 分数字段列表
         """
-        if self.df is None:
-            print("❌ 请先加载数据")
-            return []
-        
-        # 查找包含分数字段的列
-        score_columns = [col for col in self.df.columns if pattern in col]
+        # 查找包含分数字段的列（未加载数据时按表头查找）
+        columns = self.df.columns if self.df is not None else self.read_header()
+        score_columns = [col for col in columns if pattern in col]
         self.score_columns = score_columns
         self.model_names = [col.replace(pattern, "") for col in score_columns]
         
@@ -78,20 +205,41 @@ class ModelComparisonTool:
         
         return score_columns
     
+    def detect_numeric_columns(self, threshold: float = NUMERIC_RATIO_THRESHOLD) -> List[str]:
+        """
+        识别数值列（至少 threshold 比例的值可以转换为数值）
+        
+        识别过程中得到的数值化数组会存入数据集缓存，供 clean_score_data 复用
+        
+        Args:
+            threshold: 可转换比例阈值
+            
+        Returns:
+            List[str]: 数值列列表
+        """
+        if self.df is None:
+            print("❌ 请先加载数据")
+            return []
+        
+        numeric_columns, coerced = classify_numeric_columns(self.df, threshold=threshold)
+        if self._cached is not None and self._cached.df is self.df:
+            for col, values in coerced.items():
+                self._cached.store_numeric(col, values)
+        return numeric_columns
+    
     def set_score_columns(self, score_columns: List[str], model_names: Optional[List[str]] = None):
         """
         手动设置分数字段
         
+        未加载数据时按CSV表头验证字段，便于直接进行流式分析
+        
         Args:
             score_columns: 分数字段列表
             model_names: 模型名称列表，如果为None则从字段名自动提取
         """
-        if self.df is None:
-            print("❌ 请先加载数据")
-            return
-        
-        # 验证字段是否存在
-        missing_cols = [col for col in score_columns if col not in self.df.columns]
+        # 验证字段是否存在（流式模式下未加载数据，按表头验证）
+        available_columns = self.df.columns if self.df is not None else self.read_header()
+        missing_cols = [col for col in score_columns if col not in available_columns]
         if missing_cols:
             print(f"❌ 以下字段不存在: {missing_cols}")
             return
@@ -104,83 +252,221 @@ class ModelComparisonTool:
         
         print(f"✅ 设置完成，共 {len(score_columns)} 个模型")
     
-    def clean_score_data(self) -> pd.DataFrame:
+    def clean_score_matrix(self, dtype=np.float64,
+                           missing: str = 'listwise') -> Optional[Tuple[np.ndarray, np.ndarray]]:
         """
-        清理分数字据，处理缺失值和异常值
+        清理分数字据，直接生成分数矩阵及行有效掩码
         
+        各分数字段逐列数值化后写入同一个按列连续存储的矩阵，同时累积行有效掩码；
+        需要移除的行在同一块内存中原地压缩，不产生中间数据框或整表副本。
+        启用共享矩阵存储时，已有其他请求或进程清理过同一字段组合的矩阵则直接映射该文件，
+        否则清理后保存为文件再映射（矩阵只读）。
+        
+        Args:
+            dtype: 矩阵数据类型，np.float64（默认）或 np.float32（内存减半，精度降低）
+            missing: 缺失值处理方式，'listwise'（默认）移除任一分数缺失的行；
+                'pairwise' 只移除全部分数缺失的行，并按列记录有效值位掩码，
+                每对模型只使用两者均有效的行
+            
         Returns:
-            pd.DataFrame: 清理后的数据
+            Optional[Tuple[np.ndarray, np.ndarray]]: (形状为 (保留行数, 模型数) 的 Fortran 顺序矩阵,
+                原数据每行是否保留的布尔掩码)
         """
         if not self.score_columns:
             print("❌ 请先设置分数字段")
             return None
+        if self.df is None:
+            print("❌ 请先加载数据")
+            return None
+        if missing not in MISSING_POLICIES:
+            print(f"❌ 不支持的缺失值处理方式: {missing}")
+            return None
         
-        # 创建分数字据的副本
-        score_df = self.df[self.score_columns].copy()
-        
-        # 转换数据类型
-        for col in self.score_columns:
-            score_df[col] = pd.to_numeric(score_df[col], errors='coerce')
+        shared_key = None
+        if self.matrix_store is not None and self.dataset_id and self.dataset_key:
+            shared_key = matrix_key(self.dataset_key, self.encoding, self.score_columns, missing, dtype)
+            shared = self.matrix_store.acquire(self.dataset_id, shared_key)
+            if shared is not None and len(shared.valid_rows) == len(self.df):
+                self._use_shared(shared, missing)
+                print(f"♻️  使用共享分数矩阵，剩余 {shared.matrix.shape[0]} 行有效数据")
+                return shared.matrix, shared.valid_rows
+            if shared is not None:
+                self.matrix_store.release(shared)
+        
+        n_rows, n_cols = len(self.df), len(self.score_columns)
+        matrix = np.empty((n_rows, n_cols), dtype=dtype, order='F')
+        complete_rows = np.ones(n_rows, dtype=bool)
+        any_valid_rows = np.zeros(n_rows, dtype=bool)
+        missing_count = {}
+        
+        # 转换数据类型（命中缓存时复用已转换的列），每次只处理一列
+        use_cache = self._cached is not None and self._cached.df is self.df
+        for j, col in enumerate(self.score_columns):
+            if use_cache:
+                matrix[:, j] = self._cached.numeric_column(col)
+            else:
+                matrix[:, j] = pd.to_numeric(self.df[col], errors='coerce').to_numpy(dtype=np.float64)
+            column_valid = ~np.isnan(matrix[:, j])
+            missing_count[col] = n_rows - int(np.count_nonzero(column_valid))
+            complete_rows &= column_valid
+            any_valid_rows |= column_valid
         
         # 统计缺失值
-        missing_count = score_df.isnull().sum()
-        if missing_count.sum() > 0:
+        if sum(missing_count.values()) > 0:
             print("⚠️  发现缺失值:")
             for col, count in missing_count.items():
                 if count > 0:
                     print(f"  {col}: {count} 个缺失值")
         
-        # 移除包含缺失值的行
-        original_len = len(score_df)
-        score_df = score_df.dropna()
-        removed_len = original_len - len(score_df)
+        # listwise 移除含缺失值的行，pairwise 只移除没有任何有效分数的行
+        valid_rows = complete_rows if missing == 'listwise' else any_valid_rows
         
+        # 逐列前移到同一缓冲区的前部（第 j 列写入位置不会超过其原位置）
+        n_valid = int(np.count_nonzero(valid_rows))
+        removed_len = n_rows - n_valid
         if removed_len > 0:
-            print(f"🧹 移除了 {removed_len} 行包含缺失值的数据")
+            flat = matrix.ravel(order='F')
+            for j in range(n_cols):
+                flat[j * n_valid:(j + 1) * n_valid] = matrix[valid_rows, j]
+            matrix = flat[:n_valid * n_cols].reshape((n_valid, n_cols), order='F')
+            if missing == 'listwise':
+                print(f"🧹 移除了 {removed_len} 行包含缺失值的数据")
+            else:
+                print(f"🧹 移除了 {removed_len} 行全部分数缺失的数据")
+        
+        print(f"✅ 数据清理完成，剩余 {n_valid} 行有效数据")
+        self.score_matrix = matrix
+        self.valid_rows = valid_rows
+        self.missing_policy = missing
+        # 保留的行仍有缺失值时，按列记录有效值位掩码供各模型对求交集
+        has_missing = n_valid > int(np.count_nonzero(complete_rows))
+        self.valid_bits = pack_validity(matrix) if has_missing else None
+        
+        if shared_key is not None:
+            # 保存为共享矩阵文件，本进程及检验子进程改为映射该文件
+            try:
+                shared = self.matrix_store.publish(self.dataset_id, shared_key, matrix,
+                                                   valid_rows, self.valid_bits)
+            except OSError as e:
+                print(f"⚠️  保存共享分数矩阵失败: {e}")
+            else:
+                self._use_shared(shared, missing)
+                return shared.matrix, valid_rows
+        self._release_shared()
+        return matrix, valid_rows
+    
+    def _use_shared(self, shared: SharedMatrix, missing: str) -> None:
+        """改用共享矩阵（释放之前持有的共享矩阵引用）"""
+        self._release_shared()
+        self._shared = shared
+        self.score_matrix = shared.matrix
+        self.valid_rows = shared.valid_rows
+        self.valid_bits = shared.valid_bits
+        self.missing_policy = missing
+    
+    def _release_shared(self) -> None:
+        if self._shared is not None:
+            self.matrix_store.release(self._shared)
+            self._shared = None
+    
+    def close(self) -> None:
+        """释放持有的共享分数矩阵引用（数据集回收时文件在最后一个引用释放后删除）"""
+        self._release_shared()
+    
+    def clean_score_data(self, dtype=np.float64, missing: str = 'listwise') -> pd.DataFrame:
+        """
+        清理分数字据，处理缺失值和异常值
+        
+        返回的数据框直接引用 clean_score_matrix 生成的矩阵（不复制），
+        后续统计和检验识别到该数据框时直接使用矩阵
+        
+        Args:
+            dtype: 分数数据类型，np.float64（默认）或 np.float32
+            missing: 缺失值处理方式，'listwise'（默认）或 'pairwise'（见 clean_score_matrix）
+            
+        Returns:
+            pd.DataFrame: 清理后的数据
+        """
+        cleaned = self.clean_score_matrix(dtype=dtype, missing=missing)
+        if cleaned is None:
+            return None
+        matrix, valid_rows = cleaned
         
-        print(f"✅ 数据清理完成，剩余 {len(score_df)} 行有效数据")
+        score_df = pd.DataFrame(matrix, index=self.df.index[valid_rows],
+                                columns=self.score_columns, copy=False)
+        self._score_df = score_df
         return score_df
     
+    def chart_data(self, score_df: pd.DataFrame, bins: int = HISTOGRAM_BINS) -> Dict:
+        """
+        计算前端绘图所需的汇总数据（箱线图五数概括与须线、统一分箱的直方图频次、均值、相关系数矩阵）
+        
+        全部由分数矩阵用 NumPy 一次算出，不依赖 matplotlib
+        
+        Args:
+            score_df: 分数字据框
+            bins: 直方图分箱数
+            
+        Returns:
+            Dict: /api/charts 格式的图表数据
+        """
+        matrix = self._matrix_of(score_df)
+        return chart_payload(chart_data(matrix, bins=bins), self._display_names(), sample_count=len(score_df))
+    
     def calculate_basic_stats(self, score_df: pd.DataFrame) -> pd.DataFrame:
         """
         计算基本统计信息
         
+        所有分数字段在一个矩阵上批量计算，每列只排序一次（各列分别忽略缺失值）
+        
         Args:
             score_df: 分数字据框
             
         Returns:
             pd.DataFrame: 统计信息
         """
-        stats_data = []
-        
-        for i, col in enumerate(self.score_columns):
-            scores = score_df[col].dropna()
-            model_name = self.model_names[i] if i < len(self.model_names) else col
-            stats_data.append({
-                '模型': model_name,
-                '样本数': len(scores),
-                '均值': scores.mean(),
-                '标准差': scores.std(),
-                '中位数': scores.median(),
-                '最小值': scores.min(),
-                '最大值': scores.max(),
-                '25%分位数': scores.quantile(0.25),
-                '75%分位数': scores.quantile(0.75)
-            })
-        
-        stats_df = pd.DataFrame(stats_data)
+        column_stats = column_statistics(self._matrix_of(score_df))
+        
+        stats_df = pd.DataFrame({
+            '模型': self._display_names(),
+            '样本数': column_stats['count'],
+            '均值': column_stats['mean'],
+            '标准差': column_stats['std'],
+            '中位数': column_stats['median'],
+            '最小值': column_stats['min'],
+            '最大值': column_stats['max'],
+            '25%分位数': column_stats['q25'],
+            '75%分位数': column_stats['q75']
+        })
         return stats_df
     
     def pairwise_comparison(self, score_df: pd.DataFrame, 
                           test_type: str = 'wilcoxon',
-                          alpha: float = 0.05) -> pd.DataFrame:
+                          alpha: float = 0.05,
+                          n_bootstrap: int = 0,
+                          ci_method: str = 'percentile',
+                          seed: Optional[int] = None,
+                          n_permutations: int = DEFAULT_N_PERMUTATIONS,
+                          permutation_seed: Optional[int] = None,
+                          tolerance: float = DEFAULT_PERMUTATION_TOLERANCE,
+                          correction: Optional[str] = None) -> pd.DataFrame:
         """
         进行两两模型对比
         
+        所有模型对在一个 NumPy 矩阵上批量检验，避免逐对调用 scipy
+        
         Args:
             score_df: 分数字据框
-            test_type: 统计检验类型 ('wilcoxon', 'ttest', 'mannwhitney')
+            test_type: 统计检验类型 ('wilcoxon', 'ttest', 'mannwhitney', 'permutation')
             alpha: 显著性水平
+            n_bootstrap: 均值差异 bootstrap 置信区间的重采样次数，0 表示不计算
+            ci_method: 置信区间方法 ('percentile', 'bca')，置信水平为 1 - alpha
+            seed: bootstrap 随机种子
+            n_permutations: 置换检验的随机符号翻转次数
+            permutation_seed: 置换检验的随机种子（所有模型对共用同一组符号翻转）
+            tolerance: 置换检验提前停止的容差（p 值置信区间的错误概率），0 表示不提前停止
+            correction: 多重比较校正方法 ('bonferroni', 'holm', 'hochberg', 'bh')，指定时增加各方法
+                校正后的 p 值列并按该方法判断显著性，为None时使用原始 p 值
             
         Returns:
             pd.DataFrame: 对比结果
@@ -189,79 +475,39 @@ class ModelComparisonTool:
             print("❌ 至少需要2个模型进行对比")
             return None
         
-        results = []
-        
-        for i in range(len(self.score_columns)):
-            for j in range(i + 1, len(self.score_columns)):
-                model1_col = self.score_columns[i]
-                model2_col = self.score_columns[j]
-                model1_name = self.model_names[i] if i < len(self.model_names) else model1_col
-                model2_name = self.model_names[j] if j < len(self.model_names) else model2_col
-                
-                scores1 = score_df[model1_col].dropna()
-                scores2 = score_df[model2_col].dropna()
-                
-                # 确保两个模型的数据长度一致
-                min_len = min(len(scores1), len(scores2))
-                if min_len == 0:
-                    continue
-                
-                scores1 = scores1.iloc[:min_len]
-                scores2 = scores2.iloc[:min_len]
-                
-                # 计算差异
-                diff = scores1 - scores2
-                mean_diff = diff.mean()
-                
-                # 进行统计检验
-                if test_type == 'wilcoxon':
-                    try:
-                        stat, p_value = wilcoxon(scores1, scores2, alternative='two-sided')
-                        test_name = "Wilcoxon符号秩检验"
-                    except ValueError:
-                        stat, p_value = np.nan, np.nan
-                        test_name = "Wilcoxon符号秩检验(无法计算)"
-                elif test_type == 'ttest':
-                    try:
-                        stat, p_value = ttest_rel(scores1, scores2)
-                        test_name = "配对t检验"
-                    except ValueError:
-                        stat, p_value = np.nan, np.nan
-                        test_name = "配对t检验(无法计算)"
-                elif test_type == 'mannwhitney':
-                    try:
-                        stat, p_value = mannwhitneyu(scores1, scores2, alternative='two-sided')
-                        test_name = "Mann-Whitney U检验"
-                    except ValueError:
-                        stat, p_value = np.nan, np.nan
-                        test_name = "Mann-Whitney U检验(无法计算)"
-                else:
-                    print(f"❌ 不支持的检验类型: {test_type}")
-                    continue
-                
-                # 判断显著性
-                is_significant = p_value < alpha if not np.isnan(p_value) else False
-                
-                results.append({
-                    '模型1': model1_name,
-                    '模型2': model2_name,
-                    '模型1均值': scores1.mean(),
-                    '模型2均值': scores2.mean(),
-                    '均值差异': mean_diff,
-                    '检验统计量': stat,
-                    'p值': p_value,
-                    '显著性水平': alpha,
-                    '是否显著': is_significant,
-                    '检验方法': test_name
-                })
-        
-        results_df = pd.DataFrame(results)
-        return results_df
+        if test_type not in TEST_NAMES:
+            print(f"❌ 不支持的检验类型: {test_type}")
+            return pd.DataFrame()
+        
+        if ci_method not in BOOTSTRAP_METHODS:
+            print(f"❌ 不支持的置信区间方法: {ci_method}")
+            return pd.DataFrame()
+        
+        if correction is not None and correction not in CORRECTION_METHODS:
+            print(f"❌ 不支持的多重比较校正方法: {correction}")
+            return pd.DataFrame()
+        
+        idx_a, idx_b = all_pairs(len(self.score_columns))
+        pair_stats = self._run_pair_tests(score_df, idx_a, idx_b, test_type, alpha=alpha,
+                                          n_bootstrap=n_bootstrap, ci_method=ci_method, seed=seed,
+                                          n_permutations=n_permutations, permutation_seed=permutation_seed,
+                                          tolerance=tolerance)
+        if correction:
+            pair_stats.update(adjust_p_values(pair_stats['p_value']))
+        return pairwise_table(self._display_names(), idx_a, idx_b, pair_stats, test_type, alpha,
+                              include_n=self._is_pairwise(score_df), correction=correction)
     
     def baseline_comparison(self, score_df: pd.DataFrame, 
                            baseline_model: str,
                            test_type: str = 'wilcoxon',
-                           alpha: float = 0.05) -> pd.DataFrame:
+                           alpha: float = 0.05,
+                           n_bootstrap: int = 0,
+                           ci_method: str = 'percentile',
+                           seed: Optional[int] = None,
+                           n_permutations: int = DEFAULT_N_PERMUTATIONS,
+                           permutation_seed: Optional[int] = None,
+                           tolerance: float = DEFAULT_PERMUTATION_TOLERANCE,
+                           correction: Optional[str] = None) -> pd.DataFrame:
         """
         与基线模型对比
         
@@ -270,6 +516,13 @@ class ModelComparisonTool:
             baseline_model: 基线模型名称
             test_type: 统计检验类型
             alpha: 显著性水平
+            n_bootstrap: 均值差异 bootstrap 置信区间的重采样次数，0 表示不计算
+            ci_method: 置信区间方法 ('percentile', 'bca')
+            seed: bootstrap 随机种子
+            n_permutations: 置换检验的随机符号翻转次数
+            permutation_seed: 置换检验的随机种子（所有模型对共用同一组符号翻转）
+            tolerance: 置换检验提前停止的容差
+            correction: 多重比较校正方法，在全部基线模型对中校正
             
         Returns:
             pd.DataFrame: 对比结果
@@ -278,131 +531,299 @@ class ModelComparisonTool:
             print(f"❌ 基线模型 {baseline_model} 不存在")
             return None
         
-        results = []
-        baseline_scores = score_df[baseline_model].dropna()
+        if test_type not in BASELINE_TEST_TYPES:
+            print(f"❌ 不支持的检验类型: {test_type}")
+            return pd.DataFrame()
+        
+        if ci_method not in BOOTSTRAP_METHODS:
+            print(f"❌ 不支持的置信区间方法: {ci_method}")
+            return pd.DataFrame()
+        
+        if correction is not None and correction not in CORRECTION_METHODS:
+            print(f"❌ 不支持的多重比较校正方法: {correction}")
+            return pd.DataFrame()
+        
+        baseline_idx = self.score_columns.index(baseline_model)
+        idx_a = [i for i in range(len(self.score_columns)) if i != baseline_idx]
+        idx_b = [baseline_idx] * len(idx_a)
+        pair_stats = self._run_pair_tests(score_df, idx_a, idx_b, test_type, alpha=alpha,
+                                          n_bootstrap=n_bootstrap, ci_method=ci_method, seed=seed,
+                                          n_permutations=n_permutations, permutation_seed=permutation_seed,
+                                          tolerance=tolerance)
+        if correction:
+            pair_stats.update(adjust_p_values(pair_stats['p_value']))
+        return baseline_table(self._display_names(), baseline_model, idx_a, pair_stats, test_type, alpha,
+                              include_n=self._is_pairwise(score_df), correction=correction)
+    
+    def _run_pair_tests(self, score_df: pd.DataFrame, idx_a, idx_b, test_type: str,
+                        progress: Optional[Callable] = None,
+                        alpha: float = 0.05,
+                        n_bootstrap: int = 0,
+                        ci_method: str = 'percentile',
+                        seed: Optional[int] = None,
+                        n_permutations: int = DEFAULT_N_PERMUTATIONS,
+                        permutation_seed: Optional[int] = None,
+                        tolerance: float = DEFAULT_PERMUTATION_TOLERANCE) -> Dict[str, np.ndarray]:
+        """
+        批量检验模型对，设置了多个工作进程时按模型对分片并行计算（置换检验按 alpha 提前停止）；
+        n_bootstrap 大于 0 时在同一矩阵上追加均值差异的 1 - alpha 置信区间（ci_low、ci_high）。
+        启用了模型对结果缓存时只检验未命中的模型对
+        """
+        matrix = self._score_matrix(score_df)
+        valid_bits = self.valid_bits if self._is_pairwise(score_df) else None
+        # 共享矩阵文件直接交给检验子进程映射
+        matrix_file = self._shared.path if self._shared is not None and matrix is self._shared.matrix else None
+        idx_a = np.asarray(idx_a, dtype=np.intp)
+        idx_b = np.asarray(idx_b, dtype=np.intp)
+        
+        def compute(pair_a: np.ndarray, pair_b: np.ndarray, callback: Optional[Callable]) -> Dict[str, np.ndarray]:
+            pair_stats = run_pair_tests_parallel(matrix, pair_a, pair_b, test_type, workers=self.workers,
+                                                 progress=callback, valid_bits=valid_bits,
+                                                 n_permutations=n_permutations, seed=permutation_seed,
+                                                 tolerance=tolerance, alpha=alpha, matrix_file=matrix_file)
+            if n_bootstrap > 0:
+                pair_stats.update(bootstrap_mean_diff(matrix, pair_a, pair_b, n_resamples=n_bootstrap,
+                                                      confidence=1 - alpha, method=ci_method, seed=seed))
+            return pair_stats
+        
+        # 结果受 alpha 或随机种子影响的参数计入缓存键；未设置随机种子的结果不可复现，不使用缓存
+        options = ()
+        reproducible = True
+        if test_type == 'permutation':
+            options += ('permutation', n_permutations, permutation_seed, tolerance, alpha if tolerance > 0 else None)
+            reproducible = permutation_seed is not None
+        if n_bootstrap > 0:
+            options += ('bootstrap', n_bootstrap, ci_method, seed, alpha)
+            reproducible = reproducible and seed is not None
+        keys = self._pair_cache_keys(score_df, idx_a, idx_b, test_type, options) if reproducible else None
+        if keys is None:
+            return compute(idx_a, idx_b, progress)
+        
+        cached = self.pair_cache.get_many(keys)
+        todo = np.flatnonzero([entry is None for entry in cached])
+        computed = None
+        if len(todo) > 0:
+            computed = compute(idx_a[todo], idx_b[todo], cached_progress(progress, cached, todo))
+            self.pair_cache.put_many([keys[k] for k in todo], computed)
+        if len(todo) < len(keys):
+            print(f"♻️  复用 {len(keys) - len(todo)} 对已缓存的检验结果，新检验 {len(todo)} 对")
+        pair_stats = merge_pair_stats(cached, todo, computed)
+        if len(todo) == 0 and progress is not None:
+            progress(len(keys), pair_stats)
+        return pair_stats
+    
+    def _pair_cache_keys(self, score_df: pd.DataFrame, idx_a: np.ndarray, idx_b: np.ndarray,
+                         test_type: str, options: Tuple) -> Optional[List[Tuple]]:
+        """
+        各模型对的结果缓存键
         
-        for i, model in enumerate(self.score_columns):
-            if model == baseline_model:
-                continue
-            
-            model_scores = score_df[model].dropna()
-            model_name = self.model_names[i] if i < len(self.model_names) else model
-            
-            # 确保数据长度一致
-            min_len = min(len(baseline_scores), len(model_scores))
-            if min_len == 0:
-                continue
-            
-            baseline_subset = baseline_scores.iloc[:min_len]
-            model_subset = model_scores.iloc[:min_len]
-            
-            # 计算差异
-            diff = model_subset - baseline_subset
-            mean_diff = diff.mean()
-            
-            # 进行统计检验
-            if test_type == 'wilcoxon':
-                try:
-                    stat, p_value = wilcoxon(model_subset, baseline_subset, alternative='two-sided')
-                    test_name = "Wilcoxon符号秩检验"
-                except ValueError:
-                    stat, p_value = np.nan, np.nan
-                    test_name = "Wilcoxon符号秩检验(无法计算)"
-            elif test_type == 'ttest':
-                try:
-                    stat, p_value = ttest_rel(model_subset, baseline_subset)
-                    test_name = "配对t检验"
-                except ValueError:
-                    stat, p_value = np.nan, np.nan
-                    test_name = "配对t检验(无法计算)"
-            else:
-                print(f"❌ 不支持的检验类型: {test_type}")
-                continue
-            
-            # 判断显著性
-            is_significant = p_value < alpha if not np.isnan(p_value) else False
+        保留行的摘要计入键中：listwise 方式下增删含缺失值的列会改变保留的行，相关模型对需要重新检验。
+        未启用缓存、缺少数据集哈希或 score_df 不是 clean_score_data 的结果时返回 None
+        """
+        if self.pair_cache is None or self.dataset_key is None or len(idx_a) == 0:
+            return None
+        if self.score_matrix is None or self._matrix_of(score_df) is not self.score_matrix:
+            return None
+        
+        rows = new_content_hash()
+        rows.update(np.packbits(self.valid_rows).tobytes())
+        rows.update(str(len(self.valid_rows)).encode())
+        prefix = (self.dataset_key, self.encoding, rows.hexdigest(), self.score_matrix.dtype.str)
+        return [prefix + (self.score_columns[i], self.score_columns[j], test_type, self.missing_policy, options)
+                for i, j in zip(idx_a, idx_b)]
+    
+    def model_index(self, baseline_model: Optional[str] = None) -> ModelIndex:
+        """
+        构建当前分数字段的模型元数据索引（字段名、显示名称、基线标记与列位置）
+        
+        Args:
+            baseline_model: 基线模型字段名
             
-            # 判断模型是否优于基线
-            better_than_baseline = mean_diff > 0 and is_significant
+        Returns:
+            ModelIndex: 模型元数据索引
+        """
+        return ModelIndex(self.score_columns, self.model_names, baseline_model)
+    
+    def _display_names(self) -> List[str]:
+        """各分数字段对应的模型名称，未设置名称的字段使用字段名"""
+        return self.model_index().names
+    
+    def _matrix_of(self, score_df: pd.DataFrame) -> np.ndarray:
+        """
+        分数字段对应的矩阵：clean_score_data 返回的数据框直接使用其底层矩阵，其他数据框转换得到
+        """
+        if (score_df is self._score_df and self.score_matrix is not None
+                and list(score_df.columns) == self.score_columns):
+            return self.score_matrix
+        return to_score_matrix(score_df[self.score_columns])
+    
+    def _is_pairwise(self, score_df: pd.DataFrame) -> bool:
+        """score_df 是否为按 pairwise 方式清理得到的数据（各对样本数可能不同）"""
+        return self.missing_policy == 'pairwise' and self._matrix_of(score_df) is self.score_matrix
+    
+    def _score_matrix(self, score_df: pd.DataFrame) -> np.ndarray:
+        """
+        将分数字据转换为批量检验使用的矩阵
+        
+        pairwise 方式清理的数据保留缺失值，由每对的有效行交集处理；
+        其他数据若仍存在缺失值，则按旧版逐列 dropna 后截断到较短长度的方式对齐
+        """
+        matrix = self._matrix_of(score_df)
+        if not self._is_pairwise(score_df) and np.isnan(matrix).any():
+            matrix = compact_columns(matrix)
+        return matrix
+    
+    def streaming_comparison(self, max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+                             spill: bool = False,
+                             spill_dir: Optional[str] = None,
+                             reservoir_size: int = DEFAULT_RESERVOIR_SIZE,
+                             seed: Optional[int] = None) -> Optional[StreamingComparison]:
+        """
+        以流式分块方式分析当前分数字段，不加载完整数据表
+        
+        Args:
+            max_memory_bytes: 内存上限（字节）
+            spill: 是否将清理后的数据写入磁盘以支持秩检验
+            spill_dir: 磁盘缓存目录
+            reservoir_size: 分位数抽样容量（行）
+            seed: 抽样随机种子
             
-            results.append({
-                '模型': model_name,
-                '基线模型': baseline_model,
-                '模型均值': model_subset.mean(),
-                '基线均值': baseline_subset.mean(),
-                '均值差异': mean_diff,
-                '检验统计量': stat,
-                'p值': p_value,
-                '显著性水平': alpha,
-                '是否显著': is_significant,
-                '优于基线': better_than_baseline,
-                '检验方法': test_name
-            })
-        
-        results_df = pd.DataFrame(results)
-        return results_df
+        Returns:
+            Optional[StreamingComparison]: 已读取完毕的流式分析对象，需调用 close() 释放磁盘缓存
+        """
+        if not self.score_columns:
+            print("❌ 请先设置分数字段")
+            return None
+        
+        streaming = StreamingComparison(
+            self.csv_file_path, self.score_columns, self._display_names(),
+            encoding=self.encoding, max_memory_bytes=max_memory_bytes,
+            reservoir_size=reservoir_size, spill=spill, spill_dir=spill_dir, seed=seed
+        )
+        try:
+            return streaming.run()
+        except Exception:
+            streaming.close()
+            raise
     
     def create_visualization(self, score_df: pd.DataFrame, 
-                           save_path: Optional[str] = None) -> None:
+                           save_path: Optional[str] = None,
+                           fmt: Optional[str] = None,
+                           dpi: int = DEFAULT_DPI,
+                           workers: Optional[int] = None) -> None:
         """
         创建可视化图表
         
+        图表数据（分位数、直方图分箱频次、相关系数矩阵）用 NumPy 一次算出，
+        保存时四个子图各自渲染后拼接，模型较多时省略数值标注
+        
         Args:
             score_df: 分数字据框
             save_path: 保存路径，如果为None则显示图表
+            fmt: 图片格式 ('png', 'svg')，为None时按 save_path 的扩展名确定（默认 png）
+            dpi: 分辨率
+            workers: 子图渲染的工作进程数，为None时使用初始化时的 workers
         """
-        # 设置图表样式
-        plt.style.use('default')
-        
-        # 创建子图
-        fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-        fig.suptitle('模型对比分析可视化', fontsize=16, fontweight='bold')
-        
-        # 1. 箱线图
-        ax1 = axes[0, 0]
-        score_df.boxplot(ax=ax1, rot=45)
-        ax1.set_title('模型得分分布箱线图')
-        ax1.set_ylabel('得分')
-        
-        # 2. 密度图
-        ax2 = axes[0, 1]
-        for col in self.score_columns:
-            scores = score_df[col].dropna()
-            ax2.hist(scores, alpha=0.6, label=col, bins=20)
-        ax2.set_title('模型得分分布直方图')
-        ax2.set_xlabel('得分')
-        ax2.set_ylabel('频次')
-        ax2.legend()
-        
-        # 3. 均值对比条形图
-        ax3 = axes[1, 0]
-        means = [score_df[col].mean() for col in self.score_columns]
-        bars = ax3.bar(range(len(self.score_columns)), means)
-        ax3.set_title('模型平均得分对比')
-        ax3.set_xlabel('模型')
-        ax3.set_ylabel('平均得分')
-        ax3.set_xticks(range(len(self.score_columns)))
-        ax3.set_xticklabels(self.score_columns, rotation=45)
-        
-        # 添加数值标签
-        for i, bar in enumerate(bars):
-            height = bar.get_height()
-            ax3.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{height:.3f}', ha='center', va='bottom')
-        
-        # 4. 相关性热力图
-        ax4 = axes[1, 1]
-        corr_matrix = score_df.corr()
-        sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', center=0, ax=ax4)
-        ax4.set_title('模型得分相关性热力图')
+        if fmt is None:
+            fmt = 'svg' if save_path and save_path.lower().endswith('.svg') else 'png'
+        if fmt not in CHART_FORMATS:
+            print(f"❌ 不支持的图片格式: {fmt}，可选: {', '.join(CHART_FORMATS)}")
+            return
         
-        plt.tight_layout()
+        matrix = self._matrix_of(score_df)
+        names = list(self.score_columns)
         
         if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            figure = render_figure(matrix, names, fmt=fmt, dpi=dpi,
+                                   workers=self.workers if workers is None else workers,
+                                   cache=self.chart_cache)
+            with open(save_path, 'wb') as f:
+                f.write(figure)
             print(f"📊 图表已保存到: {save_path}")
-        else:
-            plt.show()
+            return
+        
+        plt = _load_pyplot()
+        data = prepare_chart_data(matrix)
+        sizes = [panel_size(panel, len(names)) for panel in PANELS]
+        fig, axes = plt.subplots(2, 2, figsize=(max(sizes[0][0], sizes[2][0]) + max(sizes[1][0], sizes[3][0]),
+                                                max(sizes[0][1], sizes[1][1]) + max(sizes[2][1], sizes[3][1])))
+        fig.suptitle(FIGURE_TITLE, fontsize=16, fontweight='bold')
+        for ax, panel in zip(axes.ravel(), PANELS):
+            draw_panel(fig, ax, panel, data, names)
+        plt.tight_layout()
+        plt.show()
+    
+    def analyze(self, score_df: pd.DataFrame,
+                test_type: str = 'wilcoxon',
+                alpha: float = 0.05,
+                baseline_model: Optional[str] = None,
+                progress: Optional[Callable[[int, int, Callable[[], pd.DataFrame]], None]] = None,
+                n_bootstrap: int = 0,
+                ci_method: str = 'percentile',
+                seed: Optional[int] = None,
+                n_permutations: int = DEFAULT_N_PERMUTATIONS,
+                permutation_seed: Optional[int] = None,
+                tolerance: float = DEFAULT_PERMUTATION_TOLERANCE,
+                correction: Optional[str] = None,
+                correction_scope: str = 'table'
+                ) -> AnalysisResult:
+        """
+        对全部模型对进行一次检验，得到可派生各类结果的分析对象
+        
+        Args:
+            score_df: 分数字据框
+            test_type: 统计检验类型
+            alpha: 显著性水平
+            baseline_model: 基线模型字段名
+            progress: 进度回调 progress(已完成对数, 总对数, partial)，
+                partial() 返回已完成部分的两两对比表
+            n_bootstrap: 均值差异 bootstrap 置信区间的重采样次数，0 表示不计算
+            ci_method: 置信区间方法 ('percentile', 'bca')，置信水平为 1 - alpha
+            seed: bootstrap 随机种子
+            n_permutations: 置换检验的随机符号翻转次数
+            permutation_seed: 置换检验的随机种子（所有模型对共用同一组符号翻转）
+            tolerance: 置换检验提前停止的容差
+            correction: 多重比较校正方法 ('bonferroni', 'holm', 'hochberg', 'bh')，为None时不校正
+            correction_scope: 校正范围，'table' 两两对比与基线对比各自校正，'combined' 合并校正
+            
+        Returns:
+            AnalysisResult: 分析结果
+        """
+        idx_a, idx_b = all_pairs(len(self.score_columns))
+        models = self.model_index(baseline_model)
+        pairwise = self._is_pairwise(score_df)
+        pair_stats = None
+        if ci_method not in BOOTSTRAP_METHODS:
+            print(f"❌ 不支持的置信区间方法: {ci_method}")
+            n_bootstrap = 0
+        bootstrap = {'resamples': n_bootstrap, 'method': ci_method, 'seed': seed} if n_bootstrap > 0 else None
+        if correction is not None and correction not in CORRECTION_METHODS:
+            print(f"❌ 不支持的多重比较校正方法: {correction}")
+            correction = None
+        if correction_scope not in CORRECTION_SCOPES:
+            print(f"❌ 不支持的校正范围: {correction_scope}")
+            correction_scope = 'table'
+        if test_type not in TEST_NAMES:
+            print(f"❌ 不支持的检验类型: {test_type}")
+        elif len(idx_a) > 0:
+            pair_stats = self._run_pair_tests(
+                score_df, idx_a, idx_b, test_type,
+                progress=partial_progress(progress, models.names, idx_a, idx_b, test_type, alpha,
+                                          include_n=pairwise),
+                alpha=alpha, n_bootstrap=n_bootstrap, ci_method=ci_method, seed=seed,
+                n_permutations=n_permutations, permutation_seed=permutation_seed, tolerance=tolerance
+            )
+        
+        if baseline_model and not models.has_baseline:
+            print(f"❌ 基线模型 {baseline_model} 不存在")
+        
+        return AnalysisResult(
+            self.score_columns, models.names, len(score_df),
+            self.calculate_basic_stats(score_df), idx_a, idx_b, pair_stats,
+            test_type=test_type, alpha=alpha, baseline_model=baseline_model,
+            missing='pairwise' if pairwise else 'listwise', bootstrap=bootstrap,
+            correction=correction, correction_scope=correction_scope, models=models
+        )
     
     def generate_report(self, score_df: pd.DataFrame, 
                        baseline_model: Optional[str] = None,
@@ -420,45 +841,7 @@ class ModelComparisonTool:
         Returns:
             str: 分析报告
         """
-        report = []
-        report.append("=" * 60)
-        report.append("模型对比统计分析报告")
-        report.append("=" * 60)
-        
-        # 基本信息
-        report.append(f"\n📊 数据概览:")
-        report.append(f"  - 样本数量: {len(score_df)}")
-        report.append(f"  - 模型数量: {len(self.score_columns)}")
-        report.append(f"  - 统计检验: {test_type}")
-        report.append(f"  - 显著性水平: α = {alpha}")
-        
-        # 基本统计信息
-        stats_df = self.calculate_basic_stats(score_df)
-        report.append(f"\n📈 基本统计信息:")
-        report.append(stats_df.to_string(index=False))
-        
-        # 两两对比结果
-        pairwise_results = self.pairwise_comparison(score_df, test_type, alpha)
-        report.append(f"\n🔍 两两模型对比结果:")
-        report.append(pairwise_results.to_string(index=False))
-        
-        # 基线对比结果
-        if baseline_model:
-            baseline_results = self.baseline_comparison(score_df, baseline_model, test_type, alpha)
-            report.append(f"\n🎯 与基线模型 {baseline_model} 的对比结果:")
-            report.append(baseline_results.to_string(index=False))
-        
-        # 总结
-        report.append(f"\n📝 分析总结:")
-        significant_pairs = pairwise_results[pairwise_results['是否显著'] == True]
-        if len(significant_pairs) > 0:
-            report.append(f"  - 发现 {len(significant_pairs)} 对模型之间存在显著差异")
-            for _, row in significant_pairs.iterrows():
-                report.append(f"    * {row['模型1']} vs {row['模型2']}: p = {row['p值']:.4f}")
-        else:
-            report.append("  - 未发现模型间存在显著差异")
-        
-        return "\n".join(report)
+        return self.analyze(score_df, test_type, alpha, baseline_model).text_report()
 
 
 def main():
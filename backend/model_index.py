@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模型元数据索引
+分数字段、模型显示名称、基线标记与列位置的对应关系，每次分析构建一次，
+结果表与报告按字典查找，不再逐行遍历全部字段
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+
+class ModelIndex:
+    """
+    分数字段 ↔ 显示名称 ↔ 基线标记 ↔ 列位置
+    """
+
+    def __init__(self, score_columns: Sequence[str], model_names: Sequence[str],
+                 baseline_model: Optional[str] = None):
+        """
+        构建索引
+
+        Args:
+            score_columns: 分数字段列表
+            model_names: 模型名称（未设置名称的字段使用字段名）
+            baseline_model: 基线模型字段名，不在分数字段中时视为无基线
+        """
+        self.columns: List[str] = list(score_columns)
+        self.names: List[str] = [model_names[i] if i < len(model_names) else column
+                                 for i, column in enumerate(self.columns)]
+
+        # 字段名/显示名称 → 列位置（重复时取第一次出现的位置）
+        self._column_positions: Dict[str, int] = {}
+        self._name_positions: Dict[str, int] = {}
+        for i, (column, name) in enumerate(zip(self.columns, self.names)):
+            self._column_positions.setdefault(column, i)
+            self._name_positions.setdefault(name, i)
+
+        self.baseline_model = baseline_model
+        self.baseline_position: Optional[int] = (self._column_positions.get(baseline_model)
+                                                 if baseline_model else None)
+        # 每列是否为基线模型
+        self.is_baseline: List[bool] = [i == self.baseline_position for i in range(len(self.columns))]
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    @property
+    def has_baseline(self) -> bool:
+        """基线模型是否在分数字段中"""
+        return self.baseline_position is not None
+
+    @property
+    def baseline_name(self) -> Optional[str]:
+        """基线模型的显示名称"""
+        return self.names[self.baseline_position] if self.has_baseline else None
+
+    def position(self, column: str) -> Optional[int]:
+        """分数字段的列位置，不存在时为None"""
+        return self._column_positions.get(column)
+
+    def name_position(self, name: str) -> Optional[int]:
+        """显示名称对应的列位置，不存在时为None"""
+        return self._name_positions.get(name)
+
+    def display_name(self, column: str) -> str:
+        """分数字段的显示名称，不存在时返回字段名"""
+        position = self.position(column)
+        return column if position is None else self.names[position]
+
+    def is_baseline_name(self, name: str) -> bool:
+        """显示名称是否为基线模型"""
+        return self.has_baseline and name == self.baseline_name
+
+    def baseline_flags(self, names: Iterable[str]) -> List[bool]:
+        """
+        一列显示名称对应的基线标记
+
+        Args:
+            names: 显示名称
+
+        Returns:
+            List[bool]: 每个名称是否为基线模型
+        """
+        if not self.has_baseline:
+            return [False for _ in names]
+        baseline_name = self.baseline_name
+        return [name == baseline_name for name in names]
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多重比较校正
+对一组 p 值只排序一次，同时得到 Bonferroni、Holm、Hochberg 和 Benjamini-Hochberg 校正后的 p 值，
+结果与 statsmodels.stats.multitest.multipletests 的 bonferroni、holm、simes-hochberg、fdr_bh 一致。
+校正只使用已计算的 p 值，不需要重新检验
+"""
+
+from typing import Dict
+
+import numpy as np
+
+# 校正方法：bonferroni、holm 控制族错误率（FWER），hochberg 在检验独立或正相关时控制 FWER，
+# bh 控制错误发现率（FDR）
+CORRECTION_METHODS = ('bonferroni', 'holm', 'hochberg', 'bh')
+# 校正范围：table 两两对比与基线对比各自作为一族；combined 两者合并为一族
+CORRECTION_SCOPES = ('table', 'combined')
+
+# 结果表中各方法校正后 p 值的列名
+CORRECTION_COLUMNS = {
+    'bonferroni': 'Bonferroni校正p值',
+    'holm': 'Holm校正p值',
+    'hochberg': 'Hochberg校正p值',
+    'bh': 'BH校正p值'
+}
+
+
+def adjusted_key(method: str) -> str:
+    """校正后 p 值在 pair_stats 中的键名"""
+    return f'p_{method}'
+
+
+def adjust_p_values(p_values: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    计算全部校正方法的校正后 p 值
+
+    缺失的 p 值（无法检验的模型对）不计入检验族，校正后仍为 NaN。
+
+    Args:
+        p_values: 原始 p 值数组
+
+    Returns:
+        Dict[str, np.ndarray]: 以 adjusted_key(方法) 为键的校正后 p 值数组，与输入等长
+    """
+    p_values = np.asarray(p_values, dtype=np.float64)
+    result = {adjusted_key(method): np.full(p_values.shape, np.nan) for method in CORRECTION_METHODS}
+    present = np.flatnonzero(~np.isnan(p_values))
+    m = len(present)
+    if m == 0:
+        return result
+
+    # 升序排序一次，第 i 小的 p 值（从 1 开始）对应阶梯系数 m - i + 1（Holm/Hochberg）与 m / i（BH）
+    order = present[np.argsort(p_values[present], kind='stable')]
+    ordered = p_values[order]
+    rank = np.arange(1, m + 1)
+    stepwise = (m - rank + 1) * ordered
+
+    adjusted = {
+        'bonferroni': m * ordered,
+        # step-down：前缀最大值保证单调
+        'holm': np.maximum.accumulate(stepwise),
+        # step-up：后缀最小值保证单调
+        'hochberg': np.minimum.accumulate(stepwise[::-1])[::-1],
+        'bh': np.minimum.accumulate((m / rank * ordered)[::-1])[::-1]
+    }
+    for method, values in adjusted.items():
+        result[adjusted_key(method)][order] = np.minimum(values, 1.0)
+    return result
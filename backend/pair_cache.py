@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模型对检验结果缓存
+按 (数据集内容哈希, 保留行, 模型列A, 模型列B, 检验类型, 缺失值处理方式, 检验参数) 缓存单个模型对的检验结果。
+增删一个模型列后重新分析时，只需检验新增的模型对；显著性水平与多重比较校正在检验结果之上派生，不影响缓存
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+# 默认最多缓存的模型对数（每个模型对约占数百字节）
+DEFAULT_MAX_PAIRS = 200000
+
+
+class PairResultCache:
+    """
+    线程安全的模型对检验结果 LRU 缓存
+
+    每个条目为一个模型对在 run_pair_tests 返回值中的各项数值，键的第一个元素为数据集内容哈希
+    """
+
+    def __init__(self, max_pairs: int = DEFAULT_MAX_PAIRS):
+        """
+        初始化缓存
+
+        Args:
+            max_pairs: 最多缓存的模型对数
+        """
+        self.max_pairs = max_pairs
+        self._entries: "OrderedDict[Hashable, Dict[str, np.generic]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Sequence[Hashable]) -> List[Optional[Dict[str, np.generic]]]:
+        """
+        批量查询模型对结果，命中的条目标记为最近使用
+
+        Args:
+            keys: 各模型对的缓存键
+
+        Returns:
+            List[Optional[Dict]]: 与 keys 一一对应的结果，未命中为 None
+        """
+        with self._lock:
+            entries = []
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                entries.append(entry)
+            return entries
+
+    def put_many(self, keys: Sequence[Hashable], pair_stats: Dict[str, np.ndarray]) -> None:
+        """
+        缓存一批模型对的结果
+
+        Args:
+            keys: 各模型对的缓存键
+            pair_stats: 与 keys 顺序一致的 run_pair_tests 返回值
+        """
+        with self._lock:
+            for k, key in enumerate(keys):
+                self._entries[key] = {name: values[k] for name, values in pair_stats.items()}
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_pairs:
+                self._entries.popitem(last=False)
+
+    def discard_dataset(self, dataset_key: str) -> None:
+        """移除同一数据集（内容哈希）的全部模型对结果"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == dataset_key]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def merge_pair_stats(cached: Sequence[Optional[Dict[str, np.generic]]],
+                     todo: np.ndarray,
+                     computed: Optional[Dict[str, np.ndarray]],
+                     done: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    合并缓存命中的模型对与新检验的模型对，得到 run_pair_tests 格式的完整结果
+
+    Args:
+        cached: 各模型对的缓存结果，未命中为 None
+        todo: 未命中模型对的位置（升序）
+        computed: 未命中模型对的检验结果，全部命中时为None
+        done: computed 中已完成的前缀长度，为None时表示全部完成
+
+    Returns:
+        Dict[str, np.ndarray]: 合并后的结果（尚未完成的模型对为未初始化的值）
+    """
+    hits = [k for k, entry in enumerate(cached) if entry is not None]
+    template = computed if computed is not None else cached[hits[0]]
+    done = len(todo) if done is None else done
+    merged = {}
+    for key, values in template.items():
+        merged[key] = np.empty(len(cached), dtype=np.asarray(values).dtype)
+        if hits:
+            merged[key][hits] = [cached[k][key] for k in hits]
+        if computed is not None:
+            merged[key][todo[:done]] = values[:done]
+    return merged
+
+
+def cached_progress(progress: Optional[Callable[[int, Dict[str, np.ndarray]], None]],
+                    cached: Sequence[Optional[Dict[str, np.generic]]],
+                    todo: np.ndarray) -> Optional[Callable[[int, Dict[str, np.ndarray]], None]]:
+    """
+    将未命中模型对的检验进度转换为全部模型对的进度：
+    上报的已完成数为缓存命中与已检验模型对组成的最长前缀，保持 run_pair_tests 的前缀语义
+
+    Args:
+        progress: run_pair_tests 格式的进度回调，为 None 时不上报
+        cached: 各模型对的缓存结果，未命中为 None
+        todo: 未命中模型对的位置（升序）
+
+    Returns:
+        Optional[Callable]: 传给未命中模型对检验的回调
+    """
+    if progress is None:
+        return None
+
+    def on_block(done: int, computed: Dict[str, np.ndarray]) -> None:
+        completed = int(todo[done]) if done < len(todo) else len(cached)
+        progress(completed, merge_pair_stats(cached, todo, computed, done))
+
+    return on_block
@@ -0,0 +1,817 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量两两显著性检验引擎
+将分数字据一次性转换为连续的 NumPy 矩阵，按块对所有模型对同时计算
+配对t检验、Wilcoxon符号秩检验和 Mann-Whitney U 检验，结果与 scipy 逐对调用一致；
+配对置换检验的随机符号矩阵由同一种子生成，所有模型对共用
+"""
+
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import special
+
+from multiple_testing import CORRECTION_COLUMNS, adjusted_key
+
+# 每个计算块允许占用的近似内存（字节），决定一次同时处理多少个模型对
+DEFAULT_BLOCK_BYTES = 64 * 1024 * 1024
+
+# 与 scipy.stats.wilcoxon(method='auto') 一致的方法切换阈值
+WILCOXON_EXACT_MAX_N = 50
+WILCOXON_PERMUTATION_MAX_N = 13
+# 与 scipy.stats.mannwhitneyu(method='auto') 一致的精确检验阈值
+MANNWHITNEY_EXACT_MAX_N = 8
+
+TEST_NAMES = {
+    'wilcoxon': "Wilcoxon符号秩检验",
+    'ttest': "配对t检验",
+    'mannwhitney': "Mann-Whitney U检验",
+    'permutation': "配对置换检验",
+}
+
+# 基线对比支持的检验类型
+BASELINE_TEST_TYPES = ('wilcoxon', 'ttest', 'permutation')
+
+# 置换检验默认的随机符号翻转次数
+DEFAULT_N_PERMUTATIONS = 10000
+# 置换检验提前停止的默认容差：p 值置信区间的错误概率，0 表示不提前停止
+DEFAULT_PERMUTATION_TOLERANCE = 1e-3
+# 置换检验每完成这么多次符号翻转检查一次是否可以提前停止（与内存分批无关，保证结果可复现）
+PERMUTATION_CHECK_INTERVAL = 1000
+# 判定置换统计量与观测统计量相等的相对容差（相对于差异绝对值之和）
+_PERMUTATION_TIE_TOLERANCE = 1e-9
+
+# 缺失值处理方式：listwise 删除任一分数缺失的行；pairwise 每对只使用两列均有效的行
+MISSING_POLICIES = ('listwise', 'pairwise')
+
+
+def test_method_name(test_type: str, computable: bool = True) -> str:
+    """
+    结果表中“检验方法”列的显示名称
+
+    Args:
+        test_type: 统计检验类型
+        computable: 该模型对是否能够完成检验
+
+    Returns:
+        str: 检验方法名称
+    """
+    name = TEST_NAMES[test_type]
+    return name if computable else f"{name}(无法计算)"
+
+
+def as_score_array(matrix) -> np.ndarray:
+    """
+    规范化分数矩阵的数据类型：float32 保持不变（计算时按块转换为 float64），其他类型转换为 float64
+
+    Args:
+        matrix: 分数矩阵
+
+    Returns:
+        np.ndarray: float32 或 float64 矩阵
+    """
+    matrix = np.asarray(matrix)
+    if matrix.dtype not in (np.float32, np.float64):
+        matrix = matrix.astype(np.float64)
+    return matrix
+
+
+def pack_validity(matrix: np.ndarray) -> np.ndarray:
+    """
+    按列生成有效值位掩码（每 8 行压缩为 1 字节）
+
+    Args:
+        matrix: 形状为 (行数, 模型数) 的分数矩阵，缺失值为 NaN
+
+    Returns:
+        np.ndarray: 形状为 (模型数, ceil(行数 / 8)) 的 uint8 位掩码
+    """
+    matrix = np.asarray(matrix)
+    bits = np.empty((matrix.shape[1], (matrix.shape[0] + 7) // 8), dtype=np.uint8)
+    for j in range(matrix.shape[1]):
+        bits[j] = np.packbits(~np.isnan(matrix[:, j]))
+    return bits
+
+
+def to_score_matrix(score_df) -> np.ndarray:
+    """
+    将分数字据框转换为按列连续存储的 float64 矩阵
+
+    Args:
+        score_df: 分数字据框
+
+    Returns:
+        np.ndarray: 形状为 (行数, 模型数) 的 Fortran 顺序矩阵
+    """
+    return np.asfortranarray(score_df.to_numpy(dtype=np.float64))
+
+
+def compact_columns(matrix: np.ndarray) -> np.ndarray:
+    """
+    将每列的非缺失值前移，缺失值置于末尾
+
+    与旧版逐对 ``dropna()`` 后 ``iloc[:min_len]`` 截断的语义一致：
+    压缩后两列同时有效的行恰好是两列各自前 min_len 个有效值。
+
+    Args:
+        matrix: 分数矩阵
+
+    Returns:
+        np.ndarray: 压缩后的矩阵
+    """
+    compacted = np.full(matrix.shape, np.nan, order='F')
+    for j in range(matrix.shape[1]):
+        values = matrix[:, j]
+        values = values[~np.isnan(values)]
+        compacted[:len(values), j] = values
+    return compacted
+
+
+def all_pairs(k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    生成 k 个模型的全部 (i, j), i < j 组合
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: 两个下标数组
+    """
+    return np.triu_indices(k, k=1)
+
+
+def run_pair_tests(matrix: np.ndarray,
+                   idx_a: Sequence[int],
+                   idx_b: Sequence[int],
+                   test_type: str = 'wilcoxon',
+                   block_bytes: int = DEFAULT_BLOCK_BYTES,
+                   progress: Optional[Callable[[int, Dict[str, np.ndarray]], None]] = None,
+                   valid_bits: Optional[np.ndarray] = None,
+                   n_permutations: int = DEFAULT_N_PERMUTATIONS,
+                   seed: Optional[int] = None,
+                   tolerance: float = DEFAULT_PERMUTATION_TOLERANCE,
+                   alpha: Optional[float] = None
+                   ) -> Dict[str, np.ndarray]:
+    """
+    对给定的模型对批量进行显著性检验
+
+    每一对只使用两列均非缺失的行，差异定义为 ``a - b``。
+
+    Args:
+        matrix: 形状为 (行数, 模型数) 的分数矩阵（float32 时按块转换为 float64 计算），缺失值为 NaN
+        idx_a: 每对第一个模型的列下标
+        idx_b: 每对第二个模型的列下标
+        test_type: 统计检验类型 ('wilcoxon', 'ttest', 'mannwhitney', 'permutation')
+        block_bytes: 单个计算块的近似内存上限
+        progress: 每完成一个计算块后调用 progress(已完成对数, 结果字典)，
+            结果字典中前若干对已填好，可作为部分结果读取
+        valid_bits: pack_validity 生成的按列位掩码；提供时每对的有效行由两列位掩码按位与得到，
+            不再扫描矩阵中的 NaN
+        n_permutations: 置换检验的随机符号翻转次数
+        seed: 置换检验的随机种子，所有模型对使用同一组符号翻转
+        tolerance: 置换检验提前停止的容差（见 _permutation_test），0 表示不提前停止
+        alpha: 显著性水平，置换检验据此提前停止；为None时不提前停止
+
+    Returns:
+        Dict[str, np.ndarray]: 包含 n、mean_a、mean_b、mean_diff、statistic、p_value、
+            computable（scipy 是否能够给出结果）的数组字典；置换检验另含 permutations（实际翻转次数）
+    """
+    if test_type not in TEST_NAMES:
+        raise ValueError(f"不支持的检验类型: {test_type}")
+
+    idx_a = np.asarray(idx_a, dtype=np.intp)
+    idx_b = np.asarray(idx_b, dtype=np.intp)
+    n_pairs = len(idx_a)
+    columns = np.ascontiguousarray(as_score_array(matrix).T)
+    n_rows = columns.shape[1]
+    if valid_bits is not None:
+        full_column = np.packbits(np.ones(n_rows, dtype=bool))
+        has_missing = not bool((valid_bits == full_column).all())
+    else:
+        has_missing = bool(np.isnan(columns).any())
+
+    result = {key: np.full(n_pairs, np.nan) for key in
+              ('mean_a', 'mean_b', 'mean_diff', 'statistic', 'p_value')}
+    result['n'] = np.zeros(n_pairs, dtype=np.int64)
+    result['computable'] = np.ones(n_pairs, dtype=bool)
+    if test_type == 'permutation':
+        result['permutations'] = np.zeros(n_pairs, dtype=np.int64)
+        # 同一种子序列在每个计算块中重新生成完全相同的符号矩阵
+        seed_seq = np.random.SeedSequence(seed)
+        sign_batch = max(1, int(block_bytes // max(1, n_rows * 8 * 2)))
+
+    # 秩计算需要若干个与块同形的临时数组，按 16 倍估算
+    row_width = columns.shape[1] * (2 if test_type == 'mannwhitney' else 1)
+    block = max(1, int(block_bytes // max(1, row_width * 8 * 16)))
+
+    for start in range(0, n_pairs, block):
+        sl = slice(start, min(start + block, n_pairs))
+        a = columns[idx_a[sl]].astype(np.float64, copy=False)
+        b = columns[idx_b[sl]].astype(np.float64, copy=False)
+        if has_missing:
+            if valid_bits is not None:
+                # 两列有效位掩码取交集后展开为布尔矩阵
+                pair_bits = valid_bits[idx_a[sl]] & valid_bits[idx_b[sl]]
+                valid = np.unpackbits(pair_bits, axis=1, count=n_rows).view(bool)
+            else:
+                valid = ~(np.isnan(a) | np.isnan(b))
+            a = np.where(valid, a, np.nan)
+            b = np.where(valid, b, np.nan)
+            n = valid.sum(axis=1)
+        else:
+            valid = None
+            n = np.full(a.shape[0], a.shape[1], dtype=np.int64)
+
+        diff = a - b
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result['mean_a'][sl] = _masked_mean(a, valid, n)
+            result['mean_b'][sl] = _masked_mean(b, valid, n)
+            result['mean_diff'][sl] = _masked_mean(diff, valid, n)
+
+            if test_type == 'ttest':
+                stat, p_value = _paired_ttest(diff, valid, n)
+            elif test_type == 'wilcoxon':
+                stat, p_value, computable = _wilcoxon(diff, n)
+                result['computable'][sl] = computable
+            elif test_type == 'permutation':
+                stat, p_value, used = _permutation_test(diff, n, seed_seq, n_permutations, sign_batch,
+                                                        tolerance, alpha)
+                result['permutations'][sl] = used
+            else:
+                stat, p_value = _mannwhitney(a, b, n)
+
+        result['statistic'][sl] = stat
+        result['p_value'][sl] = p_value
+        result['n'][sl] = n
+
+        if progress is not None:
+            progress(sl.stop, result)
+
+    return result
+
+
+def select_pairs(pair_stats: Dict[str, np.ndarray],
+                 idx_a: Sequence[int],
+                 idx_b: Sequence[int],
+                 want_a: Sequence[int],
+                 want_b: Sequence[int],
+                 test_type: str) -> Dict[str, np.ndarray]:
+    """
+    从已计算的模型对结果中取出指定的有序模型对，无需重新检验
+
+    若所需方向与已计算方向相反（即 b - a），则交换两侧均值、差异取反（置信区间上下限互换并取反），
+    t 统计量与置换检验统计量（均值差异）取反；Wilcoxon 统计量 min(R+, R-) 与双侧 p 值不受方向影响。
+
+    Args:
+        pair_stats: run_pair_tests 的返回值
+        idx_a: 已计算模型对的第一个列下标
+        idx_b: 已计算模型对的第二个列下标
+        want_a: 所需模型对的第一个列下标
+        want_b: 所需模型对的第二个列下标
+        test_type: 统计检验类型
+
+    Returns:
+        Dict[str, np.ndarray]: 与 run_pair_tests 格式一致的结果
+    """
+    lookup = {}
+    for k, (i, j) in enumerate(zip(idx_a, idx_b)):
+        lookup[(int(i), int(j))] = (k, False)
+        lookup[(int(j), int(i))] = (k, True)
+
+    positions = []
+    flipped = []
+    for i, j in zip(want_a, want_b):
+        k, flip = lookup[(int(i), int(j))]
+        positions.append(k)
+        flipped.append(flip)
+    positions = np.asarray(positions, dtype=np.intp)
+    flipped = np.asarray(flipped, dtype=bool)
+
+    selected = {key: values[positions] for key, values in pair_stats.items()}
+    mean_a = np.where(flipped, selected['mean_b'], selected['mean_a'])
+    selected['mean_b'] = np.where(flipped, selected['mean_a'], selected['mean_b'])
+    selected['mean_a'] = mean_a
+    selected['mean_diff'] = np.where(flipped, -selected['mean_diff'], selected['mean_diff'])
+    if 'ci_low' in selected:
+        ci_low = np.where(flipped, -selected['ci_high'], selected['ci_low'])
+        selected['ci_high'] = np.where(flipped, -selected['ci_low'], selected['ci_high'])
+        selected['ci_low'] = ci_low
+    if test_type in ('ttest', 'permutation'):
+        selected['statistic'] = np.where(flipped, -selected['statistic'], selected['statistic'])
+    elif test_type == 'mannwhitney':
+        n = selected['n'].astype(np.float64)
+        selected['statistic'] = np.where(flipped, n * n - selected['statistic'], selected['statistic'])
+    return selected
+
+
+def partial_progress(progress: Optional[Callable[[int, int, Callable[[], pd.DataFrame]], None]],
+                     names: Sequence[str],
+                     idx_a: Sequence[int],
+                     idx_b: Sequence[int],
+                     test_type: str,
+                     alpha: float,
+                     include_n: bool = False) -> Optional[Callable[[int, Dict[str, np.ndarray]], None]]:
+    """
+    将 run_pair_tests 的块进度转换为 progress(已完成对数, 总对数, partial) 形式的回调
+
+    partial() 在调用时才构建已完成模型对的两两对比表，避免每个块都生成数据框。
+
+    Args:
+        progress: 外部进度回调，为 None 时不上报
+        names: 各列对应的模型名称
+        idx_a: 每对第一个模型的列下标
+        idx_b: 每对第二个模型的列下标
+        test_type: 统计检验类型
+        alpha: 显著性水平
+        include_n: 部分结果表是否包含样本数列
+
+    Returns:
+        Optional[Callable]: 可传给 run_pair_tests 的回调
+    """
+    if progress is None:
+        return None
+    idx_a = np.asarray(idx_a, dtype=np.intp)
+    idx_b = np.asarray(idx_b, dtype=np.intp)
+    total = len(idx_a)
+
+    def on_block(completed: int, pair_stats: Dict[str, np.ndarray]) -> None:
+        # 前 completed 对的结果已写定，取切片视图即可
+        def partial() -> pd.DataFrame:
+            done = {key: values[:completed] for key, values in pair_stats.items()}
+            return pairwise_table(names, idx_a[:completed], idx_b[:completed], done, test_type, alpha,
+                                  include_n=include_n)
+        progress(completed, total, partial)
+
+    return on_block
+
+
+def pairwise_table(names: Sequence[str],
+                   idx_a: Sequence[int],
+                   idx_b: Sequence[int],
+                   pair_stats: Dict[str, np.ndarray],
+                   test_type: str,
+                   alpha: float,
+                   include_n: bool = False,
+                   correction: Optional[str] = None) -> pd.DataFrame:
+    """
+    由批量检验结果构建两两对比结果表
+
+    Args:
+        names: 各列对应的模型名称
+        idx_a: 每对第一个模型的列下标
+        idx_b: 每对第二个模型的列下标
+        pair_stats: run_pair_tests 的返回值（含 ci_low、ci_high 时增加均值差异置信区间列，
+            含 adjust_p_values 的结果时增加各方法校正后的 p 值列）
+        test_type: 统计检验类型
+        alpha: 显著性水平
+        include_n: 是否包含每对实际使用的样本数列（pairwise 缺失值处理时各对样本数不同）
+        correction: 判断显著性所用的多重比较校正方法，为None时使用原始 p 值
+
+    Returns:
+        pd.DataFrame: 两两对比结果
+    """
+    results = []
+    for k, (i, j) in enumerate(zip(idx_a, idx_b)):
+        if pair_stats['n'][k] == 0:
+            continue
+
+        p_value = pair_stats['p_value'][k]
+        # 判断显著性（指定了多重比较校正时按校正后的 p 值判断）
+        decision_p = pair_stats[adjusted_key(correction)][k] if correction else p_value
+        is_significant = decision_p < alpha if not np.isnan(decision_p) else False
+
+        row = {
+            '模型1': names[i],
+            '模型2': names[j],
+            '模型1均值': pair_stats['mean_a'][k],
+            '模型2均值': pair_stats['mean_b'][k],
+            '均值差异': pair_stats['mean_diff'][k],
+            '检验统计量': pair_stats['statistic'][k],
+            'p值': p_value,
+            '显著性水平': alpha,
+            '是否显著': is_significant,
+            '检验方法': test_method_name(test_type, pair_stats['computable'][k])
+        }
+        if 'ci_low' in pair_stats:
+            row['差异CI下限'] = pair_stats['ci_low'][k]
+            row['差异CI上限'] = pair_stats['ci_high'][k]
+        if 'permutations' in pair_stats:
+            row['置换次数'] = int(pair_stats['permutations'][k])
+        for method, column in CORRECTION_COLUMNS.items():
+            if adjusted_key(method) in pair_stats:
+                row[column] = pair_stats[adjusted_key(method)][k]
+        if include_n:
+            row['样本数'] = int(pair_stats['n'][k])
+        results.append(row)
+
+    return pd.DataFrame(results)
+
+
+def baseline_table(names: Sequence[str],
+                   baseline_model: str,
+                   idx_a: Sequence[int],
+                   pair_stats: Dict[str, np.ndarray],
+                   test_type: str,
+                   alpha: float,
+                   include_n: bool = False,
+                   correction: Optional[str] = None) -> pd.DataFrame:
+    """
+    由批量检验结果（模型 - 基线）构建基线对比结果表
+
+    Args:
+        names: 各列对应的模型名称
+        baseline_model: 基线模型字段名
+        idx_a: 每个对比模型的列下标
+        pair_stats: run_pair_tests 的返回值（含 ci_low、ci_high 时增加均值差异置信区间列，
+            含 adjust_p_values 的结果时增加各方法校正后的 p 值列）
+        test_type: 统计检验类型
+        alpha: 显著性水平
+        include_n: 是否包含每对实际使用的样本数列
+        correction: 判断显著性所用的多重比较校正方法，为None时使用原始 p 值
+
+    Returns:
+        pd.DataFrame: 基线对比结果
+    """
+    results = []
+    for k, i in enumerate(idx_a):
+        if pair_stats['n'][k] == 0:
+            continue
+
+        mean_diff = pair_stats['mean_diff'][k]
+        p_value = pair_stats['p_value'][k]
+
+        # 判断显著性（指定了多重比较校正时按校正后的 p 值判断）
+        decision_p = pair_stats[adjusted_key(correction)][k] if correction else p_value
+        is_significant = decision_p < alpha if not np.isnan(decision_p) else False
+
+        # 判断模型是否优于基线
+        better_than_baseline = mean_diff > 0 and is_significant
+
+        row = {
+            '模型': names[i],
+            '基线模型': baseline_model,
+            '模型均值': pair_stats['mean_a'][k],
+            '基线均值': pair_stats['mean_b'][k],
+            '均值差异': mean_diff,
+            '检验统计量': pair_stats['statistic'][k],
+            'p值': p_value,
+            '显著性水平': alpha,
+            '是否显著': is_significant,
+            '优于基线': better_than_baseline,
+            '检验方法': test_method_name(test_type, pair_stats['computable'][k])
+        }
+        if 'ci_low' in pair_stats:
+            row['差异CI下限'] = pair_stats['ci_low'][k]
+            row['差异CI上限'] = pair_stats['ci_high'][k]
+        if 'permutations' in pair_stats:
+            row['置换次数'] = int(pair_stats['permutations'][k])
+        for method, column in CORRECTION_COLUMNS.items():
+            if adjusted_key(method) in pair_stats:
+                row[column] = pair_stats[adjusted_key(method)][k]
+        if include_n:
+            row['样本数'] = int(pair_stats['n'][k])
+        results.append(row)
+
+    return pd.DataFrame(results)
+
+
+def _masked_mean(values: np.ndarray, valid: Optional[np.ndarray], n: np.ndarray) -> np.ndarray:
+    """按行计算有效值均值"""
+    if valid is None:
+        return values.mean(axis=1)
+    return np.where(valid, values, 0.0).sum(axis=1) / n
+
+
+def _rank_rows(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    对每一行计算平均秩（一次排序），NaN 视为排除项并排在最后
+
+    Returns:
+        Tuple: (秩矩阵, 每行的结校正项 sum(t^3 - t), 每行是否存在结)
+    """
+    m = values.shape[1]
+    order = np.argsort(values, axis=1, kind='stable')
+    ordered = np.take_along_axis(values, order, axis=1)
+
+    # NaN != NaN，因此每个被排除的值各自成组，不参与结统计
+    group_start = np.ones(ordered.shape, dtype=bool)
+    group_start[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    group_end = np.ones(ordered.shape, dtype=bool)
+    group_end[:, :-1] = group_start[:, 1:]
+
+    positions = np.arange(m)
+    first = np.maximum.accumulate(np.where(group_start, positions, 0), axis=1)
+    last = np.minimum.accumulate(np.where(group_end, positions, m)[:, ::-1], axis=1)[:, ::-1]
+
+    sorted_ranks = (first + last) / 2.0 + 1.0
+    size = (last - first + 1).astype(np.float64)
+    counted = ~np.isnan(ordered)
+    tie_term = ((size ** 2 - 1.0) * counted).sum(axis=1)
+    has_ties = ((size > 1) & counted).any(axis=1)
+
+    ranks = np.empty_like(sorted_ranks)
+    np.put_along_axis(ranks, order, sorted_ranks, axis=1)
+    return ranks, tie_term, has_ties
+
+
+def _normal_two_sided(z: np.ndarray) -> np.ndarray:
+    """正态近似的双侧 p 值"""
+    return 2.0 * special.ndtr(-np.abs(z))
+
+
+def _paired_ttest(diff: np.ndarray, valid: Optional[np.ndarray],
+                  n: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """批量配对t检验，与 scipy.stats.ttest_rel 一致"""
+    mean = _masked_mean(diff, valid, n)
+    centered = diff - mean[:, None]
+    if valid is not None:
+        centered = np.where(valid, centered, 0.0)
+    var = (centered ** 2).sum(axis=1) / (n - 1)
+    t = mean / np.sqrt(var / n)
+    df = (n - 1).astype(np.float64)
+    t = np.where(n > 1, t, np.nan)
+    p_value = 2.0 * special.stdtr(df, -np.abs(t))
+    return t, p_value
+
+
+def sign_flips(bit_generator: np.random.BitGenerator, size: int, n_rows: int) -> np.ndarray:
+    """
+    生成 size 行随机符号（±1）矩阵，每个符号占用一位随机数
+
+    直接读取 64 位原始随机数，分批生成与一次生成得到完全相同的序列；
+    每行的第 64*i 到 64*i+63 个符号来自该行的第 i 个原始随机数，按 64 行对齐分段生成也得到相同的符号
+
+    Args:
+        bit_generator: 随机数生成器
+        size: 行数（翻转次数）
+        n_rows: 每行的符号数（数据行数）
+
+    Returns:
+        np.ndarray: 形状为 (size, n_rows) 的符号矩阵
+    """
+    words = (n_rows + 63) // 64
+    raw = bit_generator.random_raw(size * words).reshape(size, words)
+    bits = np.unpackbits(raw.view(np.uint8), axis=1, count=n_rows)
+    return bits.astype(np.float64) * 2.0 - 1.0
+
+
+def _permutation_test(diff: np.ndarray,
+                      n: np.ndarray,
+                      seed_seq: np.random.SeedSequence,
+                      n_permutations: int,
+                      batch: int,
+                      tolerance: float,
+                      alpha: Optional[float]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    批量配对置换检验（随机符号翻转），统计量为均值差异，双侧 p 值为
+    (|翻转后差异和| >= |观测差异和| 的次数 + 1) / (翻转次数 + 1)
+
+    随机符号矩阵由 seed_seq 生成，所有模型对共用，每批符号翻转与差异矩阵做一次矩阵乘积
+    （缺失行的差异按 0 计，翻转不影响结果）；提前停止见 permutation_p_values。
+
+    Returns:
+        Tuple: (统计量, p 值, 实际翻转次数)
+    """
+    values = np.nan_to_num(diff)
+    n_rows = values.shape[1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        statistic = np.where(n > 0, values.sum(axis=1) / n, np.nan)
+    observed = permutation_threshold(values.sum(axis=1), np.abs(values).sum(axis=1))
+
+    bit_generator = np.random.PCG64(seed_seq)
+    cached = {}
+
+    def count_exceed(active: np.ndarray, start: int, stop: int) -> np.ndarray:
+        # 检验中的模型对变化时才重新取出对应的差异行
+        if cached.get('active') is not active:
+            cached['active'] = active
+            cached['values'] = values[active]
+        exceed = np.zeros(len(active), dtype=np.int64)
+        for batch_start in range(start, stop, batch):
+            signs = sign_flips(bit_generator, min(batch, stop - batch_start), n_rows)
+            exceed += (np.abs(signs @ cached['values'].T) >= observed[active]).sum(axis=0)
+        return exceed
+
+    p_value, used = permutation_p_values(n, n_permutations, tolerance, alpha, count_exceed)
+    return statistic, p_value, used
+
+
+def permutation_threshold(diff_sum: np.ndarray, abs_sum: np.ndarray) -> np.ndarray:
+    """
+    置换检验的超出阈值：翻转后 |差异和| 不小于该值计为一次超出（减去与数据规模相称的容差，
+    使与观测值相等的翻转不受浮点求和顺序影响）
+
+    Args:
+        diff_sum: 每对的差异和
+        abs_sum: 每对的差异绝对值之和
+
+    Returns:
+        np.ndarray: 阈值
+    """
+    return np.abs(diff_sum) - _PERMUTATION_TIE_TOLERANCE * abs_sum
+
+
+def permutation_p_values(n: np.ndarray,
+                         n_permutations: int,
+                         tolerance: float,
+                         alpha: Optional[float],
+                         count_exceed: Callable[[np.ndarray, int, int], np.ndarray]
+                         ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    置换检验的分段翻转与提前停止
+
+    每 PERMUTATION_CHECK_INTERVAL 次翻转为一段，段末对 p 值的 Clopper-Pearson 置信区间
+    （置信水平 1 - tolerance）已完全位于 alpha 一侧的模型对停止翻转。
+    各段按顺序调用 count_exceed，同一随机数流按翻转顺序消耗。
+
+    Args:
+        n: 每对的有效行数（为 0 的模型对不检验）
+        n_permutations: 最多翻转次数
+        tolerance: 提前停止的容差，0 表示不提前停止
+        alpha: 显著性水平，为None时不提前停止
+        count_exceed: count_exceed(检验中的模型对下标, 起始翻转序号, 结束翻转序号)，
+            返回这些模型对在该段翻转中超出阈值的次数
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (p 值, 实际翻转次数)
+    """
+    n_pairs = len(n)
+    exceed = np.zeros(n_pairs, dtype=np.int64)
+    used = np.zeros(n_pairs, dtype=np.int64)
+    early_stop = alpha is not None and tolerance > 0
+
+    active = np.flatnonzero(n > 0)
+    for checkpoint in range(0, n_permutations, PERMUTATION_CHECK_INTERVAL):
+        if len(active) == 0:
+            break
+        stop = min(checkpoint + PERMUTATION_CHECK_INTERVAL, n_permutations)
+        exceed[active] += count_exceed(active, checkpoint, stop)
+        used[active] += stop - checkpoint
+
+        if early_stop and stop < n_permutations:
+            hits, trials = exceed[active], used[active]
+            with np.errstate(invalid='ignore'):
+                lower = np.where(hits > 0, special.betaincinv(hits, trials - hits + 1, tolerance / 2), 0.0)
+                upper = np.where(hits < trials,
+                                 special.betaincinv(hits + 1, trials - hits, 1 - tolerance / 2), 1.0)
+            decided = (upper < alpha) | (lower > alpha)
+            if decided.any():
+                active = active[~decided]
+
+    p_value = np.where(used > 0, (exceed + 1) / (used + 1), np.nan)
+    return p_value, used
+
+
+def _wilcoxon(diff: np.ndarray, n: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    批量 Wilcoxon 符号秩检验，与 scipy.stats.wilcoxon 默认参数一致
+    （zero_method='wilcox'，无连续性校正，method='auto'）
+
+    Returns:
+        Tuple: (统计量, p 值, 是否可计算)
+    """
+    nonzero = ~np.isnan(diff) & (diff != 0)
+    count = nonzero.sum(axis=1).astype(np.float64)
+    n_zero = n - count
+
+    ranks, tie_term, has_ties = _rank_rows(np.where(nonzero, np.abs(diff), np.nan))
+    r_plus = np.where(nonzero & (diff > 0), ranks, 0.0).sum(axis=1)
+    r_minus = np.where(nonzero & (diff < 0), ranks, 0.0).sum(axis=1)
+
+    p_value = wilcoxon_normal_p(count, r_plus, tie_term)
+
+    small = n <= WILCOXON_EXACT_MAX_N
+    exact = small & ~has_ties & (n_zero == 0)
+    for row in np.flatnonzero(exact):
+        p_value[row] = _wilcoxon_exact_p(int(count[row]), r_plus[row])
+
+    permutation = small & ~exact & (n <= WILCOXON_PERMUTATION_MAX_N)
+    # scipy 的穷举置换检验要求至少 2 个观测，否则抛出 ValueError
+    uncomputable = permutation & (n < 2)
+    permutation &= ~uncomputable
+    for row in np.flatnonzero(permutation):
+        p_value[row] = _wilcoxon_permutation_p(ranks[row, nonzero[row]],
+                                               np.sign(diff[row, nonzero[row]]))
+
+    statistic = np.minimum(r_plus, r_minus)
+    empty = (n == 0) | uncomputable
+    statistic[empty] = np.nan
+    p_value[empty] = np.nan
+    return statistic, p_value, ~uncomputable
+
+
+def wilcoxon_normal_p(count, r_plus, tie_term):
+    """
+    Wilcoxon 符号秩检验正态近似的双侧 p 值（无连续性校正）
+
+    Args:
+        count: 非零差异数
+        r_plus: 正差异的秩和
+        tie_term: 结校正项 sum(t^3 - t)
+
+    Returns:
+        p 值
+    """
+    mn = count * (count + 1.0) * 0.25
+    se = np.sqrt((count * (count + 1.0) * (2.0 * count + 1.0) - tie_term / 2.0) / 24.0)
+    return _normal_two_sided((r_plus - mn) / se)
+
+
+@lru_cache(maxsize=None)
+def _wilcoxon_pmf(n: int) -> np.ndarray:
+    """无结时符号秩统计量 T+ 的精确分布"""
+    counts = np.zeros(n * (n + 1) // 2 + 1)
+    counts[0] = 1.0
+    for i in range(1, n + 1):
+        counts[i:] = counts[i:] + counts[:-i].copy()
+    return counts / 2.0 ** n
+
+
+def _wilcoxon_exact_p(count: int, r_plus: float) -> float:
+    """精确分布的双侧 p 值"""
+    pmf = _wilcoxon_pmf(count)
+    sf = pmf[int(np.floor(r_plus)):].sum()
+    cdf = pmf[:int(np.ceil(r_plus)) + 1].sum()
+    return float(np.clip(2.0 * min(sf, cdf), 0.0, 1.0))
+
+
+def _wilcoxon_permutation_p(ranks: np.ndarray, signs: np.ndarray) -> float:
+    """
+    小样本存在结或零差异时，穷举全部符号翻转得到的双侧 p 值
+    （与 scipy 的 PermutationMethod 穷举结果一致）
+    """
+    m = len(ranks)
+    observed = ranks[signs > 0].sum()
+    flips = (np.arange(2 ** m)[:, None] >> np.arange(m)) & 1
+    null = flips @ ranks
+    gamma = abs(np.finfo(np.float64).eps * 100 * observed)
+    less = np.mean(null <= observed + gamma)
+    greater = np.mean(null >= observed - gamma)
+    return float(np.clip(2.0 * min(less, greater), 0.0, 1.0))
+
+
+def _mannwhitney(a: np.ndarray, b: np.ndarray, n: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    批量 Mann-Whitney U 检验，与 scipy.stats.mannwhitneyu 默认参数一致
+    （双侧，连续性校正，method='auto'），两组样本量均为有效配对行数
+    """
+    ranks, tie_term, has_ties = _rank_rows(np.concatenate([a, b], axis=1))
+    half = a.shape[1]
+    n1 = n.astype(np.float64)
+    r1 = np.where(np.isnan(a), 0.0, ranks[:, :half]).sum(axis=1)
+    u1 = r1 - n1 * (n1 + 1.0) / 2.0
+    u = np.maximum(u1, n1 * n1 - u1)
+    p_value = mannwhitney_normal_p(n1, u1, tie_term)
+
+    exact = (n <= MANNWHITNEY_EXACT_MAX_N) & ~has_ties & (n > 0)
+    for row in np.flatnonzero(exact):
+        p_value[row] = 2.0 * _mannwhitney_sf(int(n[row]), int(n[row]), int(u[row]))
+
+    p_value = np.clip(p_value, 0.0, 1.0)
+    empty = n == 0
+    u1[empty] = np.nan
+    p_value[empty] = np.nan
+    return u1, p_value
+
+
+def mannwhitney_normal_p(n1, u1, tie_term):
+    """
+    两组样本量均为 n1 时 Mann-Whitney U 检验正态近似的双侧 p 值（连续性校正）
+
+    Args:
+        n1: 每组样本量
+        u1: 第一组的 U 统计量
+        tie_term: 合并样本的结校正项 sum(t^3 - t)
+
+    Returns:
+        p 值
+    """
+    u = np.maximum(u1, n1 * n1 - u1)
+    total = 2.0 * n1
+    s = np.sqrt(n1 * n1 / 12.0 * ((total + 1.0) - tie_term / (total * (total - 1.0))))
+    return np.clip(2.0 * special.ndtr(-(u - n1 * n1 / 2.0 - 0.5) / s), 0.0, 1.0)
+
+
+@lru_cache(maxsize=None)
+def _mannwhitney_pmf(n1: int, n2: int) -> np.ndarray:
+    """无结时 U 统计量的精确分布"""
+    # counts[i][j] 为样本量 (i, j) 时 U 的频数分布
+    counts = [[None] * (n2 + 1) for _ in range(n1 + 1)]
+    for i in range(n1 + 1):
+        for j in range(n2 + 1):
+            dist = np.zeros(i * j + 1)
+            if i == 0 or j == 0:
+                dist[0] = 1.0
+            else:
+                prev_i = counts[i - 1][j]
+                dist[j:j + len(prev_i)] += prev_i
+                prev_j = counts[i][j - 1]
+                dist[:len(prev_j)] += prev_j
+            counts[i][j] = dist
+    dist = counts[n1][n2]
+    return dist / dist.sum()
+
+
+def _mannwhitney_sf(n1: int, n2: int, u: int) -> float:
+    """P(U >= u)"""
+    return float(_mannwhitney_pmf(n1, n2)[u:].sum())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多进程两两显著性检验
+将模型对列表分片后交给进程池并行检验，分数矩阵只写入一次共享内存，
+各子进程直接映射同一块内存，不为每个任务序列化数据；
+矩阵已保存为 .npy 文件（见 shared_matrix）时，子进程直接映射该文件，不再复制到共享内存
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from pairwise_engine import (DEFAULT_BLOCK_BYTES, DEFAULT_N_PERMUTATIONS, DEFAULT_PERMUTATION_TOLERANCE,
+                             TEST_NAMES, as_score_array, run_pair_tests)
+
+# 每个工作进程分到的分片数，分片越多负载越均衡、进度上报越细
+SHARDS_PER_WORKER = 4
+# 模型对数少于该值时并行收益不足以抵消进程启动开销，直接单进程计算
+MIN_PARALLEL_PAIRS = 64
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """
+    规范化工作进程数
+
+    Args:
+        workers: 工作进程数，None 或 1 表示单进程，0 或负数表示使用全部 CPU 核心
+
+    Returns:
+        int: 实际使用的工作进程数（至少为 1）
+    """
+    if workers is None:
+        return 1
+    if workers <= 0:
+        return multiprocessing.cpu_count()
+    return int(workers)
+
+
+def _shard_worker(source: str,
+                  shape: Tuple[int, int],
+                  dtype: str,
+                  idx_a: np.ndarray,
+                  idx_b: np.ndarray,
+                  test_type: str,
+                  block_bytes: int,
+                  valid_bits: Optional[np.ndarray],
+                  permutation: Dict) -> Dict[str, np.ndarray]:
+    """子进程：映射共享内存（source 为其名称）或矩阵文件（source 为 .npy 路径）中的分数矩阵并检验一个分片的模型对"""
+    if source.endswith('.npy'):
+        # 矩阵文件：按列连续存储的 Fortran 顺序矩阵，直接只读映射
+        matrix = np.load(source, mmap_mode='r')
+        return run_pair_tests(matrix, idx_a, idx_b, test_type, block_bytes=block_bytes,
+                              valid_bits=valid_bits, **permutation)
+
+    # spawn 子进程与主进程共用同一个 resource_tracker，共享内存只由主进程释放
+    shm = shared_memory.SharedMemory(name=source)
+    try:
+        columns = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        # columns.T 的转置即为 columns 本身，run_pair_tests 不会复制数据
+        result = run_pair_tests(columns.T, idx_a, idx_b, test_type, block_bytes=block_bytes,
+                                valid_bits=valid_bits, **permutation)
+        del columns
+        return result
+    finally:
+        shm.close()
+
+
+def run_pair_tests_parallel(matrix: np.ndarray,
+                            idx_a: Sequence[int],
+                            idx_b: Sequence[int],
+                            test_type: str = 'wilcoxon',
+                            workers: Optional[int] = None,
+                            block_bytes: int = DEFAULT_BLOCK_BYTES,
+                            progress: Optional[Callable[[int, Dict[str, np.ndarray]], None]] = None,
+                            valid_bits: Optional[np.ndarray] = None,
+                            n_permutations: int = DEFAULT_N_PERMUTATIONS,
+                            seed: Optional[int] = None,
+                            tolerance: float = DEFAULT_PERMUTATION_TOLERANCE,
+                            alpha: Optional[float] = None,
+                            matrix_file: Optional[str] = None
+                            ) -> Dict[str, np.ndarray]:
+    """
+    多进程批量检验模型对，结果与 run_pair_tests 完全一致
+
+    Args:
+        matrix: 形状为 (行数, 模型数) 的分数矩阵，缺失值为 NaN
+        idx_a: 每对第一个模型的列下标
+        idx_b: 每对第二个模型的列下标
+        test_type: 统计检验类型 ('wilcoxon', 'ttest', 'mannwhitney')
+        workers: 工作进程数（见 resolve_workers）
+        block_bytes: 全部进程合计的计算块内存上限
+        progress: 与 run_pair_tests 相同的进度回调，按模型对顺序上报
+        valid_bits: 与 run_pair_tests 相同的按列有效值位掩码（随任务传给子进程，体积为矩阵的 1/64）
+        n_permutations: 置换检验的随机符号翻转次数
+        seed: 置换检验的随机种子（为None时在主进程中取一次随机熵，各分片使用同一组符号翻转）
+        tolerance: 置换检验提前停止的容差
+        alpha: 显著性水平，置换检验据此提前停止
+        matrix_file: matrix 已保存为按列连续存储的 .npy 文件时传入其路径，子进程直接映射该文件
+
+    Returns:
+        Dict[str, np.ndarray]: 与 run_pair_tests 格式相同的结果
+    """
+    if test_type not in TEST_NAMES:
+        raise ValueError(f"不支持的检验类型: {test_type}")
+
+    idx_a = np.asarray(idx_a, dtype=np.intp)
+    idx_b = np.asarray(idx_b, dtype=np.intp)
+    n_pairs = len(idx_a)
+    workers = min(resolve_workers(workers), max(1, n_pairs))
+    if seed is None and test_type == 'permutation':
+        seed = np.random.SeedSequence().entropy
+    permutation = {'n_permutations': n_permutations, 'seed': seed, 'tolerance': tolerance, 'alpha': alpha}
+    if workers <= 1 or n_pairs < MIN_PARALLEL_PAIRS:
+        return run_pair_tests(matrix, idx_a, idx_b, test_type, block_bytes=block_bytes,
+                              progress=progress, valid_bits=valid_bits, **permutation)
+
+    # 按列连续存放写入共享内存，与 run_pair_tests 内部布局一致（float32 矩阵保持 float32）
+    columns = as_score_array(matrix).T
+    shm = None
+    if matrix_file is not None:
+        source = matrix_file
+    else:
+        shm = shared_memory.SharedMemory(create=True, size=max(1, columns.nbytes))
+        source = shm.name
+    try:
+        if shm is not None:
+            shared = np.ndarray(columns.shape, dtype=columns.dtype, buffer=shm.buf)
+            shared[...] = columns
+            del shared
+
+        bounds = np.linspace(0, n_pairs, min(n_pairs, workers * SHARDS_PER_WORKER) + 1).astype(int)
+        worker_block_bytes = max(1, block_bytes // workers)
+        result = None
+        # spawn 启动的子进程不继承 Flask 等线程状态，可在后台任务线程中安全使用
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = [
+                executor.submit(_shard_worker, source, columns.shape, columns.dtype.str,
+                                idx_a[start:stop], idx_b[start:stop], test_type, worker_block_bytes,
+                                valid_bits, permutation)
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+            # 按分片顺序收集，使已完成部分始终是模型对列表的前缀
+            for start, stop, future in zip(bounds[:-1], bounds[1:], futures):
+                shard = future.result()
+                if result is None:
+                    result = {key: np.empty(n_pairs, dtype=values.dtype) for key, values in shard.items()}
+                for key, values in shard.items():
+                    result[key][start:stop] = values
+                if progress is not None:
+                    progress(int(stop), result)
+        return result
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
@@ -16,9 +16,17 @@
 - TEST_TYPE: 统计检验类型
 - ALPHA: 显著性水平
 - SCORE_PATTERN: 分数字段检测模式
+- WORKERS: 两两检验的工作进程数
+- MISSING_POLICY: 缺失值处理方式
+- BOOTSTRAP_RESAMPLES / BOOTSTRAP_METHOD / BOOTSTRAP_SEED: 均值差异置信区间设置
+- N_PERMUTATIONS / PERMUTATION_SEED / PERMUTATION_TOLERANCE: 置换检验设置（TEST_TYPE 为 'permutation' 时使用）
+- CORRECTION / CORRECTION_SCOPE: 多重比较校正设置
+- CHART_FORMAT / CHART_DPI: 可视化图表的图片格式与分辨率
+- REPORT_PAGE_ROWS: HTML 报告中表格每页的行数
 """
 
 from model_comparison_tool import ModelComparisonTool
+from html_report import HtmlReport
 import sys
 import os
 import pandas as pd
@@ -44,7 +52,7 @@ MODEL_NAMES = [
     "模型-0928-Prompt2Doclist", 
 ]  # 例如: ["模型A", "模型B", "模型C"] 或 None
 
-# 统计检验类型 ('wilcoxon', 'ttest', 'mannwhitney')
+# 统计检验类型 ('wilcoxon', 'ttest', 'mannwhitney', 'permutation')
 TEST_TYPE = 'wilcoxon'
 
 # 显著性水平
@@ -53,11 +61,43 @@ ALPHA = 0.05
 # 分数字段检测模式（用于自动检测）
 SCORE_PATTERN = "overall_score"  # 检测包含此模式的字段作为分数字段
 
+# 两两检验的工作进程数（1为单进程，0表示使用全部CPU核心；模型较多时可加速）
+WORKERS = 1
+
+# 缺失值处理方式（'listwise' 移除任一模型缺失的行；'pairwise' 每对模型只使用两者均有分数的行）
+MISSING_POLICY = 'listwise'
+
+# 均值差异 bootstrap 置信区间的重采样次数（0 表示不计算；置信水平为 1 - ALPHA）
+BOOTSTRAP_RESAMPLES = 0
+# 置信区间方法 ('percentile' 百分位法, 'bca' 偏差校正加速法)
+BOOTSTRAP_METHOD = 'percentile'
+# 随机种子（固定后结果可复现，None 表示每次不同）
+BOOTSTRAP_SEED = 0
+
+# 置换检验的随机符号翻转次数（TEST_TYPE 为 'permutation' 时使用）
+N_PERMUTATIONS = 10000
+# 置换检验的随机种子（所有模型对共用同一组符号翻转）
+PERMUTATION_SEED = 0
+# 提前停止容差：p 值与 ALPHA 的大小关系以 1 - 容差的置信度确定后即停止，0 表示不提前停止
+PERMUTATION_TOLERANCE = 1e-3
+
+# 多重比较校正方法（None 不校正；'bonferroni'、'holm'、'hochberg'、'bh'），指定后按校正后的 p 值判断显著性
+CORRECTION = None
+# 校正范围（'table' 两两对比与基线对比各自校正；'combined' 合并为一族校正）
+CORRECTION_SCOPE = 'table'
+
+# 可视化图表的图片格式（'png' 或 'svg'）与分辨率（模型较多时可降低分辨率加快渲染）
+CHART_FORMAT = 'png'
+CHART_DPI = 300
+
+# HTML 报告中表格每页的行数（模型较多时超出的行按页折叠显示）
+REPORT_PAGE_ROWS = 500
+
 # ==================== 配置参数结束 ====================
 
-def generate_html_report(stats_df, score_df, tool, baseline_model, test_type, alpha):
+def generate_html_report(stats_df, score_df, tool, baseline_model, test_type, alpha, result=None):
     """
-    生成HTML格式的分析报告
+    生成HTML格式的分析报告（整份报告作为字符串返回；写入文件时使用 HtmlReport.write 逐段写出）
     
     Args:
         stats_df: 基本统计信息
@@ -66,388 +106,14 @@ def generate_html_report(stats_df, score_df, tool, baseline_model, test_type, al
         baseline_model: 基线模型
         test_type: 统计检验类型
         alpha: 显著性水平
+        result: 已完成的分析结果（AnalysisResult），为None时在此计算
         
     Returns:
         str: HTML格式的报告
     """
-    # HTML报告开始
-    html = f"""
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>模型显著性对比报告</title>
-    <style>
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            line-height: 1.6;
-            margin: 0;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 0 20px rgba(0,0,0,0.1);
-        }}
-        h1 {{
-            color: #2c3e50;
-            text-align: center;
-            border-bottom: 3px solid #3498db;
-            padding-bottom: 10px;
-            margin-bottom: 30px;
-        }}
-        h2 {{
-            color: #34495e;
-            border-left: 4px solid #3498db;
-            padding-left: 15px;
-            margin-top: 30px;
-        }}
-        h3 {{
-            color: #7f8c8d;
-            margin-top: 25px;
-        }}
-        .info-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 15px;
-            margin: 20px 0;
-        }}
-        .info-card {{
-            background: #ecf0f1;
-            padding: 15px;
-            border-radius: 8px;
-            text-align: center;
-        }}
-        .info-card strong {{
-            color: #2c3e50;
-            font-size: 1.2em;
-        }}
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 20px 0;
-            background: white;
-            border-radius: 8px;
-            overflow: hidden;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        th {{
-            background: #3498db;
-            color: white;
-            padding: 15px;
-            text-align: left;
-            font-weight: 600;
-        }}
-        td {{
-            padding: 12px 15px;
-            border-bottom: 1px solid #ecf0f1;
-        }}
-        tr:nth-child(even) {{
-            background: #f8f9fa;
-        }}
-        tr:hover {{
-            background: #e8f4f8;
-        }}
-        .best-model {{
-            background: linear-gradient(135deg, #f39c12, #e67e22);
-            color: white;
-            padding: 20px;
-            border-radius: 10px;
-            text-align: center;
-            margin: 20px 0;
-            font-size: 1.2em;
-        }}
-        .significant {{
-            color: #27ae60;
-            font-weight: bold;
-        }}
-        .not-significant {{
-            color: #e74c3c;
-            font-weight: bold;
-        }}
-        .summary {{
-            background: #ecf0f1;
-            padding: 20px;
-            border-radius: 8px;
-            margin: 20px 0;
-        }}
-        .footer {{
-            text-align: center;
-            color: #7f8c8d;
-            margin-top: 30px;
-            padding-top: 20px;
-            border-top: 1px solid #ecf0f1;
-        }}
-        .emoji {{
-            font-size: 1.2em;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1><span class="emoji">📊</span> 模型显著性对比报告</h1>
-        
-        <h2><span class="emoji">📊</span> 数据概览</h2>
-        <div class="info-grid">
-            <div class="info-card">
-                <strong>{len(score_df)}</strong><br>样本数量
-            </div>
-            <div class="info-card">
-                <strong>{len(stats_df)}</strong><br>模型数量
-            </div>
-            <div class="info-card">
-                <strong>{test_type}</strong><br>统计检验
-            </div>
-            <div class="info-card">
-                <strong>α = {alpha}</strong><br>显著性水平
-            </div>
-        </div>
-        
-        <h2><span class="emoji">📈</span> 得分情况</h2>
-        <table>
-            <thead>
-                <tr>
-                    <th>模型</th>
-                    <th>样本数</th>
-                    <th>均值(百分制)</th>
-                    <th>标准差</th>
-                    <th>中位数</th>
-                    <th>25%分位数</th>
-                    <th>75%分位数</th>
-                </tr>
-            </thead>
-            <tbody>"""
-    
-    # 基本统计信息表格
-    for _, row in stats_df.iterrows():
-        # 检查是否为基线模型
-        is_baseline = baseline_model and row['模型'] in [tool.model_names[i] if i < len(tool.model_names) else tool.score_columns[i] for i in range(len(tool.score_columns)) if tool.score_columns[i] == baseline_model]
-        model_display = f"{row['模型']} ✅" if is_baseline else row['模型']
-        
-        html += f"""
-                <tr>
-                    <td><strong>{model_display}</strong></td>
-                    <td>{row['样本数']}</td>
-                    <td>{(row['均值'] * 50):.2f}</td>
-                    <td>{row['标准差']:.2f}</td>
-                    <td>{row['中位数']:.2f}</td>
-                    <td>{row['25%分位数']:.2f}</td>
-                    <td>{row['75%分位数']:.2f}</td>
-                </tr>"""
-    
-    html += """
-            </tbody>
-        </table>"""
-    
-    # 最佳模型
-    best_model_idx = stats_df['均值'].idxmax()
-    best_model = stats_df.loc[best_model_idx, '模型']
-    best_score = stats_df.loc[best_model_idx, '均值']
-    html += f"""
-        <div class="best-model">
-            <span class="emoji">🏆</span> 最佳模型: <strong>{best_model}</strong> (平均得分: {(best_score * 50):.2f})
-        </div>"""
-    
-    # 两两对比结果
-    html += f"""
-        <h2><span class="emoji">🔍</span> 两两模型对比</h2>
-        <table>
-            <thead>
-                <tr>
-                    <th>模型1</th>
-                    <th>模型2</th>
-                    <th>模型1均值</th>
-                    <th>模型2均值</th>
-                    <th>均值差异</th>
-                    <th>检验统计量</th>
-                    <th>p值</th>
-                    <th>是否显著</th>
-                </tr>
-            </thead>
-            <tbody>"""
-    
-    pairwise_results = tool.pairwise_comparison(score_df, test_type=test_type, alpha=alpha)
-    
-    if pairwise_results is not None and len(pairwise_results) > 0:
-        for _, row in pairwise_results.iterrows():
-            significance_class = "significant" if row['是否显著'] else "not-significant"
-            significance_text = "✅ 是" if row['是否显著'] else "❌ 否"
-            
-            # 检查模型是否为基线模型
-            model1_display = f"{row['模型1']} ✅" if baseline_model and row['模型1'] in [tool.model_names[i] if i < len(tool.model_names) else tool.score_columns[i] for i in range(len(tool.score_columns)) if tool.score_columns[i] == baseline_model] else row['模型1']
-            model2_display = f"{row['模型2']} ✅" if baseline_model and row['模型2'] in [tool.model_names[i] if i < len(tool.model_names) else tool.score_columns[i] for i in range(len(tool.score_columns)) if tool.score_columns[i] == baseline_model] else row['模型2']
-            
-            html += f"""
-                <tr>
-                    <td><strong>{model1_display}</strong></td>
-                    <td><strong>{model2_display}</strong></td>
-                    <td>{row['模型1均值']:.4f}</td>
-                    <td>{row['模型2均值']:.4f}</td>
-                    <td>{row['均值差异']:.4f}</td>
-                    <td>{row['检验统计量']:.4f}</td>
-                    <td>{row['p值']:.4f}</td>
-                    <td class="{significance_class}">{significance_text}</td>
-                </tr>"""
-        
-        html += """
-            </tbody>
-        </table>"""
-        
-        # 显著差异总结
-        significant_pairs = pairwise_results[pairwise_results['是否显著'] == True]
-        if len(significant_pairs) > 0:
-            html += f"""
-        <h3><span class="emoji">📋</span> 显著差异总结</h3>
-        <div class="summary">
-            <p>发现 <strong>{len(significant_pairs)}</strong> 对模型存在显著差异:</p>
-            <ul>"""
-            for _, row in significant_pairs.iterrows():
-                direction = "优于" if row['均值差异'] > 0 else "劣于"
-                
-                # 检查模型是否为基线模型
-                model1_display = f"{row['模型1']} ✅" if baseline_model and row['模型1'] in [tool.model_names[i] if i < len(tool.model_names) else tool.score_columns[i] for i in range(len(tool.score_columns)) if tool.score_columns[i] == baseline_model] else row['模型1']
-                model2_display = f"{row['模型2']} ✅" if baseline_model and row['模型2'] in [tool.model_names[i] if i < len(tool.model_names) else tool.score_columns[i] for i in range(len(tool.score_columns)) if tool.score_columns[i] == baseline_model] else row['模型2']
-                
-                html += f"""
-                <li><strong>{model1_display}</strong> {direction} <strong>{model2_display}</strong> 
-                    (差异: {row['均值差异']:.4f}, p = {row['p值']:.4f})</li>"""
-            html += """
-            </ul>
-        </div>"""
-        else:
-            html += """
-        <h3><span class="emoji">📋</span> 显著差异总结</h3>
-        <div class="summary">
-            <p>未发现模型间存在显著差异</p>
-        </div>"""
-    else:
-        html += """
-            </tbody>
-        </table>
-        <p>无法进行两两对比分析</p>"""
-    
-    # 基线对比结果
-    if baseline_model and baseline_model in tool.score_columns:
-        # 获取基线模型的友好名称
-        baseline_index = tool.score_columns.index(baseline_model)
-        baseline_friendly_name = tool.model_names[baseline_index] if baseline_index < len(tool.model_names) else baseline_model
-        
-        html += f"""
-        <h2><span class="emoji">🎯</span> 与基线模型对比</h2>
-        <div class="summary">
-            <p><strong>基线模型</strong>: {baseline_friendly_name}</p>
-            <p><em>注：基线模型作为对比基准，其他模型的表现将与此模型进行比较</em></p>
-        </div>
-        <table>
-            <thead>
-                <tr>
-                    <th>模型</th>
-                    <th>模型均值</th>
-                    <th>基线均值({baseline_friendly_name})</th>
-                    <th>均值差异</th>
-                    <th>检验统计量</th>
-                    <th>p值</th>
-                    <th>是否显著</th>
-                    <th>优于基线</th>
-                </tr>
-            </thead>
-            <tbody>"""
-        
-        baseline_results = tool.baseline_comparison(score_df, baseline_model, test_type=test_type, alpha=alpha)
-        
-        if baseline_results is not None and len(baseline_results) > 0:
-            for _, row in baseline_results.iterrows():
-                significance_class = "significant" if row['是否显著'] else "not-significant"
-                significance_text = "✅ 是" if row['是否显著'] else "❌ 否"
-                better_class = "significant" if row['优于基线'] else "not-significant"
-                better_text = "✅ 是" if row['优于基线'] else "❌ 否"
-                
-                # 检查模型是否为基线模型
-                model_display = f"{row['模型']} ✅" if baseline_model and row['模型'] in [tool.model_names[i] if i < len(tool.model_names) else tool.score_columns[i] for i in range(len(tool.score_columns)) if tool.score_columns[i] == baseline_model] else row['模型']
-                
-                html += f"""
-                <tr>
-                    <td><strong>{model_display}</strong></td>
-                    <td>{row['模型均值']:.4f}</td>
-                    <td>{row['基线均值']:.4f}</td>
-                    <td>{row['均值差异']:.4f}</td>
-                    <td>{row['检验统计量']:.4f}</td>
-                    <td>{row['p值']:.4f}</td>
-                    <td class="{significance_class}">{significance_text}</td>
-                    <td class="{better_class}">{better_text}</td>
-                </tr>"""
-            
-            html += """
-            </tbody>
-        </table>"""
-            
-            # 优于基线的模型
-            better_models = baseline_results[baseline_results['优于基线'] == True]
-            if len(better_models) > 0:
-                html += f"""
-        <h3><span class="emoji">🎉</span> 优于基线的模型</h3>
-        <div class="summary">"""
-                for _, row in better_models.iterrows():
-                    # 检查模型是否为基线模型
-                    model_display = f"{row['模型']} ✅" if baseline_model and row['模型'] in [tool.model_names[i] if i < len(tool.model_names) else tool.score_columns[i] for i in range(len(tool.score_columns)) if tool.score_columns[i] == baseline_model] else row['模型']
-                    
-                    html += f"""
-            <p><strong>{model_display}</strong>: 差异 = {row['均值差异']:.4f}, p = {row['p值']:.4f}</p>"""
-                html += """
-        </div>"""
-            else:
-                html += """
-        <h3><span class="emoji">😔</span> 基线对比结果</h3>
-        <div class="summary">
-            <p>没有模型显著优于基线</p>
-        </div>"""
-        else:
-            html += """
-            </tbody>
-        </table>
-        <p>无法进行基线对比分析</p>"""
-    
-    # 分析总结
-    html += f"""
-        <h2><span class="emoji">📝</span> 分析总结</h2>
-        <div class="summary">"""
-    
-    if pairwise_results is not None:
-        significant_count = len(pairwise_results[pairwise_results['是否显著'] == True])
-        total_pairs = len(pairwise_results)
-        html += f"""
-            <ul>
-                <li>共进行了 <strong>{total_pairs}</strong> 对模型对比</li>
-                <li>发现 <strong>{significant_count}</strong> 对模型存在显著差异</li>"""
-        
-        if significant_count > 0:
-            html += """
-                <li>模型间存在显著差异，建议进一步分析具体原因</li>"""
-        else:
-            html += """
-                <li>模型间未发现显著差异，可能需要更多样本或调整评估标准</li>"""
-        html += """
-            </ul>"""
-    else:
-        html += """
-            <p>无法进行完整的对比分析</p>"""
-    
-    html += f"""
-        </div>
-        
-        <div class="footer">
-            <p>报告生成时间: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-        </div>
-    </div>
-</body>
-</html>"""
-    
-    return html
+    if result is None:
+        result = tool.analyze(score_df, test_type=test_type, alpha=alpha, baseline_model=baseline_model)
+    return HtmlReport(result, page_rows=REPORT_PAGE_ROWS).to_html()
 
 def quick_analysis(csv_file, baseline_model=None, test_type='wilcoxon', alpha=0.05):
     """
@@ -469,11 +135,11 @@ def quick_analysis(csv_file, baseline_model=None, test_type='wilcoxon', alpha=0.
     
     try:
         # 初始化工具
-        tool = ModelComparisonTool(csv_file)
+        tool = ModelComparisonTool(csv_file, workers=WORKERS)
         
-        # 加载数据
+        # 加载数据（手动设置分数字段时只解析这些列）
         print("📊 加载数据...")
-        df = tool.load_data()
+        df = tool.load_data(usecols=SCORE_COLUMNS)
         if df is None:
             return
         
@@ -491,13 +157,20 @@ def quick_analysis(csv_file, baseline_model=None, test_type='wilcoxon', alpha=0.
         
         # 清理数据
         print("🧹 清理数据...")
-        score_df = tool.clean_score_data()
+        score_df = tool.clean_score_data(missing=MISSING_POLICY)
         if score_df is None:
             return
         
+        # 统计检验（每对模型只检验一次，报告各部分共用）
+        result = tool.analyze(score_df, test_type=test_type, alpha=alpha, baseline_model=baseline_model,
+                              n_bootstrap=BOOTSTRAP_RESAMPLES, ci_method=BOOTSTRAP_METHOD, seed=BOOTSTRAP_SEED,
+                              n_permutations=N_PERMUTATIONS, permutation_seed=PERMUTATION_SEED,
+                              tolerance=PERMUTATION_TOLERANCE, correction=CORRECTION,
+                              correction_scope=CORRECTION_SCOPE)
+        
         # 基本统计信息
         print("\n📈 基本统计信息:")
-        stats_df = tool.calculate_basic_stats(score_df)
+        stats_df = result.stats_df
         print(stats_df.to_string(index=False))
         
         # 找出最佳模型
@@ -506,15 +179,10 @@ def quick_analysis(csv_file, baseline_model=None, test_type='wilcoxon', alpha=0.
         best_score = stats_df.loc[best_model_idx, '均值']
         print(f"\n🏆 最佳模型: {best_model} (平均得分: {best_score:.4f})")
         
-        # 生成HTML格式的分析报告
-        html_report = generate_html_report(
-            stats_df, 
-            score_df, 
-            tool, 
-            baseline_model, 
-            test_type, 
-            alpha
-        )
+        # 生成HTML格式的分析报告，逐段写入文件
+        report_file = f"{os.path.splitext(csv_file)[0]}_analysis_report.html"
+        with open(report_file, 'w', encoding='utf-8') as f:
+            HtmlReport(result, page_rows=REPORT_PAGE_ROWS).write(f)
         
         # 输出HTML报告信息
         print("\n" + "="*80)
@@ -523,17 +191,14 @@ def quick_analysis(csv_file, baseline_model=None, test_type='wilcoxon', alpha=0.
         print("✅ HTML报告已生成，包含完整的统计分析结果")
         print("📊 报告包含：数据概览、基本统计、两两对比、基线对比、分析总结")
         
-        # 保存HTML报告到文件
-        report_file = f"{os.path.splitext(csv_file)[0]}_analysis_report.html"
-        with open(report_file, 'w', encoding='utf-8') as f:
-            f.write(html_report)
         print(f"\n💾 详细报告已保存到: {report_file}")
         print(f"🌐 请在浏览器中打开查看: {report_file}")
         
         # 创建可视化
         print("\n📊 生成可视化图表...")
-        tool.create_visualization(score_df, save_path=f"{os.path.splitext(csv_file)[0]}_analysis.png")
-        print(f"图表已保存到: {os.path.splitext(csv_file)[0]}_analysis.png")
+        chart_file = f"{os.path.splitext(csv_file)[0]}_analysis.{CHART_FORMAT}"
+        tool.create_visualization(score_df, save_path=chart_file, fmt=CHART_FORMAT, dpi=CHART_DPI)
+        print(f"图表已保存到: {chart_file}")
         
         print("\n✅ 分析完成!")
         
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享的清理后分数矩阵
+同一数据集、字段组合和缺失值处理方式清理得到的分数矩阵保存为 .npy 文件，
+各 Web 工作进程及检验子进程都以只读内存映射打开同一文件，共用同一份物理页；
+进程内按引用计数管理映射，数据集回收时删除文件（仍在使用的等最后一个引用释放后删除）
+"""
+
+import os
+import threading
+import uuid
+from typing import Dict, Optional, Sequence, Set
+
+import numpy as np
+
+from dataset_cache import new_content_hash
+
+# 每个数据集最多保留的矩阵文件数（不同字段组合），超出时删除最久未使用且未被引用的文件
+DEFAULT_MAX_MATRICES_PER_DATASET = 8
+
+# 矩阵文件目录后缀（位于数据集存储目录下，按数据集 ID 命名）
+MATRIX_DIR_SUFFIX = '.matrices'
+
+
+def matrix_key(dataset_key: str, encoding: str, columns: Sequence[str], missing: str, dtype) -> str:
+    """
+    清理后分数矩阵的键
+
+    Args:
+        dataset_key: 文件内容哈希
+        encoding: 文件编码
+        columns: 分数字段（按顺序）
+        missing: 缺失值处理方式
+        dtype: 矩阵数据类型
+
+    Returns:
+        str: 十六进制哈希值
+    """
+    digest = new_content_hash()
+    for part in (dataset_key, encoding, missing, np.dtype(dtype).str, *columns):
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class SharedMatrix:
+    """
+    已映射的清理后分数矩阵
+    """
+
+    def __init__(self, dataset_id: str, key: str, path: str, matrix: np.ndarray,
+                 valid_rows: np.ndarray, valid_bits: Optional[np.ndarray]):
+        """
+        Args:
+            dataset_id: 数据集 ID
+            key: 矩阵键
+            path: 矩阵 .npy 文件路径（子进程按路径映射）
+            matrix: 只读内存映射的 Fortran 顺序矩阵
+            valid_rows: 原数据每行是否保留的布尔掩码
+            valid_bits: 按列有效值位掩码，保留的行没有缺失值时为None
+        """
+        self.dataset_id = dataset_id
+        self.key = key
+        self.path = path
+        self.matrix = matrix
+        self.valid_rows = valid_rows
+        self.valid_bits = valid_bits
+
+
+class SharedMatrixStore:
+    """
+    按数据集 ID 组织的共享矩阵文件，线程安全
+    """
+
+    def __init__(self, storage_dir: str, max_per_dataset: int = DEFAULT_MAX_MATRICES_PER_DATASET):
+        """
+        初始化存储
+
+        Args:
+            storage_dir: 数据集存储目录（多进程部署时需共享同一目录）
+            max_per_dataset: 每个数据集最多保留的矩阵文件数
+        """
+        self.storage_dir = storage_dir
+        self.max_per_dataset = max_per_dataset
+        # 矩阵文件路径 → [已映射的矩阵, 本进程内的引用数]
+        self._mapped: Dict[str, list] = {}
+        # 已回收但仍被引用的矩阵文件，最后一个引用释放后删除
+        self._pending_removal: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def dataset_dir(self, dataset_id: str) -> str:
+        """数据集的矩阵文件目录"""
+        return os.path.join(self.storage_dir, f"{dataset_id}{MATRIX_DIR_SUFFIX}")
+
+    def _paths(self, dataset_id: str, key: str):
+        base = os.path.join(self.dataset_dir(dataset_id), key)
+        return f"{base}.npy", f"{base}.rows.npy", f"{base}.bits.npy"
+
+    def acquire(self, dataset_id: str, key: str) -> Optional[SharedMatrix]:
+        """
+        映射已有的矩阵文件并增加引用（本进程已映射时直接复用）
+
+        Args:
+            dataset_id: 数据集 ID
+            key: 矩阵键（见 matrix_key）
+
+        Returns:
+            Optional[SharedMatrix]: 矩阵，文件不存在或已回收时返回 None
+        """
+        matrix_path, rows_path, bits_path = self._paths(dataset_id, key)
+        with self._lock:
+            entry = self._mapped.get(matrix_path)
+            if entry is not None:
+                entry[1] += 1
+                return entry[0]
+            if matrix_path in self._pending_removal:
+                return None
+            try:
+                valid_rows = np.load(rows_path)
+                valid_bits = np.load(bits_path) if os.path.exists(bits_path) else None
+                matrix = np.load(matrix_path, mmap_mode='r')
+                # 更新修改时间，按最近使用淘汰
+                os.utime(matrix_path)
+            except (OSError, ValueError):
+                return None
+            shared = SharedMatrix(dataset_id, key, matrix_path, matrix, valid_rows, valid_bits)
+            self._mapped[matrix_path] = [shared, 1]
+            return shared
+
+    def publish(self, dataset_id: str, key: str, matrix: np.ndarray, valid_rows: np.ndarray,
+                valid_bits: Optional[np.ndarray]) -> SharedMatrix:
+        """
+        保存清理后的矩阵并映射（引用计数为 1）。各文件先写入临时文件再替换，
+        矩阵文件最后替换，其他进程看到矩阵文件时掩码文件已就绪
+
+        Args:
+            dataset_id: 数据集 ID
+            key: 矩阵键
+            matrix: 形状为 (行数, 模型数) 的矩阵
+            valid_rows: 原数据每行是否保留的布尔掩码
+            valid_bits: 按列有效值位掩码，可为None
+
+        Returns:
+            SharedMatrix: 映射后的矩阵
+        """
+        directory = self.dataset_dir(dataset_id)
+        os.makedirs(directory, exist_ok=True)
+        matrix_path, rows_path, bits_path = self._paths(dataset_id, key)
+        for path, values in ((rows_path, valid_rows), (bits_path, valid_bits),
+                             (matrix_path, np.asfortranarray(matrix))):
+            if values is None:
+                continue
+            tmp_path = f"{path}.tmp-{uuid.uuid4().hex}.npy"
+            try:
+                np.save(tmp_path, values)
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+
+        with self._lock:
+            self._pending_removal.discard(matrix_path)
+            entry = self._mapped.get(matrix_path)
+            if entry is not None:
+                entry[1] += 1
+                shared = entry[0]
+            else:
+                shared = SharedMatrix(dataset_id, key, matrix_path, np.load(matrix_path, mmap_mode='r'),
+                                      valid_rows, valid_bits)
+                self._mapped[matrix_path] = [shared, 1]
+            self._prune(dataset_id)
+        return shared
+
+    def release(self, shared: SharedMatrix) -> None:
+        """
+        释放一个引用，引用数归零时解除本进程的映射；已回收的文件在此时删除
+
+        Args:
+            shared: acquire 或 publish 返回的矩阵
+        """
+        with self._lock:
+            entry = self._mapped.get(shared.path)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del self._mapped[shared.path]
+            if shared.path in self._pending_removal:
+                self._pending_removal.discard(shared.path)
+                self._remove_files(shared.path)
+                self._remove_dir_if_empty(os.path.dirname(shared.path))
+
+    def references(self, dataset_id: str) -> int:
+        """本进程内对该数据集矩阵的引用总数"""
+        with self._lock:
+            return sum(refs for shared, refs in self._mapped.values() if shared.dataset_id == dataset_id)
+
+    def discard_dataset(self, dataset_id: str) -> None:
+        """
+        删除数据集的全部矩阵文件；本进程仍在使用的文件等引用释放后删除
+        （其他进程已建立的映射在文件删除后仍然有效）
+
+        Args:
+            dataset_id: 数据集 ID
+        """
+        directory = self.dataset_dir(dataset_id)
+        with self._lock:
+            for matrix_path in self._matrix_files(directory):
+                if matrix_path in self._mapped:
+                    self._pending_removal.add(matrix_path)
+                else:
+                    self._remove_files(matrix_path)
+            self._remove_dir_if_empty(directory)
+
+    def _matrix_files(self, directory: str):
+        """目录下的矩阵文件（不含掩码和临时文件）"""
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return []
+        return [os.path.join(directory, name) for name in names
+                if name.endswith('.npy') and name.count('.') == 1]
+
+    def _prune(self, dataset_id: str) -> None:
+        """删除超出数量上限、最久未使用且未被引用的矩阵文件（调用方需持有锁）"""
+        files = [path for path in self._matrix_files(self.dataset_dir(dataset_id)) if path not in self._mapped]
+        excess = len(files) + sum(1 for shared, _ in self._mapped.values()
+                                  if shared.dataset_id == dataset_id) - self.max_per_dataset
+        if excess <= 0:
+            return
+
+        def mtime(path):
+            try:
+                return os.path.getmtime(path)
+            except OSError:
+                return 0.0
+
+        for path in sorted(files, key=mtime)[:excess]:
+            self._remove_files(path)
+
+    @staticmethod
+    def _remove_files(matrix_path: str) -> None:
+        base = matrix_path[:-len('.npy')]
+        for path in (matrix_path, f"{base}.rows.npy", f"{base}.bits.npy"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _remove_dir_if_empty(directory: str) -> None:
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
@@ -0,0 +1,692 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式分块分析
+按块读取超出内存的 CSV 文件，维护可合并的运行统计量，
+在不加载完整数据表的情况下得到基本统计信息和配对t检验结果；
+秩检验与置换检验读取磁盘缓存的列，两列超出内存上限时按行分块计算
+"""
+
+import os
+import shutil
+import tempfile
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import special
+
+from analysis_result import AnalysisResult
+from pairwise_engine import (BASELINE_TEST_TYPES, DEFAULT_N_PERMUTATIONS, DEFAULT_PERMUTATION_TOLERANCE,
+                             TEST_NAMES, WILCOXON_EXACT_MAX_N, all_pairs, baseline_table,
+                             mannwhitney_normal_p, pairwise_table, partial_progress,
+                             permutation_p_values, permutation_threshold, run_pair_tests, sign_flips,
+                             wilcoxon_normal_p)
+
+# 默认内存上限（字节）
+DEFAULT_MAX_MEMORY_BYTES = 256 * 1024 * 1024
+# 默认分位数抽样容量（行）
+DEFAULT_RESERVOIR_SIZE = 100_000
+# run_pair_tests 检验单个模型对时每行的内存估算（与其秩计算块的 16 倍估算一致）
+IN_MEMORY_BYTES_PER_ROW = 8 * 16
+# 分块秩计算中每个值的内存估算（排序下标、排序后的值与标签、分组边界等）
+RANK_BYTES_PER_VALUE = 64
+# 分块秩计算每层最多的分桶数（每个桶同时打开两个文件），更多的值逐层细分
+RANK_MAX_BUCKETS = 128
+
+
+class RunningMoments:
+    """
+    可合并的均值与协方差运行统计（Chan 并行算法）
+
+    同时记录每列的计数、均值、最小值、最大值以及列间的离差积矩阵，
+    任意两列差值的平方和可由 M2[i,i] + M2[j,j] - 2*M2[i,j] 得到。
+    """
+
+    def __init__(self, k: int):
+        self.count = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+
+    def update(self, block: np.ndarray) -> None:
+        """
+        合并一个数据块
+
+        Args:
+            block: 形状为 (行数, 列数) 的无缺失值矩阵
+        """
+        if len(block) == 0:
+            return
+        other = RunningMoments(block.shape[1])
+        other.count = len(block)
+        other.mean = block.mean(axis=0)
+        centered = block - other.mean
+        other.comoment = centered.T @ centered
+        other.min = block.min(axis=0)
+        other.max = block.max(axis=0)
+        self.merge(other)
+
+    def merge(self, other: 'RunningMoments') -> None:
+        """合并另一份运行统计"""
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.comoment += other.comoment + np.outer(delta, delta) * (self.count * other.count / total)
+        self.mean += delta * (other.count / total)
+        self.count = total
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+
+    def variance(self) -> np.ndarray:
+        """各列的样本方差"""
+        if self.count < 2:
+            return np.full(len(self.mean), np.nan)
+        return np.diag(self.comoment) / (self.count - 1)
+
+    def diff_sum_squares(self, idx_a: np.ndarray, idx_b: np.ndarray) -> np.ndarray:
+        """列 a - 列 b 的离差平方和"""
+        c = self.comoment
+        return c[idx_a, idx_a] + c[idx_b, idx_b] - 2.0 * c[idx_a, idx_b]
+
+
+class RowReservoir:
+    """
+    可合并的等概率行抽样（bottom-k 抽样：为每行分配随机键，保留键最小的 k 行）
+
+    数据量不超过容量时保存全部行，分位数与全量计算结果一致。
+    """
+
+    def __init__(self, k: int, size: int = DEFAULT_RESERVOIR_SIZE,
+                 rng: Optional[np.random.Generator] = None):
+        self.size = size
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.keys = np.empty(0)
+        self.rows = np.empty((0, k))
+
+    def update(self, block: np.ndarray) -> None:
+        """加入一个数据块"""
+        other = RowReservoir(block.shape[1], self.size, self.rng)
+        other.keys = self.rng.random(len(block))
+        other.rows = block
+        self.merge(other)
+
+    def merge(self, other: 'RowReservoir') -> None:
+        """合并另一份抽样"""
+        keys = np.concatenate([self.keys, other.keys])
+        rows = np.concatenate([self.rows, other.rows])
+        if len(keys) > self.size:
+            keep = np.argpartition(keys, self.size)[:self.size]
+            keys, rows = keys[keep], rows[keep]
+        self.keys = keys
+        self.rows = rows
+
+    def quantile(self, q: float) -> np.ndarray:
+        """各列的分位数（线性插值，与 pandas 一致）"""
+        if len(self.rows) == 0:
+            return np.full(self.rows.shape[1], np.nan)
+        return np.quantile(self.rows, q, axis=0)
+
+
+class ColumnSpill:
+    """
+    将清理后的分数列按列追加写入磁盘，供秩检验按需以内存映射方式读取
+    """
+
+    def __init__(self, k: int, spill_dir: Optional[str] = None):
+        self.directory = tempfile.mkdtemp(prefix='score_spill_', dir=spill_dir)
+        self.paths = [os.path.join(self.directory, f"col_{j}.f64") for j in range(k)]
+        self._files = [open(path, 'wb') for path in self.paths]
+        self.rows = 0
+
+    def append(self, block: np.ndarray) -> None:
+        """追加一个数据块"""
+        for j, f in enumerate(self._files):
+            f.write(np.ascontiguousarray(block[:, j]).tobytes())
+        self.rows += len(block)
+
+    def finish(self) -> None:
+        """结束写入"""
+        for f in self._files:
+            f.close()
+
+    def column(self, j: int) -> np.ndarray:
+        """以只读内存映射方式打开第 j 列"""
+        if self.rows == 0:
+            return np.empty(0)
+        return np.memmap(self.paths[j], dtype=np.float64, mode='r', shape=(self.rows,))
+
+    def cleanup(self) -> None:
+        """删除磁盘上的临时文件"""
+        self.finish()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _iter_pair_blocks(column_a: np.ndarray, column_b: np.ndarray,
+                      rows: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """按行分块读取两列（内存映射的切片不复制数据）"""
+    for start in range(0, len(column_a), rows):
+        yield column_a[start:start + rows], column_b[start:start + rows]
+
+
+def _sorted_rank_sum(values: np.ndarray, labels: np.ndarray, offset: float) -> Tuple[float, float, bool]:
+    """
+    排序求平均秩（秩从 offset + 1 开始）
+
+    Returns:
+        Tuple[float, float, bool]: (标记值的秩和, 结校正项 sum(t^3 - t), 是否有结)
+    """
+    if len(values) == 0:
+        return 0.0, 0.0, False
+    order = np.argsort(values, kind='stable')
+    ordered = values[order]
+    starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    ends = np.r_[starts[1:], len(ordered)]
+    sizes = (ends - starts).astype(np.float64)
+    ranks = offset + (starts + ends + 1) / 2.0
+    labelled = np.add.reduceat(labels[order].astype(np.int64), starts)
+    return float(ranks @ labelled), float((sizes ** 3 - sizes).sum()), bool((sizes > 1).any())
+
+
+def _blocked_rank_sum(blocks: Callable[[], Iterator[Tuple[np.ndarray, np.ndarray]]],
+                      total: int,
+                      budget: int,
+                      directory: str,
+                      offset: float = 0.0) -> Tuple[float, float, bool]:
+    """
+    计算一组值中标记值的平均秩之和
+
+    值的个数不超过 budget 时直接排序；否则以抽样分位点为界把值写入磁盘分桶
+    （每个分位点的值单独成桶，桶按值从小到大排列），逐桶求秩：
+    单值桶的秩直接得到，其余桶仍超出 budget 时继续细分。
+
+    Args:
+        blocks: 返回 (值, 是否标记) 块迭代器的函数，可重复调用
+        total: 值的总数
+        budget: 一次读入内存的值个数上限
+        directory: 分桶文件的目录
+        offset: 比这组值小的值的个数（秩的起点）
+
+    Returns:
+        Tuple[float, float, bool]: (标记值的秩和, 结校正项 sum(t^3 - t), 是否有结)
+    """
+    if total <= budget:
+        parts = list(blocks())
+        if not parts:
+            return 0.0, 0.0, False
+        return _sorted_rank_sum(np.concatenate([values for values, _ in parts]),
+                                np.concatenate([labels for _, labels in parts]), offset)
+
+    # 等间隔抽取不超过 budget / 2 个值（复制出来，不保留对整块数据的引用），
+    # 取约 2 * total / budget 个分位点（均为抽样中的值）
+    stride = -(-total // max(1, budget // 2))
+    sample = np.concatenate([values[::stride].copy() for values, _ in blocks()])
+    n_buckets = min(-(-2 * total // budget), RANK_MAX_BUCKETS // 2)
+    cuts = np.unique(np.quantile(sample, np.linspace(0.0, 1.0, n_buckets + 1)[1:-1], method='lower'))
+    del sample
+    # 桶 k 存放 edges[k-1] < 值 <= edges[k]，每个分位点前加一个相邻浮点数，使分位点的值单独成桶
+    edges = np.unique(np.concatenate([np.nextafter(cuts, -np.inf), cuts]))
+    single = np.zeros(len(edges) + 1, dtype=bool)
+    single[:-1] = np.isin(edges, cuts) & np.isin(np.nextafter(edges, -np.inf), edges)
+
+    bucket_dir = tempfile.mkdtemp(prefix='rank_', dir=directory)
+    try:
+        paths = [(os.path.join(bucket_dir, f"{k}.f64"), os.path.join(bucket_dir, f"{k}.lab"))
+                 for k in range(len(edges) + 1)]
+        counts = np.zeros(len(paths), dtype=np.int64)
+        # 同时打开的桶文件较多，不使用写缓冲（每块数据对每个桶只写入一次）
+        files = [(open(value_path, 'wb', buffering=0), open(label_path, 'wb', buffering=0))
+                 for value_path, label_path in paths]
+        try:
+            for values, labels in blocks():
+                bucket = np.searchsorted(edges, values, side='left')
+                order = np.argsort(bucket, kind='stable')
+                sizes = np.bincount(bucket, minlength=len(paths))
+                splits = np.cumsum(sizes)[:-1]
+                for k, (part_values, part_labels) in enumerate(zip(np.split(values[order], splits),
+                                                                   np.split(labels[order], splits))):
+                    if len(part_values):
+                        files[k][0].write(np.ascontiguousarray(part_values, dtype=np.float64).tobytes())
+                        files[k][1].write(np.ascontiguousarray(part_labels, dtype=bool).tobytes())
+                counts += sizes
+        finally:
+            for value_file, label_file in files:
+                value_file.close()
+                label_file.close()
+
+        rank_sum, tie_term, has_ties = 0.0, 0.0, False
+        step = max(1, budget // 4)
+        for (value_path, label_path), count, is_single in zip(paths, counts, single):
+            count = int(count)
+            if count == 0:
+                continue
+
+            def bucket_blocks(value_path=value_path, label_path=label_path, count=count):
+                values = np.memmap(value_path, dtype=np.float64, mode='r', shape=(count,))
+                labels = np.memmap(label_path, dtype=bool, mode='r', shape=(count,))
+                for start in range(0, count, step):
+                    yield values[start:start + step], labels[start:start + step]
+
+            if is_single:
+                # 单值桶：所有值的秩均为桶内位置的平均值
+                labelled = sum(int(np.count_nonzero(labels)) for _, labels in bucket_blocks())
+                part = (labelled * (offset + (count + 1) / 2.0), float(count) ** 3 - count, count > 1)
+            elif count < total:
+                part = _blocked_rank_sum(bucket_blocks, count, budget, bucket_dir, offset)
+            else:
+                # 分位点未能拆分（仅在存在 NaN 等无法比较的值时发生）：直接排序
+                part = _blocked_rank_sum(bucket_blocks, count, count, bucket_dir, offset)
+            rank_sum += part[0]
+            tie_term += part[1]
+            has_ties = has_ties or part[2]
+            offset += count
+        return rank_sum, tie_term, has_ties
+    finally:
+        shutil.rmtree(bucket_dir, ignore_errors=True)
+
+
+class StreamingComparison:
+    """
+    流式模型对比分析
+
+    与 ModelComparisonTool 相同，包含缺失值的行会被整行移除（按块进行）。
+    内存占用由 max_memory_bytes 限定：据此确定每块读取的行数和抽样容量。
+    秩检验（Wilcoxon、Mann-Whitney U）与置换检验需要全部数据，在 spill=True 时
+    将清理后的列写入磁盘，检验时每次只映射两列；两列超出内存上限时按行分块计算
+    （秩检验在磁盘上按值分桶求秩，置换检验按行分段生成与内存计算相同的符号翻转），
+    此时使用正态近似，与 run_pair_tests 在该样本量下的结果一致。
+    """
+
+    def __init__(self, csv_file_path: str,
+                 score_columns: List[str],
+                 model_names: Optional[List[str]] = None,
+                 encoding: str = 'utf-8',
+                 max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+                 reservoir_size: int = DEFAULT_RESERVOIR_SIZE,
+                 spill: bool = False,
+                 spill_dir: Optional[str] = None,
+                 seed: Optional[int] = None):
+        """
+        初始化流式分析
+
+        Args:
+            csv_file_path: CSV文件路径
+            score_columns: 分数字段列表
+            model_names: 模型名称列表，为None时使用字段名
+            encoding: 文件编码
+            max_memory_bytes: 内存上限（字节）
+            reservoir_size: 分位数抽样容量（行），会被压缩到内存上限的四分之一以内
+            spill: 是否将清理后的数据写入磁盘以支持秩检验
+            spill_dir: 磁盘缓存目录，为None时使用系统临时目录
+            seed: 抽样随机种子
+        """
+        self.csv_file_path = csv_file_path
+        self.score_columns = list(score_columns)
+        self.model_names = list(model_names) if model_names is not None else list(score_columns)
+        self.encoding = encoding
+        self.max_memory_bytes = max_memory_bytes
+
+        k = len(self.score_columns)
+        row_bytes = max(1, k * 8)
+        self.reservoir_size = int(max(1, min(reservoir_size, max_memory_bytes // 4 // row_bytes)))
+        # 分块读取时同时存在解析结果、数值矩阵和中心化副本，按 4 倍估算
+        self.chunk_rows = int(max(1, (max_memory_bytes - self.reservoir_size * row_bytes * 2) // (row_bytes * 4)))
+
+        self.moments = RunningMoments(k)
+        self.reservoir = RowReservoir(k, self.reservoir_size, np.random.default_rng(seed))
+        self.spill = ColumnSpill(k, spill_dir) if spill else None
+        self.total_rows = 0
+        self.removed_rows = 0
+
+    def run(self) -> 'StreamingComparison':
+        """
+        逐块读取文件并更新运行统计
+
+        Returns:
+            StreamingComparison: 自身，便于链式调用
+        """
+        reader = pd.read_csv(self.csv_file_path, encoding=self.encoding,
+                             usecols=self.score_columns, chunksize=self.chunk_rows)
+        for chunk in reader:
+            block = np.column_stack([
+                pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=np.float64)
+                for col in self.score_columns
+            ])
+            complete = ~np.isnan(block).any(axis=1)
+            self.total_rows += len(block)
+            self.removed_rows += int((~complete).sum())
+            block = block[complete]
+
+            self.moments.update(block)
+            self.reservoir.update(block)
+            if self.spill is not None:
+                self.spill.append(block)
+
+        if self.spill is not None:
+            self.spill.finish()
+
+        if self.removed_rows > 0:
+            print(f"🧹 移除了 {self.removed_rows} 行包含缺失值的数据")
+        print(f"✅ 流式读取完成，剩余 {self.moments.count} 行有效数据")
+        return self
+
+    @property
+    def sample_count(self) -> int:
+        """有效样本数"""
+        return self.moments.count
+
+    def calculate_basic_stats(self) -> pd.DataFrame:
+        """
+        计算基本统计信息（格式与 ModelComparisonTool.calculate_basic_stats 一致）
+
+        有效行数超过抽样容量时，中位数和分位数为抽样估计值。
+
+        Returns:
+            pd.DataFrame: 统计信息
+        """
+        std = np.sqrt(self.moments.variance())
+        empty = self.moments.count == 0
+        stats_data = []
+        median = self.reservoir.quantile(0.5)
+        q25 = self.reservoir.quantile(0.25)
+        q75 = self.reservoir.quantile(0.75)
+        for i, name in enumerate(self.model_names[:len(self.score_columns)]):
+            stats_data.append({
+                '模型': name,
+                '样本数': self.moments.count,
+                '均值': np.nan if empty else self.moments.mean[i],
+                '标准差': std[i],
+                '中位数': median[i],
+                '最小值': np.nan if empty else self.moments.min[i],
+                '最大值': np.nan if empty else self.moments.max[i],
+                '25%分位数': q25[i],
+                '75%分位数': q75[i]
+            })
+        return pd.DataFrame(stats_data)
+
+    def pairwise_comparison(self, test_type: str = 'ttest', alpha: float = 0.05) -> pd.DataFrame:
+        """
+        两两模型对比
+
+        配对t检验直接由运行统计量得到；秩检验需要 spill=True。
+
+        Args:
+            test_type: 统计检验类型
+            alpha: 显著性水平
+
+        Returns:
+            pd.DataFrame: 对比结果
+        """
+        if len(self.score_columns) < 2:
+            print("❌ 至少需要2个模型进行对比")
+            return None
+        if not self._check_test_type(test_type, TEST_NAMES):
+            return pd.DataFrame()
+
+        idx_a, idx_b = all_pairs(len(self.score_columns))
+        pair_stats = self._pair_tests(idx_a, idx_b, test_type)
+        return pairwise_table(self.model_names, idx_a, idx_b, pair_stats, test_type, alpha)
+
+    def baseline_comparison(self, baseline_model: str, test_type: str = 'ttest',
+                            alpha: float = 0.05) -> pd.DataFrame:
+        """
+        与基线模型对比
+
+        Args:
+            baseline_model: 基线模型字段名
+            test_type: 统计检验类型
+            alpha: 显著性水平
+
+        Returns:
+            pd.DataFrame: 对比结果
+        """
+        if baseline_model not in self.score_columns:
+            print(f"❌ 基线模型 {baseline_model} 不存在")
+            return None
+        if not self._check_test_type(test_type, BASELINE_TEST_TYPES):
+            return pd.DataFrame()
+
+        baseline_idx = self.score_columns.index(baseline_model)
+        idx_a = [i for i in range(len(self.score_columns)) if i != baseline_idx]
+        idx_b = [baseline_idx] * len(idx_a)
+        pair_stats = self._pair_tests(np.asarray(idx_a), np.asarray(idx_b), test_type)
+        return baseline_table(self.model_names, baseline_model, idx_a, pair_stats, test_type, alpha)
+
+    def analyze(self, test_type: str = 'ttest', alpha: float = 0.05,
+                baseline_model: Optional[str] = None,
+                progress: Optional[Callable[[int, int, Callable[[], pd.DataFrame]], None]] = None,
+                correction: Optional[str] = None,
+                correction_scope: str = 'table',
+                n_permutations: int = DEFAULT_N_PERMUTATIONS,
+                permutation_seed: Optional[int] = None,
+                tolerance: float = DEFAULT_PERMUTATION_TOLERANCE
+                ) -> AnalysisResult:
+        """
+        对全部模型对进行一次检验，得到可派生各类结果的分析对象
+
+        Args:
+            test_type: 统计检验类型
+            alpha: 显著性水平
+            baseline_model: 基线模型字段名
+            progress: 进度回调 progress(已完成对数, 总对数, partial)，
+                partial() 返回已完成部分的两两对比表
+            correction: 多重比较校正方法，为None时不校正
+            correction_scope: 校正范围 ('table', 'combined')
+            n_permutations: 置换检验的随机符号翻转次数
+            permutation_seed: 置换检验的随机种子（所有模型对共用同一组符号翻转）
+            tolerance: 置换检验提前停止的容差，0 表示不提前停止
+
+        Returns:
+            AnalysisResult: 分析结果
+        """
+        idx_a, idx_b = all_pairs(len(self.score_columns))
+        pair_stats = None
+        if self._check_test_type(test_type, TEST_NAMES) and len(idx_a) > 0:
+            pair_stats = self._pair_tests(
+                idx_a, idx_b, test_type,
+                progress=partial_progress(progress, self.model_names, idx_a, idx_b, test_type, alpha),
+                permutation={'n_permutations': n_permutations, 'seed': permutation_seed,
+                             'tolerance': tolerance, 'alpha': alpha}
+            )
+
+        return AnalysisResult(
+            self.score_columns, self.model_names, self.sample_count,
+            self.calculate_basic_stats(), idx_a, idx_b, pair_stats,
+            test_type=test_type, alpha=alpha, baseline_model=baseline_model,
+            correction=correction, correction_scope=correction_scope
+        )
+
+    def close(self) -> None:
+        """释放磁盘缓存"""
+        if self.spill is not None:
+            self.spill.cleanup()
+            self.spill = None
+
+    def _check_test_type(self, test_type: str, supported) -> bool:
+        """检查检验类型是否可用"""
+        if test_type not in supported:
+            print(f"❌ 不支持的检验类型: {test_type}")
+            return False
+        if test_type != 'ttest' and self.spill is None:
+            print(f"❌ 流式模式下 {test_type} 检验需要启用磁盘缓存 (spill=True)")
+            return False
+        return True
+
+    def _pair_tests(self, idx_a: np.ndarray, idx_b: np.ndarray, test_type: str,
+                    progress: Optional[Callable[[int, Dict[str, np.ndarray]], None]] = None,
+                    permutation: Optional[Dict] = None) -> Dict[str, np.ndarray]:
+        """
+        计算模型对的检验结果，返回格式与 run_pair_tests 一致
+
+        Args:
+            idx_a: 每对第一个模型的列下标
+            idx_b: 每对第二个模型的列下标
+            test_type: 统计检验类型
+            progress: 每完成一对后调用 progress(已完成对数, 结果字典)
+            permutation: 置换检验设置 {'n_permutations', 'seed', 'tolerance', 'alpha'}，
+                为None时使用默认翻转次数与容差、不提前停止
+        """
+        if test_type == 'ttest':
+            result = self._paired_ttest(idx_a, idx_b)
+            if progress is not None:
+                progress(len(idx_a), result)
+            return result
+
+        # 秩检验与置换检验：每次只读取两列，超出内存上限时按行分块
+        if len(idx_a) == 0:
+            return run_pair_tests(np.empty((0, 0)), idx_a, idx_b, test_type)
+        permutation = dict(permutation or {'n_permutations': DEFAULT_N_PERMUTATIONS, 'seed': None,
+                                           'tolerance': DEFAULT_PERMUTATION_TOLERANCE, 'alpha': None})
+        # 置换检验逐对调用时固定同一随机种子，使各模型对共用同一组符号翻转
+        if permutation['seed'] is None and test_type == 'permutation':
+            permutation['seed'] = np.random.SeedSequence().entropy
+        result = None
+        for k, (a, b) in enumerate(zip(idx_a, idx_b)):
+            if self._pair_fits_in_memory(test_type):
+                pair = np.column_stack([self.spill.column(a), self.spill.column(b)])
+                pair_result = run_pair_tests(pair, [0], [1], test_type, block_bytes=self.max_memory_bytes,
+                                             **permutation)
+                del pair
+            else:
+                pair_result = self._blocked_pair_test(a, b, test_type, permutation)
+            if result is None:
+                result = {key: np.empty(len(idx_a), dtype=values.dtype)
+                          for key, values in pair_result.items()}
+            for key, values in pair_result.items():
+                result[key][k] = values[0]
+            if progress is not None:
+                progress(k + 1, result)
+        return result
+
+    def _pair_fits_in_memory(self, test_type: str) -> bool:
+        """单个模型对能否在内存上限内由 run_pair_tests 检验（小样本的精确检验总是在内存中进行）"""
+        rows = self.spill.rows
+        row_bytes = IN_MEMORY_BYTES_PER_ROW * (2 if test_type == 'mannwhitney' else 1)
+        return rows <= WILCOXON_EXACT_MAX_N or rows * row_bytes <= self.max_memory_bytes
+
+    def _blocked_pair_test(self, a: int, b: int, test_type: str,
+                           permutation: Dict) -> Dict[str, np.ndarray]:
+        """
+        按行分块检验单个模型对，内存占用不超过 max_memory_bytes
+
+        Args:
+            a: 第一个模型的列下标
+            b: 第二个模型的列下标
+            test_type: 统计检验类型（'wilcoxon'、'mannwhitney'、'permutation'）
+            permutation: 置换检验设置 {'n_permutations', 'seed', 'tolerance', 'alpha'}
+
+        Returns:
+            Dict[str, np.ndarray]: 与 run_pair_tests 格式一致的单对结果
+        """
+        column_a, column_b = self.spill.column(a), self.spill.column(b)
+        n = self.spill.rows
+        # 每块同时存在两列切片的差值、绝对值和比较结果，按 8 倍估算；置换检验的分段需按 64 行对齐
+        rows = max(64, self.max_memory_bytes // (8 * 8) // 64 * 64)
+
+        sum_a = sum_b = sum_diff = sum_abs = 0.0
+        nonzero = 0
+        for block_a, block_b in _iter_pair_blocks(column_a, column_b, rows):
+            diff = block_a - block_b
+            sum_a += float(block_a.sum())
+            sum_b += float(block_b.sum())
+            sum_diff += float(diff.sum())
+            sum_abs += float(np.abs(diff).sum())
+            nonzero += int(np.count_nonzero(diff))
+
+        result = {
+            'n': np.array([n], dtype=np.int64),
+            'mean_a': np.array([sum_a / n]),
+            'mean_b': np.array([sum_b / n]),
+            'mean_diff': np.array([sum_diff / n]),
+            'computable': np.ones(1, dtype=bool)
+        }
+        budget = max(1024, self.max_memory_bytes // RANK_BYTES_PER_VALUE)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if test_type == 'wilcoxon':
+                def blocks():
+                    for block_a, block_b in _iter_pair_blocks(column_a, column_b, rows):
+                        diff = block_a - block_b
+                        diff = diff[diff != 0]
+                        yield np.abs(diff), diff > 0
+
+                r_plus, tie_term, _ = _blocked_rank_sum(blocks, nonzero, budget, self.spill.directory)
+                r_minus = nonzero * (nonzero + 1.0) / 2.0 - r_plus
+                statistic = min(r_plus, r_minus)
+                p_value = wilcoxon_normal_p(nonzero, r_plus, tie_term)
+            elif test_type == 'mannwhitney':
+                def blocks():
+                    for block_a, block_b in _iter_pair_blocks(column_a, column_b, rows):
+                        yield block_a, np.ones(len(block_a), dtype=bool)
+                        yield block_b, np.zeros(len(block_b), dtype=bool)
+
+                r1, tie_term, _ = _blocked_rank_sum(blocks, 2 * n, budget, self.spill.directory)
+                statistic = r1 - n * (n + 1.0) / 2.0
+                p_value = mannwhitney_normal_p(float(n), statistic, tie_term)
+            else:
+                statistic = sum_diff / n
+                p_value, used = self._blocked_permutation(column_a, column_b, rows,
+                                                          permutation_threshold(sum_diff, sum_abs),
+                                                          permutation)
+                result['permutations'] = used
+                p_value = p_value[0]
+
+        result['statistic'] = np.array([statistic], dtype=np.float64)
+        result['p_value'] = np.array([p_value], dtype=np.float64)
+        return result
+
+    def _blocked_permutation(self, column_a: np.ndarray, column_b: np.ndarray, rows: int,
+                             observed: float, permutation: Dict):
+        """
+        按行分段的置换检验，第 p 次翻转使用与 run_pair_tests 相同的符号（随机数流的第 p 段）
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (p 值, 实际翻转次数)，均为长度 1 的数组
+        """
+        n = len(column_a)
+        words = (n + 63) // 64
+        base_state = np.random.PCG64(np.random.SeedSequence(permutation['seed'])).state
+        generator = np.random.PCG64()
+        # 每批翻转的符号矩阵约占内存上限的四分之一
+        batch = max(1, self.max_memory_bytes // (rows * 8 * 4))
+
+        def count_exceed(active: np.ndarray, start: int, stop: int) -> np.ndarray:
+            sums = np.zeros(stop - start)
+            for block, (block_a, block_b) in enumerate(_iter_pair_blocks(column_a, column_b, rows)):
+                diff = block_a - block_b
+                for first in range(start, stop, batch):
+                    size = min(batch, stop - first)
+                    signs = np.empty((size, len(diff)))
+                    for row in range(size):
+                        # 第 index 次翻转的符号从随机数流的第 index * words 个数开始，每 64 行一个数
+                        generator.state = base_state
+                        generator.advance((first + row) * words + block * rows // 64)
+                        signs[row] = sign_flips(generator, 1, len(diff))[0]
+                    sums[first - start:first - start + size] += signs @ diff
+            return np.array([np.count_nonzero(np.abs(sums) >= observed)])
+
+        return permutation_p_values(np.array([n]), permutation['n_permutations'], permutation['tolerance'],
+                                    permutation['alpha'], count_exceed)
+
+    def _paired_ttest(self, idx_a: np.ndarray, idx_b: np.ndarray) -> Dict[str, np.ndarray]:
+        """由运行统计量计算配对t检验"""
+        n = self.moments.count
+        mean = self.moments.mean
+        mean_diff = mean[idx_a] - mean[idx_b]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = np.maximum(self.moments.diff_sum_squares(idx_a, idx_b), 0.0) / (n - 1)
+            t = mean_diff / np.sqrt(var / n)
+            if n < 2:
+                t = np.full(len(idx_a), np.nan)
+            p_value = 2.0 * special.stdtr(max(n - 1, 0), -np.abs(t))
+        return {
+            'n': np.full(len(idx_a), n, dtype=np.int64),
+            'mean_a': mean[idx_a],
+            'mean_b': mean[idx_b],
+            'mean_diff': mean_diff,
+            'statistic': t,
+            'p_value': p_value,
+            'computable': np.ones(len(idx_a), dtype=bool),
+        }
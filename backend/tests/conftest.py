@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+接口测试的公共夹具：数据集注册表与共享矩阵存储改为每个测试独立的临时目录
+"""
+
+import io
+import time
+
+import pytest
+
+import app as app_module
+from dataset_registry import DatasetRegistry
+from shared_matrix import SharedMatrixStore
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Flask 测试客户端，上传的数据集保存在临时目录中"""
+    storage_dir = str(tmp_path / 'datasets')
+    matrix_store = SharedMatrixStore(storage_dir)
+    registry = DatasetRegistry(storage_dir, cache=app_module.dataset_cache,
+                               pair_cache=app_module.pair_cache, matrix_store=matrix_store)
+    monkeypatch.setattr(app_module, 'matrix_store', matrix_store)
+    monkeypatch.setattr(app_module, 'dataset_registry', registry)
+    with app_module.app.test_client() as test_client:
+        yield test_client
+    for dataset_id in list(registry._sessions):
+        registry.remove(dataset_id)
+
+
+def upload_csv(client, text: str, filename: str = 'scores.csv') -> dict:
+    """
+    通过 /api/upload 上传 CSV 文本
+
+    Args:
+        client: Flask 测试客户端
+        text: CSV 内容
+        filename: 上传文件名
+
+    Returns:
+        dict: 上传接口的响应
+    """
+    response = client.post('/api/upload', data={'file': (io.BytesIO(text.encode()), filename)},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def wait_for_job(client, job_id: str, timeout: float = 30.0) -> dict:
+    """
+    轮询 /api/jobs/<id> 直到任务结束
+
+    Args:
+        client: Flask 测试客户端
+        job_id: 任务 ID
+        timeout: 最长等待时间（秒）
+
+    Returns:
+        dict: 任务结束时的状态数据
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f'/api/jobs/{job_id}').get_json()
+        if job['state'] in ('completed', 'failed'):
+            return job
+        time.sleep(0.02)
+    raise TimeoutError(f'任务 {job_id} 未在 {timeout} 秒内结束')
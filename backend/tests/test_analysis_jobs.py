@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分析任务的生命周期、进度上报、保留策略及 /api/analyze 参数校验
+"""
+
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from analysis_jobs import JOB_COMPLETED, JOB_FAILED, JOB_RUNNING, JobManager
+from conftest import upload_csv, wait_for_job
+
+SCORES_CSV = 'model_a,model_b,model_c\n' + '\n'.join(
+    f'{i % 7},{(i * 3) % 5},{(i * 5) % 11}' for i in range(40)
+)
+
+
+def _wait(job, timeout: float = 5.0):
+    """等待任务结束"""
+    deadline = time.time() + timeout
+    while not job.finished and time.time() < deadline:
+        time.sleep(0.01)
+    assert job.finished
+
+
+def test_job_reports_progress_then_result():
+    manager = JobManager(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+    partial = pd.DataFrame({'Model A': ['a'], 'Model B': ['b']})
+
+    def task(job):
+        job.set_stage('testing')
+        job.report_pairs(1, 4, partial=lambda: partial)
+        started.set()
+        release.wait(5)
+        return {'answer': 42}
+
+    try:
+        job = manager.submit(task)
+        assert started.wait(5)
+        response = job.to_response()
+        assert response['state'] == JOB_RUNNING
+        assert response['stage'] == 'testing'
+        assert response['progress'] == 25.0
+        assert response['partialResults']['pairwiseComparison'] == [{'Model A': 'a', 'Model B': 'b'}]
+
+        release.set()
+        _wait(job)
+        response = manager.get(job.id).to_response()
+        assert response['state'] == JOB_COMPLETED
+        assert response['progress'] == 100.0
+        assert response['result'] == {'answer': 42}
+        assert 'partialResults' not in response
+    finally:
+        release.set()
+        manager.shutdown()
+
+
+def test_failed_job_records_error():
+    manager = JobManager(max_workers=1)
+
+    def task(job):
+        raise ValueError('bad column')
+
+    try:
+        job = manager.submit(task)
+        _wait(job)
+        response = job.to_response()
+        assert response['state'] == JOB_FAILED
+        assert 'bad column' in response['error']
+        assert 'result' not in response
+    finally:
+        manager.shutdown()
+
+
+def test_submit_rejects_when_queue_is_full():
+    manager = JobManager(max_workers=1, max_pending=1)
+    release = threading.Event()
+    try:
+        jobs = [manager.submit(lambda job: release.wait(5)) for _ in range(2)]
+        assert all(job is not None for job in jobs)
+        assert manager.submit(lambda job: {}) is None
+        release.set()
+        for job in jobs:
+            _wait(job)
+        assert manager.submit(lambda job: {}) is not None
+    finally:
+        release.set()
+        manager.shutdown()
+
+
+def test_finished_jobs_are_capped_oldest_first():
+    manager = JobManager(max_workers=1, max_finished=2)
+    try:
+        jobs = []
+        for _ in range(4):
+            job = manager.submit(lambda job: {})
+            _wait(job)
+            jobs.append(job)
+        assert [manager.get(job.id) is not None for job in jobs] == [False, False, True, True]
+    finally:
+        manager.shutdown()
+
+
+def test_finished_jobs_expire_after_ttl():
+    manager = JobManager(max_workers=1, result_ttl=0.05)
+    try:
+        job = manager.submit(lambda job: {})
+        _wait(job)
+        time.sleep(0.1)
+        assert manager.get(job.id) is None
+    finally:
+        manager.shutdown()
+
+
+@pytest.mark.parametrize('alpha', ['x', None, True, 0, 1, 5, -1, [0.05]])
+def test_analyze_rejects_invalid_alpha(client, alpha):
+    dataset = upload_csv(client, SCORES_CSV)
+    response = client.post('/api/analyze', json={
+        'datasetId': dataset['datasetId'], 'baseline': 'model_a',
+        'dataColumns': ['model_b', 'model_c'], 'alpha': alpha
+    })
+    assert response.status_code == 400
+    assert 'alpha' in response.get_json()['error']
+
+
+def test_analyze_job_completes(client):
+    dataset = upload_csv(client, SCORES_CSV)
+    response = client.post('/api/analyze', json={
+        'datasetId': dataset['datasetId'], 'baseline': 'model_a',
+        'dataColumns': ['model_b', 'model_c'], 'testType': 'ttest', 'alpha': 0.01
+    })
+    assert response.status_code == 202
+    job = wait_for_job(client, response.get_json()['jobId'])
+    assert job['state'] == JOB_COMPLETED, job.get('error')
+    assert job['completedPairs'] == job['totalPairs'] == 3
+    assert len(job['result']['pairwiseComparison']) == 3
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bootstrap 均值差异置信区间与 scipy.stats.bootstrap 的一致性
+
+两者以相同的种子按相同顺序抽取重采样下标，置信区间应在舍入误差内相同
+"""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from bootstrap import bootstrap_mean_diff
+from pairwise_engine import all_pairs
+
+
+def _scipy_interval(diff: np.ndarray, n_resamples: int, method: str, seed: int, confidence: float):
+    rng = np.random.Generator(np.random.PCG64(np.random.SeedSequence(seed)))
+    result = stats.bootstrap((diff,), np.mean, n_resamples=n_resamples, method=method,
+                             confidence_level=confidence, rng=rng, vectorized=True)
+    return result.confidence_interval
+
+
+# 离散分数的 BCa 偏差校正对“与原估计相等”的重采样留有舍入容差（scipy 按精确相等计数），只比较连续分数
+@pytest.mark.parametrize('method, scipy_method, decimals', [
+    ('percentile', 'percentile', None),
+    ('percentile', 'percentile', 1),
+    ('bca', 'BCa', None),
+])
+def test_matches_scipy_bootstrap(method, scipy_method, decimals):
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(size=(60, 3)) + [0.0, 0.2, 0.5]
+    if decimals is not None:
+        matrix = matrix.round(decimals)
+    idx_a, idx_b = all_pairs(3)
+    result = bootstrap_mean_diff(matrix, idx_a, idx_b, n_resamples=999, confidence=0.9, method=method, seed=42)
+    for k, (a, b) in enumerate(zip(idx_a, idx_b)):
+        expected = _scipy_interval(matrix[:, a] - matrix[:, b], 999, scipy_method, 42, 0.9)
+        assert result['ci_low'][k] == pytest.approx(expected.low, rel=1e-9)
+        assert result['ci_high'][k] == pytest.approx(expected.high, rel=1e-9)
+
+
+@pytest.mark.parametrize('method', ['percentile', 'bca'])
+def test_block_size_does_not_change_interval(method):
+    rng = np.random.default_rng(1)
+    matrix = rng.normal(size=(80, 5))
+    matrix[rng.random(matrix.shape) < 0.05] = np.nan
+    idx_a, idx_b = all_pairs(5)
+    whole = bootstrap_mean_diff(matrix, idx_a, idx_b, n_resamples=500, method=method, seed=3)
+    blocked = bootstrap_mean_diff(matrix, idx_a, idx_b, n_resamples=500, method=method, seed=3,
+                                  block_bytes=8 * 1024)
+    np.testing.assert_allclose(blocked['ci_low'], whole['ci_low'], rtol=1e-12)
+    np.testing.assert_allclose(blocked['ci_high'], whole['ci_high'], rtol=1e-12)
+
+
+def test_missing_values_only_use_rows_valid_in_both_columns():
+    """只缺失一行时，置信区间与完整数据的结果接近"""
+    rng = np.random.default_rng(2)
+    matrix = rng.normal(size=(100, 2)) + [0.0, 0.3]
+    missing = matrix.copy()
+    missing[5, 0] = np.nan
+    interval = bootstrap_mean_diff(missing, [0], [1], n_resamples=2000, seed=4)
+    complete = bootstrap_mean_diff(matrix, [0], [1], n_resamples=2000, seed=4)
+    assert interval['ci_low'][0] < interval['ci_high'][0]
+    assert interval['ci_low'][0] == pytest.approx(complete['ci_low'][0], abs=0.05)
+    assert interval['ci_high'][0] == pytest.approx(complete['ci_high'][0], abs=0.05)
+
+
+def test_interval_contains_mean_difference():
+    rng = np.random.default_rng(3)
+    matrix = rng.normal(size=(200, 2))
+    interval = bootstrap_mean_diff(matrix, [0], [1], n_resamples=2000, seed=5)
+    mean_diff = np.mean(matrix[:, 0] - matrix[:, 1])
+    assert interval['ci_low'][0] < mean_diff < interval['ci_high'][0]
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/api/charts 返回的图表数据与 pandas 直接计算结果的一致性及参数校验
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import upload_csv
+
+COLUMNS = ['model_a', 'model_b', 'model_c']
+
+
+@pytest.fixture
+def scores():
+    rng = np.random.default_rng(4)
+    df = pd.DataFrame({col: rng.integers(0, 5, size=40).astype(float) for col in COLUMNS})
+    df.loc[rng.random(40) < 0.3, 'model_b'] = np.nan
+    # model_c 在 model_b 有效的行上为常数，两者的相关系数为 NaN（JSON 中为 null）
+    df['model_c'] = np.where(df['model_b'].notna(), 2.0, df['model_c'])
+    return df
+
+
+def _csv(df: pd.DataFrame) -> str:
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize('missing', ['listwise', 'pairwise'])
+def test_chart_payload_matches_pandas(client, scores, missing):
+    dataset = upload_csv(client, _csv(scores))
+    response = client.post('/api/charts', json={'datasetId': dataset['datasetId'], 'baseline': 'model_a',
+                                                'dataColumns': COLUMNS, 'missing': missing, 'bins': 5})
+    assert response.status_code == 200, response.get_json()
+    payload = response.get_json()
+
+    df = scores.dropna() if missing == 'listwise' else scores.dropna(how='all')
+    assert payload['models'] == COLUMNS
+    assert payload['count'] == df.count().tolist()
+    np.testing.assert_allclose(payload['mean'], df.mean().to_numpy(), rtol=1e-5)
+    np.testing.assert_allclose(payload['box']['median'], df.median().to_numpy())
+    assert len(payload['histogram']['edges']) == 6
+    assert [sum(counts) for counts in payload['histogram']['counts']] == payload['count']
+
+    expected = df.corr().round(4).to_numpy()
+    result = np.array([[np.nan if value is None else value for value in row] for row in payload['correlation']])
+    np.testing.assert_allclose(result, expected, atol=1e-4, equal_nan=True)
+    assert payload['correlation'][1][2] is None
+
+
+@pytest.mark.parametrize('body', [
+    {'dataColumns': []},
+    {'dataColumns': COLUMNS, 'missing': 'none'},
+    {'dataColumns': COLUMNS, 'bins': 0},
+    {'dataColumns': COLUMNS, 'bins': True},
+])
+def test_chart_request_validation(client, scores, body):
+    dataset = upload_csv(client, _csv(scores))
+    response = client.post('/api/charts', json={'datasetId': dataset['datasetId'], **body})
+    assert response.status_code == 400
+
+
+def test_chart_request_requires_dataset(client):
+    assert client.post('/api/charts', json={'datasetId': 'f' * 32, 'dataColumns': COLUMNS}).status_code == 400
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图表汇总数据与 numpy/pandas/matplotlib 直接计算结果的一致性
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from matplotlib import cbook
+
+from chart_data import chart_data, correlation_matrix
+
+
+def _integer_scores(seed: int, missing: float) -> np.ndarray:
+    """取值为少数整数、按比例随机缺失的分数矩阵（容易出现常数列和重复值）"""
+    rng = np.random.default_rng(seed)
+    n_rows, n_cols = int(rng.integers(2, 15)), int(rng.integers(2, 6))
+    matrix = rng.integers(0, 4, size=(n_rows, n_cols)).astype(np.float64)
+    matrix[rng.random(matrix.shape) < missing] = np.nan
+    return matrix
+
+
+def _continuous_scores(n_rows: int = 500, n_cols: int = 5, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    matrix = rng.normal(size=(n_rows, n_cols)) @ rng.normal(size=(n_cols, n_cols))
+    matrix[rng.random(matrix.shape) < 0.1] = np.nan
+    return matrix
+
+
+def test_correlation_constant_shared_rows_is_nan():
+    matrix = np.array([[2, 0], [2, 3], [np.nan, 2], [2, np.nan]], dtype=np.float64)
+    np.testing.assert_array_equal(correlation_matrix(matrix), pd.DataFrame(matrix).corr().to_numpy())
+
+
+@pytest.mark.parametrize('missing', [0.0, 0.3, 0.5])
+def test_correlation_matches_pandas_on_integer_scores(missing):
+    for seed in range(300):
+        matrix = _integer_scores(seed, missing)
+        np.testing.assert_allclose(correlation_matrix(matrix), pd.DataFrame(matrix).corr().to_numpy(),
+                                   atol=1e-9, equal_nan=True, err_msg=f'seed={seed}')
+
+
+def test_correlation_constant_non_integer_column_is_nan():
+    rng = np.random.default_rng(1)
+    matrix = np.column_stack([np.full(50, 0.1), rng.normal(size=50)])
+    np.testing.assert_array_equal(np.isnan(correlation_matrix(matrix)),
+                                  np.isnan(pd.DataFrame(matrix).corr().to_numpy()))
+
+
+@pytest.mark.parametrize('block_bytes', [64, 4096, 1 << 26])
+def test_chart_data_matches_reference(block_bytes):
+    matrix = _continuous_scores()
+    data = chart_data(matrix, bins=12, block_bytes=block_bytes)
+    df = pd.DataFrame(matrix)
+
+    np.testing.assert_array_equal(data['count'], df.count().to_numpy())
+    np.testing.assert_allclose(data['mean'], df.mean().to_numpy(), rtol=1e-12)
+    for key, q in (('min', 0), ('q25', 25), ('median', 50), ('q75', 75), ('max', 100)):
+        np.testing.assert_allclose(data[key], np.nanpercentile(matrix, q, axis=0), rtol=1e-12)
+
+    edges = data['bin_edges']
+    valid = matrix[~np.isnan(matrix)]
+    np.testing.assert_allclose(edges, np.histogram_bin_edges(valid, bins=12))
+    for j in range(matrix.shape[1]):
+        column = matrix[~np.isnan(matrix[:, j]), j]
+        np.testing.assert_array_equal(data['histogram'][j], np.histogram(column, bins=edges)[0])
+        box = cbook.boxplot_stats(column)[0]
+        assert data['whisker_low'][j] == pytest.approx(box['whislo'])
+        assert data['whisker_high'][j] == pytest.approx(box['whishi'])
+        assert data['outliers'][j] == len(box['fliers'])
+
+    np.testing.assert_allclose(data['correlation'], df.corr().to_numpy(), rtol=1e-9, atol=1e-12)
+
+
+def test_float32_matrix_matches_float64():
+    matrix = _continuous_scores(seed=2).astype(np.float32)
+    expected = chart_data(matrix.astype(np.float64))
+    result = chart_data(matrix)
+    for key in ('count', 'mean', 'median', 'whisker_low', 'whisker_high', 'histogram', 'correlation'):
+        np.testing.assert_allclose(result[key], expected[key], rtol=1e-9, err_msg=key)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据集注册表：按 ID 隔离、跨实例恢复、移除及闲置回收
+"""
+
+import os
+import time
+
+import numpy as np
+
+from dataset_registry import DatasetRegistry, DatasetSession
+from pair_cache import PairResultCache
+
+
+def _register(registry: DatasetRegistry, dataset_key: str = 'key-a') -> DatasetSession:
+    """写入一个小 CSV 文件并注册为数据集"""
+    dataset_id = registry.new_id()
+    path = registry.upload_path(dataset_id)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('model_a,model_b\n1,2\n3,4\n')
+    return registry.register(DatasetSession(dataset_id, path, 'scores.csv', dataset_key,
+                                            ['model_a', 'model_b'], ['model_a', 'model_b'], 2))
+
+
+def _cache_pair(pair_cache: PairResultCache, dataset_key: str) -> None:
+    pair_cache.put_many([(dataset_key, 'model_a', 'model_b')], {'p_value': np.array([0.5])})
+
+
+def test_uploads_get_separate_sessions(tmp_path):
+    registry = DatasetRegistry(str(tmp_path))
+    first, second = _register(registry), _register(registry)
+    assert first.id != second.id
+    assert registry.get(first.id) is first
+    assert registry.get(second.id) is second
+
+
+def test_session_is_restored_from_manifest(tmp_path):
+    session = _register(DatasetRegistry(str(tmp_path)))
+    restored = DatasetRegistry(str(tmp_path)).get(session.id)
+    assert restored is not None
+    assert restored.to_manifest() == session.to_manifest()
+
+
+def test_invalid_or_unknown_ids_are_rejected(tmp_path):
+    registry = DatasetRegistry(str(tmp_path))
+    _register(registry)
+    for dataset_id in (None, '', '../scores', 'f' * 31, 'f' * 32):
+        assert registry.get(dataset_id) is None
+
+
+def test_remove_deletes_files_unless_in_use(tmp_path):
+    registry = DatasetRegistry(str(tmp_path))
+    session = _register(registry)
+    with registry.use(session):
+        assert not registry.remove(session.id)
+    assert registry.remove(session.id)
+    assert registry.get(session.id) is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_idle_datasets_are_evicted_except_in_use(tmp_path):
+    pair_cache = PairResultCache()
+    registry = DatasetRegistry(str(tmp_path), idle_ttl=0.05, pair_cache=pair_cache)
+    idle, busy = _register(registry, 'key-idle'), _register(registry, 'key-busy')
+    _cache_pair(pair_cache, 'key-idle')
+    _cache_pair(pair_cache, 'key-busy')
+
+    with registry.use(busy):
+        time.sleep(0.1)
+        registry.evict_idle(force=True)
+        assert not os.path.exists(idle.csv_file_path)
+        assert os.path.exists(busy.csv_file_path)
+    assert registry.get(idle.id) is None
+    assert registry.get(busy.id) is busy
+    assert pair_cache.get_many([('key-idle', 'model_a', 'model_b'), ('key-busy', 'model_a', 'model_b')])[0] is None
+    assert len(pair_cache) == 1
+
+
+def test_shared_content_keeps_cached_results(tmp_path):
+    pair_cache = PairResultCache()
+    registry = DatasetRegistry(str(tmp_path), pair_cache=pair_cache)
+    first, second = _register(registry, 'same'), _register(registry, 'same')
+    _cache_pair(pair_cache, 'same')
+
+    assert registry.remove(first.id)
+    assert len(pair_cache) == 1
+    assert registry.remove(second.id)
+    assert len(pair_cache) == 0
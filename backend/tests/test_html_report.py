@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML 报告：表格行、分页折叠、基线标记与模型名称转义
+"""
+
+import io
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from html_report import HtmlReport
+from model_comparison_tool import ModelComparisonTool
+
+COLUMNS = [f'model_{k}' for k in range(7)]
+NAMES = ['base', 'alpha', 'beta', '<b>gamma</b>', 'delta', 'eps & co', 'zeta']
+
+ROW_PATTERN = re.compile(r'<tr>(.*?)</tr>', re.S)
+
+
+@pytest.fixture(scope='module')
+def result(tmp_path_factory):
+    """7 个模型（21 对），后几个模型均值明显更高，部分模型对显著"""
+    rng = np.random.default_rng(6)
+    df = pd.DataFrame({col: rng.normal(0.3 * k, 1.0, size=60) for k, col in enumerate(COLUMNS)})
+    path = tmp_path_factory.mktemp('report') / 'scores.csv'
+    df.to_csv(path, index=False)
+    tool = ModelComparisonTool(str(path))
+    tool.load_data()
+    tool.set_score_columns(COLUMNS, NAMES)
+    return tool.analyze(tool.clean_score_data(), test_type='ttest', baseline_model='model_0')
+
+
+def _data_rows(html: str):
+    """全部表格数据行（去掉各页重复的表头行）"""
+    return [row for row in ROW_PATTERN.findall(html) if '<th>' not in row]
+
+
+def test_streamed_and_joined_reports_are_identical(result):
+    report = HtmlReport(result, page_rows=4)
+    buffer = io.StringIO()
+    report.write(buffer)
+    html = report.to_html()
+    # 页脚时间戳可能跨秒，只比较其之前的部分
+    cut = html.index('报告生成时间')
+    assert buffer.getvalue()[:cut] == html[:cut]
+
+
+def test_paging_keeps_every_row_in_order(result):
+    full = HtmlReport(result, page_rows=1000).to_html()
+    paged = HtmlReport(result, page_rows=5).to_html()
+    assert '<details>' not in full
+    assert _data_rows(paged) == _data_rows(full)
+    # 两两对比 21 行：第一页展开，其余 4 页折叠
+    for start, end in ((6, 10), (11, 15), (16, 20), (21, 21)):
+        assert f'第 {start}–{end} 行（共 21 行）' in paged
+    assert '第 1–5 行' not in paged
+
+
+def test_table_rows_match_result(result):
+    html = HtmlReport(result, page_rows=1000).to_html()
+    rows = _data_rows(html)
+    n_stats, n_pairs, n_baseline = len(result.stats_df), len(result.pairwise_df), len(result.baseline_df)
+    assert len(rows) == n_stats + n_pairs + n_baseline
+    pairwise_rows = rows[n_stats:n_stats + n_pairs]
+    for row, (_, pair) in zip(pairwise_rows, result.pairwise_df.iterrows()):
+        assert f"{pair['p值']:.4f}" in row
+        assert ('✅ 是' in row) == bool(pair['是否显著'])
+
+
+def test_baseline_flag_marks_only_baseline_rows(result):
+    rows = _data_rows(HtmlReport(result, page_rows=1000).to_html())
+    marked = [row for row in rows if '<strong>base ✅</strong>' in row]
+    # 得分表 1 行 + 两两对比中含基线的 6 行（基线对比表不包含基线自身）
+    assert len(marked) == 1 + 6
+    assert all('base ✅' not in row for row in rows if '<strong>base' not in row)
+
+
+def test_model_names_are_escaped(result):
+    html = HtmlReport(result).to_html()
+    assert '<b>gamma</b>' not in html
+    assert '&lt;b&gt;gamma&lt;/b&gt;' in html
+    assert 'eps &amp; co' in html
+
+
+def test_report_without_baseline_has_no_baseline_section(tmp_path):
+    df = pd.DataFrame({'a': [1.0, 2.0, 3.0, 4.0], 'b': [2.0, 2.5, 3.5, 5.0]})
+    path = tmp_path / 'scores.csv'
+    df.to_csv(path, index=False)
+    tool = ModelComparisonTool(str(path))
+    tool.load_data()
+    tool.set_score_columns(['a', 'b'])
+    html = HtmlReport(tool.analyze(tool.clean_score_data(), test_type='ttest')).to_html()
+    assert '与基线模型对比' not in html
+    assert ' ✅</strong>' not in html
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+pairwise 缺失值处理：每对模型只使用两列均有效的行
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from conftest import upload_csv, wait_for_job
+from model_comparison_tool import ModelComparisonTool
+
+COLUMNS = ['model_a', 'model_b', 'model_c']
+
+
+@pytest.fixture
+def scores(tmp_path):
+    """各列缺失位置不同、另有一行全部缺失的分数文件"""
+    rng = np.random.default_rng(3)
+    n_rows = 60
+    df = pd.DataFrame({col: rng.normal(0.1 * k, 1.0, size=n_rows).round(3) for k, col in enumerate(COLUMNS)})
+    df.loc[rng.random(n_rows) < 0.2, 'model_a'] = np.nan
+    df.loc[rng.random(n_rows) < 0.1, 'model_b'] = np.nan
+    df.loc[5, COLUMNS] = np.nan
+    path = tmp_path / 'scores.csv'
+    df.to_csv(path, index=False)
+    return df, str(path)
+
+
+def _tool(path: str) -> ModelComparisonTool:
+    tool = ModelComparisonTool(path)
+    tool.load_data()
+    tool.set_score_columns(COLUMNS)
+    return tool
+
+
+def test_only_rows_without_any_score_are_dropped(scores):
+    df, path = scores
+    tool = _tool(path)
+    assert len(tool.clean_score_data(missing='pairwise')) == int(df[COLUMNS].notna().any(axis=1).sum())
+    assert len(tool.clean_score_data(missing='listwise')) == int(df[COLUMNS].notna().all(axis=1).sum())
+
+
+@pytest.mark.parametrize('test_type', ['ttest', 'wilcoxon', 'mannwhitney'])
+def test_pairs_use_rows_valid_in_both_columns(scores, test_type):
+    df, path = scores
+    tool = _tool(path)
+    table = tool.pairwise_comparison(tool.clean_score_data(missing='pairwise'), test_type=test_type)
+    scipy_test = {'ttest': stats.ttest_rel, 'wilcoxon': stats.wilcoxon, 'mannwhitney': stats.mannwhitneyu}[test_type]
+
+    assert len(table) == 3
+    for _, row in table.iterrows():
+        both = df[[row['模型1'], row['模型2']]].dropna()
+        a, b = both.iloc[:, 0].to_numpy(), both.iloc[:, 1].to_numpy()
+        assert row['样本数'] == len(both)
+        assert row['模型1均值'] == pytest.approx(a.mean())
+        assert row['模型2均值'] == pytest.approx(b.mean())
+        assert row['p值'] == pytest.approx(scipy_test(a, b).pvalue, rel=1e-9)
+
+
+def test_listwise_tables_have_no_sample_count_column(scores):
+    _, path = scores
+    tool = _tool(path)
+    assert '样本数' not in tool.pairwise_comparison(tool.clean_score_data(), test_type='ttest').columns
+
+
+def test_analyze_api_accepts_pairwise_mode(client, scores):
+    df, path = scores
+    with open(path, encoding='utf-8') as f:
+        dataset = upload_csv(client, f.read())
+    request = {'datasetId': dataset['datasetId'], 'baseline': 'model_a',
+               'dataColumns': ['model_b', 'model_c'], 'testType': 'ttest'}
+
+    assert client.post('/api/analyze', json={**request, 'missing': 'everything'}).status_code == 400
+    response = client.post('/api/analyze', json={**request, 'missing': 'pairwise'})
+    job = wait_for_job(client, response.get_json()['jobId'])
+    assert job['state'] == 'completed', job.get('error')
+    counts = {(row['模型1'], row['模型2']): row['样本数'] for row in job['result']['pairwiseComparison']}
+    assert counts[('model_a', 'model_b')] == len(df[['model_a', 'model_b']].dropna())
+    assert counts[('model_b', 'model_c')] == len(df[['model_b', 'model_c']].dropna())
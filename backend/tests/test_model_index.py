@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模型元数据索引与由其派生的基线对比表
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from model_comparison_tool import ModelComparisonTool
+from model_index import ModelIndex
+
+
+def test_lookups_by_column_and_display_name():
+    models = ModelIndex(['a_score', 'b_score', 'c_score'], ['A', 'B'], baseline_model='b_score')
+    assert models.names == ['A', 'B', 'c_score']
+    assert len(models) == 3
+    assert models.position('c_score') == 2
+    assert models.position('missing') is None
+    assert models.name_position('B') == 1
+    assert models.display_name('a_score') == 'A'
+    assert models.display_name('missing') == 'missing'
+    assert models.has_baseline and models.baseline_name == 'B'
+    assert models.is_baseline == [False, True, False]
+    assert models.baseline_flags(['A', 'B', 'B', 'x']) == [False, True, True, False]
+    assert models.is_baseline_name('B') and not models.is_baseline_name('A')
+
+
+@pytest.mark.parametrize('baseline_model', [None, '', 'not_a_column'])
+def test_without_baseline_nothing_is_flagged(baseline_model):
+    models = ModelIndex(['a', 'b'], ['a', 'b'], baseline_model=baseline_model)
+    assert not models.has_baseline
+    assert models.baseline_name is None
+    assert models.is_baseline == [False, False]
+    assert models.baseline_flags(['a', 'b']) == [False, False]
+    assert not models.is_baseline_name('a')
+
+
+def test_duplicate_names_resolve_to_first_position():
+    models = ModelIndex(['x1', 'x2', 'x1'], ['X', 'X', 'Y'])
+    assert models.position('x1') == 0
+    assert models.name_position('X') == 0
+
+
+@pytest.mark.parametrize('baseline', ['model_0', 'model_2'])
+def test_baseline_table_matches_direct_tests(tmp_path, baseline):
+    rng = np.random.default_rng(8)
+    columns = ['model_0', 'model_1', 'model_2', 'model_3']
+    df = pd.DataFrame({col: rng.normal(0.4 * k, 1.0, size=50) for k, col in enumerate(columns)})
+    path = tmp_path / 'scores.csv'
+    df.to_csv(path, index=False)
+    tool = ModelComparisonTool(str(path))
+    tool.load_data()
+    tool.set_score_columns(columns, ['M0', 'M1', 'M2', 'M3'])
+    result = tool.analyze(tool.clean_score_data(), test_type='ttest', baseline_model=baseline)
+
+    baseline_df = result.baseline_df
+    others = [col for col in columns if col != baseline]
+    assert baseline_df['模型'].tolist() == [tool.model_index().display_name(col) for col in others]
+    for (_, row), col in zip(baseline_df.iterrows(), others):
+        expected = stats.ttest_rel(df[col], df[baseline])
+        assert row['均值差异'] == pytest.approx((df[col] - df[baseline]).mean())
+        assert row['检验统计量'] == pytest.approx(expected.statistic)
+        assert row['p值'] == pytest.approx(expected.pvalue)
+        assert row['优于基线'] == bool(row['是否显著'] and row['均值差异'] > 0)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多重比较校正与逐个 p 值定义（statsmodels multipletests 的 bonferroni、holm、simes-hochberg、fdr_bh）的一致性
+"""
+
+import numpy as np
+import pytest
+
+from multiple_testing import CORRECTION_METHODS, adjust_p_values, adjusted_key
+
+
+def _reference(p_values: np.ndarray, method: str) -> np.ndarray:
+    """按定义逐个计算校正后 p 值（O(m^2)，只用于对照）"""
+    m = len(p_values)
+    adjusted = np.empty(m)
+    for i, p in enumerate(p_values):
+        # 名次 rank 从 1 开始，相等的 p 值按出现顺序排名
+        rank = int(np.sum(p_values < p) + np.sum(p_values[:i] == p)) + 1
+        ordered = np.sort(p_values, kind='stable')
+        if method == 'bonferroni':
+            value = m * p
+        elif method == 'holm':
+            value = max((m - j) * ordered[j] for j in range(rank))
+        elif method == 'hochberg':
+            value = min((m - j) * ordered[j] for j in range(rank - 1, m))
+        else:
+            value = min(m / (j + 1) * ordered[j] for j in range(rank - 1, m))
+        adjusted[i] = min(value, 1.0)
+    return adjusted
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('method', CORRECTION_METHODS)
+def test_matches_reference(method, seed):
+    rng = np.random.default_rng(seed)
+    p_values = np.concatenate([rng.uniform(0, 0.05, 5), rng.uniform(size=20)])
+    # 加入重复值，检验结的处理
+    p_values[3] = p_values[10]
+    rng.shuffle(p_values)
+    result = adjust_p_values(p_values)[adjusted_key(method)]
+    np.testing.assert_allclose(result, _reference(p_values, method), rtol=1e-12)
+
+
+@pytest.mark.parametrize('method', CORRECTION_METHODS)
+def test_known_values(method):
+    """手工计算的一组校正结果（m = 5）"""
+    p_values = np.array([0.01, 0.04, 0.03, 0.005, 0.2])
+    expected = {
+        'bonferroni': [0.05, 0.2, 0.15, 0.025, 1.0],
+        'holm': [0.04, 0.09, 0.09, 0.025, 0.2],
+        'hochberg': [0.04, 0.08, 0.08, 0.025, 0.2],
+        'bh': [0.025, 0.05, 0.05, 0.025, 0.2],
+    }[method]
+    np.testing.assert_allclose(adjust_p_values(p_values)[adjusted_key(method)], expected, rtol=1e-12)
+
+
+def test_missing_p_values_are_excluded_from_family():
+    p_values = np.array([0.01, np.nan, 0.02, 0.04])
+    result = adjust_p_values(p_values)
+    assert np.isnan(result[adjusted_key('bonferroni')][1])
+    np.testing.assert_allclose(result[adjusted_key('bonferroni')][[0, 2, 3]], [0.03, 0.06, 0.12])
+    np.testing.assert_allclose(result[adjusted_key('bh')][[0, 2, 3]], [0.03, 0.03, 0.04])
+
+
+def test_adjusted_p_values_are_monotone_and_bounded():
+    p_values = np.random.default_rng(7).uniform(size=200) ** 3
+    result = adjust_p_values(p_values)
+    order = np.argsort(p_values)
+    for method in CORRECTION_METHODS:
+        adjusted = result[adjusted_key(method)]
+        assert (adjusted >= p_values - 1e-15).all()
+        assert (adjusted <= 1.0).all()
+        assert (np.diff(adjusted[order]) >= -1e-15).all()
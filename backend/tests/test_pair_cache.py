@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模型对检验结果缓存：增删模型列后只检验新增的模型对，保留行或检验参数变化时重新检验
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import model_comparison_tool
+from dataset_cache import file_digest
+from model_comparison_tool import ModelComparisonTool
+from pair_cache import PairResultCache
+
+
+@pytest.fixture
+def score_csv(tmp_path):
+    """model_d 含缺失值，加入或移除它会改变 listwise 保留的行"""
+    rng = np.random.default_rng(5)
+    n_rows = 80
+    df = pd.DataFrame({col: rng.normal(0.1 * k, 1.0, size=n_rows).round(2)
+                       for k, col in enumerate(['model_a', 'model_b', 'model_c', 'model_d'])})
+    df.loc[rng.random(n_rows) < 0.1, 'model_d'] = np.nan
+    path = tmp_path / 'scores.csv'
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def tested_pairs(monkeypatch):
+    """记录每次实际检验的模型对数"""
+    counts = []
+    run = model_comparison_tool.run_pair_tests_parallel
+
+    def counting(matrix, idx_a, idx_b, *args, **kwargs):
+        counts.append(len(idx_a))
+        return run(matrix, idx_a, idx_b, *args, **kwargs)
+
+    monkeypatch.setattr(model_comparison_tool, 'run_pair_tests_parallel', counting)
+    return counts
+
+
+def _pairwise(path: str, columns, pair_cache=None, **options) -> pd.DataFrame:
+    tool = ModelComparisonTool(path, dataset_key=file_digest(path), pair_cache=pair_cache)
+    tool.load_data()
+    tool.set_score_columns(columns)
+    return tool.pairwise_comparison(tool.clean_score_data(), **options)
+
+
+def test_adding_and_removing_a_column_reuses_cached_pairs(score_csv, tested_pairs):
+    cache = PairResultCache()
+    _pairwise(score_csv, ['model_a', 'model_b'], cache, test_type='wilcoxon')
+    result = _pairwise(score_csv, ['model_a', 'model_b', 'model_c'], cache, test_type='wilcoxon')
+    _pairwise(score_csv, ['model_a', 'model_c'], cache, test_type='wilcoxon')
+    assert tested_pairs == [1, 2]
+
+    expected = _pairwise(score_csv, ['model_a', 'model_b', 'model_c'], test_type='wilcoxon')
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_changed_rows_invalidate_cached_pairs(score_csv, tested_pairs):
+    cache = PairResultCache()
+    _pairwise(score_csv, ['model_a', 'model_b'], cache, test_type='ttest')
+    # listwise 下加入含缺失值的 model_d 改变了保留的行，原有模型对也需重新检验
+    result = _pairwise(score_csv, ['model_a', 'model_b', 'model_d'], cache, test_type='ttest')
+    assert tested_pairs == [1, 3]
+    pd.testing.assert_frame_equal(result, _pairwise(score_csv, ['model_a', 'model_b', 'model_d'], test_type='ttest'))
+
+
+def test_alpha_and_correction_reuse_raw_results(score_csv, tested_pairs):
+    cache = PairResultCache()
+    columns = ['model_a', 'model_b', 'model_c']
+    _pairwise(score_csv, columns, cache, test_type='ttest')
+    result = _pairwise(score_csv, columns, cache, test_type='ttest', alpha=0.2, correction='holm')
+    assert tested_pairs == [3]
+    pd.testing.assert_frame_equal(result, _pairwise(score_csv, columns, test_type='ttest', alpha=0.2,
+                                                    correction='holm'))
+
+
+def test_test_options_are_part_of_the_key(score_csv, tested_pairs):
+    cache = PairResultCache()
+    columns = ['model_a', 'model_b']
+    _pairwise(score_csv, columns, cache, test_type='ttest')
+    _pairwise(score_csv, columns, cache, test_type='wilcoxon')
+    _pairwise(score_csv, columns, cache, test_type='permutation', permutation_seed=1, n_permutations=500)
+    _pairwise(score_csv, columns, cache, test_type='permutation', permutation_seed=2, n_permutations=500)
+    _pairwise(score_csv, columns, cache, test_type='permutation', permutation_seed=2, n_permutations=500)
+    assert tested_pairs == [1, 1, 1, 1]
+
+
+def test_unseeded_random_tests_bypass_the_cache(score_csv, tested_pairs):
+    cache = PairResultCache()
+    for _ in range(2):
+        _pairwise(score_csv, ['model_a', 'model_b'], cache, test_type='permutation', n_permutations=500)
+    assert tested_pairs == [1, 1]
+    assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used_pairs():
+    cache = PairResultCache(max_pairs=2)
+    cache.put_many([('d', 'a'), ('d', 'b')], {'p_value': np.array([0.1, 0.2])})
+    cache.get_many([('d', 'a')])
+    cache.put_many([('d', 'c')], {'p_value': np.array([0.3])})
+    hits = cache.get_many([('d', 'a'), ('d', 'b'), ('d', 'c')])
+    assert [entry is not None for entry in hits] == [True, False, True]
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量检验引擎与 scipy 逐对检验结果的一致性
+"""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from pairwise_engine import all_pairs, run_pair_tests, select_pairs
+
+
+def _score_matrix(n_rows: int, n_models: int, decimals=None, seed: int = 0) -> np.ndarray:
+    """各列均值不同的分数矩阵，decimals 不为None时四舍五入以制造结"""
+    rng = np.random.default_rng(seed)
+    matrix = rng.normal(size=(n_rows, n_models)) + np.linspace(0.0, 0.5, n_models)
+    return matrix.round(decimals) if decimals is not None else matrix
+
+
+# (行数, 小数位数)：覆盖精确检验、结与零差异下的置换/正态近似
+SHAPES = [(8, None), (12, 1), (30, None), (40, 1), (200, 1), (500, None)]
+
+
+@pytest.mark.parametrize('n_rows, decimals', SHAPES)
+def test_ttest_matches_scipy(n_rows, decimals):
+    matrix = _score_matrix(n_rows, 4, decimals)
+    idx_a, idx_b = all_pairs(4)
+    result = run_pair_tests(matrix, idx_a, idx_b, 'ttest')
+    for k, (a, b) in enumerate(zip(idx_a, idx_b)):
+        expected = stats.ttest_rel(matrix[:, a], matrix[:, b])
+        assert result['statistic'][k] == pytest.approx(expected.statistic, rel=1e-9)
+        assert result['p_value'][k] == pytest.approx(expected.pvalue, rel=1e-9, abs=1e-300)
+        assert result['mean_diff'][k] == pytest.approx(np.mean(matrix[:, a] - matrix[:, b]))
+
+
+@pytest.mark.parametrize('n_rows, decimals', SHAPES)
+def test_wilcoxon_matches_scipy(n_rows, decimals):
+    matrix = _score_matrix(n_rows, 4, decimals)
+    idx_a, idx_b = all_pairs(4)
+    result = run_pair_tests(matrix, idx_a, idx_b, 'wilcoxon')
+    for k, (a, b) in enumerate(zip(idx_a, idx_b)):
+        expected = stats.wilcoxon(matrix[:, a], matrix[:, b])
+        assert result['statistic'][k] == pytest.approx(expected.statistic)
+        assert result['p_value'][k] == pytest.approx(expected.pvalue, rel=1e-9, abs=1e-300)
+
+
+@pytest.mark.parametrize('n_rows, decimals', SHAPES)
+def test_mannwhitney_matches_scipy(n_rows, decimals):
+    matrix = _score_matrix(n_rows, 4, decimals)
+    idx_a, idx_b = all_pairs(4)
+    result = run_pair_tests(matrix, idx_a, idx_b, 'mannwhitney')
+    for k, (a, b) in enumerate(zip(idx_a, idx_b)):
+        expected = stats.mannwhitneyu(matrix[:, a], matrix[:, b])
+        assert result['statistic'][k] == pytest.approx(expected.statistic)
+        assert result['p_value'][k] == pytest.approx(expected.pvalue, rel=1e-9, abs=1e-300)
+
+
+@pytest.mark.parametrize('test_type', ['ttest', 'wilcoxon', 'mannwhitney'])
+def test_missing_values_use_rows_valid_in_both_columns(test_type):
+    matrix = _score_matrix(120, 3, 1)
+    rng = np.random.default_rng(1)
+    matrix[rng.random(matrix.shape) < 0.1] = np.nan
+    idx_a, idx_b = all_pairs(3)
+    result = run_pair_tests(matrix, idx_a, idx_b, test_type)
+    scipy_test = {'ttest': stats.ttest_rel, 'wilcoxon': stats.wilcoxon, 'mannwhitney': stats.mannwhitneyu}[test_type]
+    for k, (a, b) in enumerate(zip(idx_a, idx_b)):
+        valid = ~np.isnan(matrix[:, a]) & ~np.isnan(matrix[:, b])
+        expected = scipy_test(matrix[valid, a], matrix[valid, b])
+        assert result['n'][k] == valid.sum()
+        assert result['p_value'][k] == pytest.approx(expected.pvalue, rel=1e-9, abs=1e-300)
+
+
+@pytest.mark.parametrize('test_type', ['ttest', 'wilcoxon', 'mannwhitney', 'permutation'])
+def test_block_size_does_not_change_results(test_type):
+    matrix = _score_matrix(300, 6, 1)
+    idx_a, idx_b = all_pairs(6)
+    whole = run_pair_tests(matrix, idx_a, idx_b, test_type, seed=3)
+    blocked = run_pair_tests(matrix, idx_a, idx_b, test_type, seed=3, block_bytes=16 * 1024)
+    for key in whole:
+        np.testing.assert_allclose(blocked[key], whole[key], rtol=1e-12, equal_nan=True)
+
+
+def test_permutation_p_value_close_to_exact_enumeration():
+    """n=12 时枚举全部 4096 种符号翻转得到精确 p 值，随机翻转的 p 值应在蒙特卡罗误差内"""
+    matrix = _score_matrix(12, 2, 2, seed=5)
+    diff = matrix[:, 0] - matrix[:, 1]
+    signs = np.array(np.meshgrid(*[[-1.0, 1.0]] * len(diff))).reshape(len(diff), -1).T
+    exact = np.mean(np.abs(signs @ diff) >= np.abs(diff.sum()) - 1e-9)
+
+    result = run_pair_tests(matrix, [0], [1], 'permutation', n_permutations=20000, seed=0, tolerance=0)
+    assert result['permutations'][0] == 20000
+    assert result['statistic'][0] == pytest.approx(diff.mean())
+    assert result['p_value'][0] == pytest.approx(exact, abs=0.02)
+
+
+def test_permutation_early_stop_is_reproducible():
+    matrix = _score_matrix(200, 4, 1)
+    idx_a, idx_b = all_pairs(4)
+    first = run_pair_tests(matrix, idx_a, idx_b, 'permutation', seed=11, alpha=0.05)
+    second = run_pair_tests(matrix, idx_a, idx_b, 'permutation', seed=11, alpha=0.05)
+    np.testing.assert_array_equal(first['p_value'], second['p_value'])
+    assert (first['permutations'] <= 10000).all()
+    assert (first['permutations'] % 1000 == 0).all()
+
+
+def test_select_pairs_reverses_direction():
+    matrix = _score_matrix(50, 3)
+    idx_a, idx_b = all_pairs(3)
+    computed = run_pair_tests(matrix, idx_a, idx_b, 'ttest')
+    reversed_pairs = select_pairs(computed, idx_a, idx_b, idx_b, idx_a, 'ttest')
+    direct = run_pair_tests(matrix, idx_b, idx_a, 'ttest')
+    for key in ('mean_a', 'mean_b', 'mean_diff', 'statistic', 'p_value'):
+        np.testing.assert_allclose(reversed_pairs[key], direct[key], rtol=1e-12)
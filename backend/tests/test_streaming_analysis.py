@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式分块分析与内存分析结果的一致性（含超出内存上限时的按行分块检验）
+"""
+
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from model_comparison_tool import ModelComparisonTool
+from streaming_analysis import StreamingComparison
+
+COLUMNS = ['model_a', 'model_b', 'model_c', 'model_d']
+STAT_KEYS = ('n', 'mean_a', 'mean_b', 'mean_diff', 'statistic', 'p_value')
+# 3000 行的模型对在该上限下超出内存检验的估算，按行分块计算
+SMALL_MEMORY_BYTES = 64 * 1024
+
+
+@pytest.fixture(scope='module')
+def score_csv(tmp_path_factory):
+    """含结、零差异和缺失值的分数文件"""
+    rng = np.random.default_rng(0)
+    n_rows = 3000
+    df = pd.DataFrame({
+        'model_a': rng.normal(size=n_rows).round(2),
+        'model_b': rng.normal(0.05, 1.0, size=n_rows).round(2),
+        'model_c': rng.integers(0, 4, size=n_rows).astype(float),
+        'model_d': rng.integers(0, 4, size=n_rows).astype(float),
+    })
+    df.loc[rng.random(n_rows) < 0.02, 'model_b'] = np.nan
+    path = tmp_path_factory.mktemp('streaming') / 'scores.csv'
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def _in_memory(path: str, **options):
+    tool = ModelComparisonTool(path)
+    tool.load_data()
+    tool.set_score_columns(COLUMNS)
+    return tool.analyze(tool.clean_score_data(), **options)
+
+
+def _streaming(path: str, max_memory_bytes: int, **options):
+    streaming = StreamingComparison(path, COLUMNS, max_memory_bytes=max_memory_bytes,
+                                    spill=options['test_type'] != 'ttest').run()
+    try:
+        return streaming.analyze(**options)
+    finally:
+        streaming.close()
+
+
+@pytest.mark.parametrize('max_memory_bytes', [64 * 1024 * 1024, SMALL_MEMORY_BYTES])
+@pytest.mark.parametrize('test_type', ['ttest', 'wilcoxon', 'mannwhitney', 'permutation'])
+def test_pair_stats_match_in_memory(score_csv, test_type, max_memory_bytes):
+    options = {'test_type': test_type, 'alpha': 0.05}
+    if test_type == 'permutation':
+        options.update(n_permutations=3000, permutation_seed=7, tolerance=1e-3)
+    expected = _in_memory(score_csv, **options)
+    result = _streaming(score_csv, max_memory_bytes, **options)
+
+    assert result.sample_count == expected.sample_count
+    for key in STAT_KEYS:
+        np.testing.assert_allclose(result.pair_stats[key], expected.pair_stats[key],
+                                   rtol=1e-9, atol=1e-12, equal_nan=True)
+    if test_type == 'permutation':
+        np.testing.assert_array_equal(result.pair_stats['permutations'], expected.pair_stats['permutations'])
+
+
+def test_basic_stats_match_in_memory(score_csv):
+    expected = _in_memory(score_csv, test_type='ttest').stats_df
+    result = _streaming(score_csv, 64 * 1024 * 1024, test_type='ttest').stats_df
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, rtol=1e-9)
+
+
+def test_blocked_rank_test_stays_within_memory_limit(score_csv):
+    streaming = StreamingComparison(score_csv, COLUMNS, max_memory_bytes=SMALL_MEMORY_BYTES * 4, spill=True).run()
+    try:
+        assert not streaming._pair_fits_in_memory('mannwhitney')
+        tracemalloc.start()
+        streaming.analyze(test_type='mannwhitney')
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        streaming.close()
+    assert peak <= SMALL_MEMORY_BYTES * 4
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上传 CSV 的流式接收与解析：与整表读取的 pandas 结果一致，与数据块的切分位置无关
+"""
+
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from column_detection import classify_numeric_columns
+from conftest import upload_csv
+from dataset_cache import file_digest
+from upload_ingest import CsvIngest, iter_multipart_file
+
+
+def _scores_csv(n_rows: int = 300, seed: int = 0) -> bytes:
+    """含中文文本列、缺失值、无穷值及后半段混入文本的数值列"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'id': np.arange(n_rows),
+        '问题': [f'样例{k}' for k in range(n_rows)],
+        'model_a': rng.normal(size=n_rows).round(3),
+        'model_b': rng.integers(0, 5, size=n_rows).astype(object),
+    })
+    df.loc[rng.random(n_rows) < 0.1, 'model_a'] = np.nan
+    df.loc[7, 'model_a'] = np.inf
+    df.loc[n_rows - 3, 'model_b'] = 'n/a'
+    return df.to_csv(index=False).encode('utf-8')
+
+
+def _ingest(tmp_path, data: bytes, piece: int, chunk_rows: int, store: bool = True) -> CsvIngest:
+    ingest = CsvIngest(str(tmp_path / 'upload.csv'), store_path=str(tmp_path / 'upload.columns') if store else None,
+                       chunk_rows=chunk_rows)
+    for start in range(0, len(data), piece):
+        ingest.feed(data[start:start + piece])
+    assert ingest.finish()
+    return ingest
+
+
+@pytest.mark.parametrize('piece, chunk_rows', [(1, 50), (7, 1000), (4096, 64), (1 << 20, 50000)])
+def test_ingest_matches_whole_file_parse(tmp_path, piece, chunk_rows):
+    data = _scores_csv()
+    ingest = _ingest(tmp_path, data, piece, chunk_rows)
+    df = pd.read_csv(io.BytesIO(data))
+    first_chunk = pd.read_csv(io.BytesIO(data), nrows=chunk_rows)
+
+    with open(ingest.filename, 'rb') as f:
+        assert f.read() == data
+    assert ingest.dataset_key == file_digest(ingest.filename)
+    assert ingest.columns == df.columns.tolist()
+    assert ingest.row_count == len(df)
+    # 数值列按第一块数据识别
+    assert ingest.numeric_columns == classify_numeric_columns(first_chunk)[0]
+
+    store = ingest.column_store
+    assert store is not None and store.row_count == len(df)
+    for col in ingest.numeric_columns:
+        values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64)
+        np.testing.assert_array_equal(store.column(col), values)
+        finite = values[np.isfinite(values)]
+        stats = ingest.stats[col]
+        assert stats['count'] == int(np.count_nonzero(~np.isnan(values)))
+        assert stats['mean'] == pytest.approx(finite.mean())
+        assert stats['min'] == finite.min() and stats['max'] == finite.max()
+        assert store.stats[col] == stats
+
+
+def test_ingest_without_column_store(tmp_path):
+    ingest = _ingest(tmp_path, _scores_csv(), 1000, 100, store=False)
+    assert ingest.column_store is None
+    assert 'model_a' in ingest.numeric_columns
+
+
+def test_failed_parse_removes_saved_file(tmp_path):
+    ingest = CsvIngest(str(tmp_path / 'upload.csv'), store_path=str(tmp_path / 'upload.columns'))
+    ingest.feed(b'a,b\n1,2\n"unterminated\n')
+    assert not ingest.finish()
+    assert os.listdir(tmp_path) == []
+
+
+def _multipart(boundary: str, content: bytes) -> bytes:
+    parts = [
+        f'--{boundary}\r\nContent-Disposition: form-data; name="note"\r\n\r\nhello\r\n'.encode(),
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="scores.csv"\r\n'
+        f'Content-Type: text/csv\r\n\r\n'.encode() + content + b'\r\n',
+        f'--{boundary}\r\nContent-Disposition: form-data; name="extra"\r\n\r\nignored\r\n'.encode(),
+        f'--{boundary}--\r\n'.encode(),
+    ]
+    return b''.join(parts)
+
+
+@pytest.mark.parametrize('read_bytes', [1, 13, 1 << 20])
+def test_multipart_file_is_streamed(read_bytes):
+    content = _scores_csv(50)
+    parts = iter_multipart_file(io.BytesIO(_multipart('xYzBoundary', content)), 'xYzBoundary',
+                                read_bytes=read_bytes)
+    assert next(parts) == 'scores.csv'
+    assert b''.join(parts) == content
+
+
+def test_multipart_without_file_field_yields_nothing():
+    body = b'--b\r\nContent-Disposition: form-data; name="note"\r\n\r\nhello\r\n--b--\r\n'
+    assert list(iter_multipart_file(io.BytesIO(body), 'b')) == []
+
+
+def test_upload_api_reports_parsed_columns(client):
+    data = _scores_csv()
+    dataset = upload_csv(client, data.decode('utf-8'))
+    df = pd.read_csv(io.BytesIO(data))
+    assert dataset['columns'] == df.columns.tolist()
+    assert dataset['rowCount'] == len(df)
+    assert dataset['numeric_columns'] == ['id', 'model_a', 'model_b']
+
+    info = client.get(f"/api/datasets/{dataset['datasetId']}").get_json()
+    assert info['columnStoreBytes'] > 0
+    assert info['columnStats']['model_b']['count'] == len(df) - 1
+
+
+@pytest.mark.parametrize('filename', ['scores.txt', ''])
+def test_upload_api_rejects_non_csv(client, filename):
+    response = client.post('/api/upload', data={'file': (io.BytesIO(b'a\n1\n'), filename)},
+                           content_type='multipart/form-data')
+    assert response.status_code == 400
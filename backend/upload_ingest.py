@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上传 CSV 的流式接收与解析
+请求体按块读取，文件部分边接收边写入磁盘并计算内容哈希，同时交给解析线程按块解析：
+表头、行数、数值列识别、各列统计和列式存储在同一遍中完成，接收完最后一个字节后不再重新读取文件。
+数值列按第一块数据识别（见 column_detection），之后只数值化并写入数值列
+"""
+
+import io
+import os
+import queue
+import threading
+from typing import Dict, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+from column_detection import NUMERIC_RATIO_THRESHOLD, classify_numeric_columns
+from column_store import ColumnStore, ColumnStoreWriter, remove_column_store
+from dataset_cache import new_content_hash
+
+# 每次从请求流读取的字节数
+UPLOAD_READ_BYTES = 1024 * 1024
+# 接收与解析之间最多缓冲的数据块数，解析跟不上时暂停接收，内存占用有上限
+INGEST_QUEUE_BLOCKS = 16
+# 每次解析的行数
+INGEST_CHUNK_ROWS = 50000
+
+
+def iter_multipart_file(stream, boundary: str, field: str = 'file',
+                        read_bytes: int = UPLOAD_READ_BYTES) -> Iterator[Union[str, bytes]]:
+    """
+    从 multipart/form-data 请求流中逐块取出指定文件字段的内容，不把整个请求体缓存到内存或临时文件
+
+    Args:
+        stream: 请求体流
+        boundary: multipart 分隔符
+        field: 文件字段名
+        read_bytes: 每次读取的字节数
+
+    Returns:
+        Iterator[Union[str, bytes]]: 首先产出文件名，之后依次产出文件内容的各块；
+            请求中没有该文件字段时不产出任何内容
+    """
+    decoder = MultipartDecoder(boundary.encode('latin1'))
+    in_file = False
+    while True:
+        block = stream.read(read_bytes)
+        decoder.receive_data(block if block else None)
+        event = decoder.next_event()
+        while not isinstance(event, NeedData):
+            if isinstance(event, File) and event.name == field:
+                in_file = True
+                yield event.filename
+            elif isinstance(event, (File, Field)):
+                in_file = False
+            elif isinstance(event, Data) and in_file:
+                if event.data:
+                    yield event.data
+                if not event.more_data:
+                    # 文件内容已读完，其余字段不再读取
+                    return
+            elif isinstance(event, Epilogue):
+                return
+            event = decoder.next_event()
+        if not block:
+            return
+
+
+class _BlockPipe(io.RawIOBase):
+    """
+    接收方写入、解析线程读取的字节管道（容量有限，写满时写入方等待）
+    """
+
+    def __init__(self, max_blocks: int):
+        super().__init__()
+        self._queue = queue.Queue(max_blocks)
+        self._buffer = memoryview(b'')
+        self._eof = False
+        self._abandoned = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if self._eof:
+            return 0
+        while not len(self._buffer):
+            block = self._queue.get()
+            if block is None:
+                self._eof = True
+                return 0
+            self._buffer = memoryview(block)
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+    def put(self, block: bytes) -> None:
+        """写入一块数据（解析线程已退出时直接丢弃）"""
+        if not self._abandoned:
+            self._queue.put(block)
+
+    def end(self) -> None:
+        """写入结束标记"""
+        self._queue.put(None)
+
+    def abandon(self) -> None:
+        """解析线程退出：清空缓冲，唤醒等待中的写入方，之后写入的数据直接丢弃"""
+        self._abandoned = True
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+
+class CsvIngest:
+    """
+    单次上传的流式解析：feed 写入接收到的数据，finish 等待解析完成并汇总结果
+    """
+
+    def __init__(self, filename: str, store_path: Optional[str] = None, encoding: str = 'utf-8',
+                 threshold: float = NUMERIC_RATIO_THRESHOLD, chunk_rows: int = INGEST_CHUNK_ROWS):
+        """
+        打开目标文件并启动解析线程
+
+        Args:
+            filename: 上传文件的保存路径
+            store_path: 列式存储目录，为None时不写入列式存储
+            encoding: 文件编码
+            threshold: 判定为数值列所需的可转换比例（按第一块数据判断）
+            chunk_rows: 每次解析的行数（同时也是识别数值列所用的行数）
+        """
+        self.filename = filename
+        self.store_path = store_path
+        self.encoding = encoding
+        self.threshold = threshold
+        self.chunk_rows = chunk_rows
+
+        # 解析完成后的结果
+        self.dataset_key: Optional[str] = None
+        self.columns: List[str] = []
+        self.numeric_columns: List[str] = []
+        self.row_count = 0
+        # 数值列 → {count: 非缺失值数, mean, min, max（只统计有限值，没有有限值时为None）}
+        self.stats: Dict[str, Dict] = {}
+        self.column_store: Optional[ColumnStore] = None
+
+        self._digest = new_content_hash()
+        self._pipe = _BlockPipe(INGEST_QUEUE_BLOCKS)
+        self._writer: Optional[ColumnStoreWriter] = None
+        self._error: Optional[BaseException] = None
+        self._parsed_header = False
+        self._file = open(filename, 'wb')
+        self._thread = threading.Thread(target=self._parse, daemon=True)
+        self._thread.start()
+
+    def feed(self, data: bytes) -> None:
+        """
+        写入一块接收到的文件内容
+
+        Args:
+            data: 文件内容
+        """
+        self._file.write(data)
+        self._digest.update(data)
+        self._pipe.put(bytes(data))
+
+    def finish(self) -> bool:
+        """
+        文件内容已全部写入：等待解析完成，汇总数值列统计并完成列式存储
+
+        Returns:
+            bool: 是否解析成功（失败时已删除保存的文件）
+        """
+        self._file.close()
+        self._pipe.end()
+        self._thread.join()
+        self.dataset_key = self._digest.hexdigest()
+        if self._error is not None:
+            print(f"❌ 解析 CSV 文件失败: {self._error}")
+            self.abort()
+            return False
+
+        for j, col in enumerate(self.numeric_columns):
+            finite = int(self._finite[j])
+            self.stats[col] = {
+                'count': int(self._counts[j]),
+                'mean': float(self._sums[j] / finite) if finite else None,
+                'min': float(self._mins[j]) if finite else None,
+                'max': float(self._maxs[j]) if finite else None
+            }
+
+        if self._writer is not None:
+            self._writer.dataset_key = self.dataset_key
+            try:
+                self.column_store = self._writer.finish(stats=self.stats)
+                print(f"💾 已写入列式存储，共 {len(self.numeric_columns)} 列")
+            except Exception as e:
+                print(f"❌ 写入列式存储失败: {e}")
+            self._writer = None
+        print(f"✅ 成功解析上传文件，共 {self.row_count} 行，{len(self.columns)} 列")
+        return True
+
+    def abort(self) -> None:
+        """放弃本次上传：停止解析，删除已保存的文件和列式存储"""
+        if not self._file.closed:
+            self._file.close()
+            self._pipe.end()
+        self._thread.join()
+        if self._writer is not None:
+            self._writer.abort()
+            self._writer = None
+        if self.column_store is not None:
+            remove_column_store(self.column_store.path)
+            self.column_store = None
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def _parse(self) -> None:
+        """解析线程：按块解析管道中的数据，出错时记录异常并丢弃其余数据"""
+        try:
+            with pd.read_csv(io.BufferedReader(self._pipe, UPLOAD_READ_BYTES), encoding=self.encoding,
+                             chunksize=self.chunk_rows) as reader:
+                for chunk in reader:
+                    self._consume(chunk)
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._pipe.abandon()
+
+    def _consume(self, chunk: pd.DataFrame) -> None:
+        """累计一块数据的行数和数值列统计，数值列追加到列式存储"""
+        coerced = {}
+        if not self._parsed_header:
+            self._parsed_header = True
+            self.columns = chunk.columns.tolist()
+            # 第一块数据识别数值列：数值类型的列直接统计，对象类型的列抽样判断
+            self.numeric_columns, coerced = classify_numeric_columns(chunk, threshold=self.threshold)
+            n_cols = len(self.numeric_columns)
+            self._counts = np.zeros(n_cols, dtype=np.int64)
+            self._finite = np.zeros(n_cols, dtype=np.int64)
+            self._sums = np.zeros(n_cols)
+            self._mins = np.full(n_cols, np.inf)
+            self._maxs = np.full(n_cols, -np.inf)
+            if self.store_path is not None:
+                try:
+                    self._writer = ColumnStoreWriter(self.store_path, self.columns, dataset_key='',
+                                                     encoding=self.encoding,
+                                                     store_columns=self.numeric_columns)
+                except OSError as e:
+                    print(f"❌ 写入列式存储失败: {e}")
+
+        values = {}
+        for j, col in enumerate(self.numeric_columns):
+            numeric = coerced.get(col)
+            if numeric is None:
+                if is_numeric_dtype(chunk[col].dtype):
+                    numeric = chunk[col].to_numpy(dtype=np.float64)
+                else:
+                    # 数值化方式与 clean_score_data 相同（无法转换的值为 NaN）
+                    numeric = pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=np.float64)
+            values[col] = numeric
+            self._counts[j] += len(numeric) - int(np.count_nonzero(np.isnan(numeric)))
+            finite = numeric[np.isfinite(numeric)]
+            if len(finite):
+                self._finite[j] += len(finite)
+                self._sums[j] += finite.sum()
+                self._mins[j] = min(self._mins[j], finite.min())
+                self._maxs[j] = max(self._maxs[j], finite.max())
+        self.row_count += len(chunk)
+
+        if self._writer is not None:
+            try:
+                self._writer.append(values)
+            except OSError as e:
+                print(f"❌ 写入列式存储失败: {e}")
+                self._writer.abort()
+                self._writer = None
@@ -2,15 +2,260 @@
 
 const { useState } = React;
 
+// 分析任务状态轮询间隔（毫秒）
+const JOB_POLL_INTERVAL_MS = 1000;
+
+// 图表边距、每个模型占用的最小宽度与配色
+const CHART_MARGIN = { top: 16, right: 16, bottom: 84, left: 64 };
+const CHART_HEIGHT = 320;
+const CHART_MIN_WIDTH = 640;
+const CHART_BAND_WIDTH = 22;
+const CHART_COLORS = ["#1677ff", "#f59e0b", "#10b981", "#ef4444", "#8b5cf6",
+  "#06b6d4", "#ec4899", "#84cc16", "#64748b", "#f97316"];
+// 模型数超过该值时不标注数值（与后端渲染一致）
+const CHART_ANNOTATION_MAX_MODELS = 20;
+// 模型数不超过该值时直方图叠加绘制，否则绘制为“模型 × 分箱”的频次热图
+const HISTOGRAM_OVERLAY_MAX_MODELS = 10;
+
+const linearScale = (d0, d1, r0, r1) => {
+  const span = d1 - d0 || 1;
+  return (value) => r0 + ((value - d0) / span) * (r1 - r0);
+};
+
+const axisTicks = (min, max, count = 5) =>
+  Array.from({ length: count + 1 }, (_, i) => min + ((max - min) * i) / count);
+
+const formatTick = (value) => Number(value.toPrecision(4)).toString();
+
+const presentValues = (values) => values.filter((value) => value !== null);
+
+const chartWidth = (count) =>
+  Math.max(CHART_MIN_WIDTH, count * CHART_BAND_WIDTH + CHART_MARGIN.left + CHART_MARGIN.right);
+
+// 在白色与目标颜色之间按比例插值
+const mixColor = ([r, g, b], t) =>
+  `rgb(${Math.round(255 + (r - 255) * t)}, ${Math.round(255 + (g - 255) * t)}, ${Math.round(255 + (b - 255) * t)})`;
+
+// 相关系数配色：-1 蓝、0 白、1 红
+const correlationColor = (value) => {
+  if (value === null) return "#f1f5f9";
+  return value >= 0 ? mixColor([180, 4, 38], Math.min(value, 1)) : mixColor([59, 76, 192], Math.min(-value, 1));
+};
+
+// 按模型分类的坐标系：y 轴刻度、网格线与模型名称，children 接收 (y 比例尺, 每个模型的宽度)
+function CategoryAxes({ labels, yMin, yMax, yLabel, children }) {
+  const { top, right, bottom, left } = CHART_MARGIN;
+  const width = chartWidth(labels.length);
+  const y = linearScale(yMin, yMax, CHART_HEIGHT - bottom, top);
+  const band = (width - left - right) / Math.max(labels.length, 1);
+  const dense = labels.length > CHART_ANNOTATION_MAX_MODELS;
+  return (
+    <div className="chart-scroll">
+      <svg width={width} height={CHART_HEIGHT} viewBox={`0 0 ${width} ${CHART_HEIGHT}`}>
+        {axisTicks(yMin, yMax).map((tick, i) => (
+          <g key={i}>
+            <line x1={left} x2={width - right} y1={y(tick)} y2={y(tick)} stroke="#e2e8f0" />
+            <text x={left - 6} y={y(tick)} textAnchor="end" dominantBaseline="middle" fontSize="11" fill="#64748b">
+              {formatTick(tick)}
+            </text>
+          </g>
+        ))}
+        <text transform={`translate(14 ${(top + CHART_HEIGHT - bottom) / 2}) rotate(-90)`}
+          textAnchor="middle" fontSize="12" fill="#475569">{yLabel}</text>
+        {labels.map((label, i) => (
+          <text key={i} transform={`translate(${left + band * (i + 0.5)} ${CHART_HEIGHT - bottom + 12}) rotate(${dense ? -90 : -35})`}
+            textAnchor="end" dominantBaseline="middle" fontSize={dense ? 9 : 11} fill="#475569">{label}</text>
+        ))}
+        {children(y, band)}
+      </svg>
+    </div>
+  );
+}
+
+// 箱线图：箱体为四分位数，须线为 1.5 倍四分位距内的最远数据点，超出须线时标出最小/最大值
+function BoxPlotChart({ chartData, labels }) {
+  const { box } = chartData;
+  const lows = presentValues(box.min);
+  const highs = presentValues(box.max);
+  if (lows.length === 0) return null;
+  const yMin = Math.min(...lows);
+  const yMax = Math.max(...highs);
+  const pad = (yMax - yMin) * 0.05 || 0.5;
+  return (
+    <CategoryAxes labels={labels} yMin={yMin - pad} yMax={yMax + pad} yLabel="得分">
+      {(y, band) => labels.map((label, i) => {
+        if (box.median[i] === null) return null;
+        const cx = CHART_MARGIN.left + band * (i + 0.5);
+        const half = Math.min(band * 0.3, 24);
+        return (
+          <g key={i}>
+            <title>
+              {`${label}\n中位数: ${box.median[i]}\n四分位数: ${box.q1[i]} ~ ${box.q3[i]}\n` +
+                `须线: ${box.whiskerLow[i]} ~ ${box.whiskerHigh[i]}\n离群值: ${box.outliers[i]} 个`}
+            </title>
+            <line x1={cx} x2={cx} y1={y(box.whiskerLow[i])} y2={y(box.whiskerHigh[i])} stroke="#334155" />
+            <line x1={cx - half / 2} x2={cx + half / 2} y1={y(box.whiskerLow[i])} y2={y(box.whiskerLow[i])} stroke="#334155" />
+            <line x1={cx - half / 2} x2={cx + half / 2} y1={y(box.whiskerHigh[i])} y2={y(box.whiskerHigh[i])} stroke="#334155" />
+            <rect x={cx - half} y={y(box.q3[i])} width={half * 2}
+              height={Math.max(1, y(box.q1[i]) - y(box.q3[i]))} fill="#dbeafe" stroke="#1677ff" />
+            <line x1={cx - half} x2={cx + half} y1={y(box.median[i])} y2={y(box.median[i])} stroke="#f59e0b" strokeWidth="2" />
+            {box.min[i] < box.whiskerLow[i] && <circle cx={cx} cy={y(box.min[i])} r="2.5" fill="none" stroke="#334155" />}
+            {box.max[i] > box.whiskerHigh[i] && <circle cx={cx} cy={y(box.max[i])} r="2.5" fill="none" stroke="#334155" />}
+          </g>
+        );
+      })}
+    </CategoryAxes>
+  );
+}
+
+// 均值条形图
+function MeansChart({ chartData, labels }) {
+  const means = presentValues(chartData.mean);
+  if (means.length === 0) return null;
+  const yMin = Math.min(0, ...means);
+  const yMax = Math.max(0, ...means) * 1.1 || 1;
+  const annotate = labels.length <= CHART_ANNOTATION_MAX_MODELS;
+  return (
+    <CategoryAxes labels={labels} yMin={yMin} yMax={yMax} yLabel="平均得分">
+      {(y, band) => chartData.mean.map((mean, i) => {
+        if (mean === null) return null;
+        const x = CHART_MARGIN.left + band * (i + 0.15);
+        const top = Math.min(y(mean), y(0));
+        return (
+          <g key={i}>
+            <title>{`${labels[i]}: ${mean}`}</title>
+            <rect x={x} y={top} width={band * 0.7} height={Math.max(1, Math.abs(y(0) - y(mean)))} fill="#1677ff" />
+            {annotate && (
+              <text x={x + band * 0.35} y={top - 4} textAnchor="middle" fontSize="10" fill="#334155">
+                {mean.toFixed(3)}
+              </text>
+            )}
+          </g>
+        );
+      })}
+    </CategoryAxes>
+  );
+}
+
+// 直方图：模型较少时叠加绘制各模型的频次阶梯线，较多时绘制为“模型 × 分箱”的频次热图
+function HistogramChart({ chartData, labels }) {
+  const { edges, counts } = chartData.histogram;
+  const { top, right, bottom, left } = CHART_MARGIN;
+  const width = CHART_MIN_WIDTH;
+  const x = linearScale(edges[0], edges[edges.length - 1], left, width - right);
+  const maxCount = Math.max(1, ...counts.map((row) => Math.max(...row)));
+
+  if (labels.length <= HISTOGRAM_OVERLAY_MAX_MODELS) {
+    const y = linearScale(0, maxCount * 1.05, CHART_HEIGHT - bottom, top);
+    const stepPath = (row) => row.map((count, b) =>
+      `${b === 0 ? "M" : "L"}${x(edges[b])},${y(count)} L${x(edges[b + 1])},${y(count)}`).join(" ");
+    return (
+      <div className="chart-scroll">
+        <svg width={width} height={CHART_HEIGHT} viewBox={`0 0 ${width} ${CHART_HEIGHT}`}>
+          {axisTicks(0, maxCount * 1.05).map((tick, i) => (
+            <g key={i}>
+              <line x1={left} x2={width - right} y1={y(tick)} y2={y(tick)} stroke="#e2e8f0" />
+              <text x={left - 6} y={y(tick)} textAnchor="end" dominantBaseline="middle" fontSize="11" fill="#64748b">
+                {Math.round(tick)}
+              </text>
+            </g>
+          ))}
+          {axisTicks(edges[0], edges[edges.length - 1]).map((tick, i) => (
+            <text key={i} x={x(tick)} y={CHART_HEIGHT - bottom + 16} textAnchor="middle" fontSize="11" fill="#64748b">
+              {formatTick(tick)}
+            </text>
+          ))}
+          {counts.map((row, i) => (
+            <path key={i} d={stepPath(row)} fill="none" stroke={CHART_COLORS[i % CHART_COLORS.length]} strokeWidth="2">
+              <title>{labels[i]}</title>
+            </path>
+          ))}
+          {labels.map((label, i) => (
+            <g key={i} transform={`translate(${left + (i % 4) * 140} ${CHART_HEIGHT - bottom + 40 + Math.floor(i / 4) * 16})`}>
+              <rect width="10" height="10" y="-5" fill={CHART_COLORS[i % CHART_COLORS.length]} />
+              <text x="14" dominantBaseline="middle" fontSize="11" fill="#475569">{label}</text>
+            </g>
+          ))}
+        </svg>
+      </div>
+    );
+  }
+
+  const rowHeight = 12;
+  const height = top + labels.length * rowHeight + 40;
+  return (
+    <div className="chart-scroll">
+      <svg width={width} height={height} viewBox={`0 0 ${width} ${height}`}>
+        {counts.map((row, i) => row.map((count, b) => (
+          <rect key={`${i}-${b}`} x={x(edges[b])} y={top + i * rowHeight} width={x(edges[b + 1]) - x(edges[b])}
+            height={rowHeight} fill={mixColor([22, 119, 255], count / maxCount)}>
+            <title>{`${labels[i]}  [${edges[b]}, ${edges[b + 1]}): ${count}`}</title>
+          </rect>
+        )))}
+        {labels.map((label, i) => (
+          <text key={i} x={left - 6} y={top + (i + 0.5) * rowHeight} textAnchor="end" dominantBaseline="middle"
+            fontSize="9" fill="#475569">{label}</text>
+        ))}
+        {axisTicks(edges[0], edges[edges.length - 1]).map((tick, i) => (
+          <text key={i} x={x(tick)} y={top + labels.length * rowHeight + 16} textAnchor="middle" fontSize="11" fill="#64748b">
+            {formatTick(tick)}
+          </text>
+        ))}
+      </svg>
+    </div>
+  );
+}
+
+// 相关性热力图，悬停显示相关系数；模型较少时在格子中标注数值
+function CorrelationHeatmap({ chartData, labels }) {
+  const { correlation } = chartData;
+  const count = labels.length;
+  const cell = Math.max(12, Math.min(48, Math.floor(560 / Math.max(count, 1))));
+  const left = 140;
+  const top = 16;
+  const size = cell * count;
+  const annotate = count <= CHART_ANNOTATION_MAX_MODELS;
+  return (
+    <div className="chart-scroll">
+      <svg width={left + size + 16} height={top + size + 120} viewBox={`0 0 ${left + size + 16} ${top + size + 120}`}>
+        {correlation.map((row, i) => row.map((value, j) => (
+          <g key={`${i}-${j}`}>
+            <rect x={left + j * cell} y={top + i * cell} width={cell} height={cell} fill={correlationColor(value)} stroke="#ffffff">
+              <title>{`${labels[i]} × ${labels[j]}: ${value === null ? "无法计算" : value.toFixed(4)}`}</title>
+            </rect>
+            {annotate && value !== null && (
+              <text x={left + (j + 0.5) * cell} y={top + (i + 0.5) * cell} textAnchor="middle" dominantBaseline="middle"
+                fontSize={Math.min(11, cell / 3)} fill={Math.abs(value) > 0.6 ? "#ffffff" : "#1e293b"} pointerEvents="none">
+                {value.toFixed(2)}
+              </text>
+            )}
+          </g>
+        )))}
+        {labels.map((label, i) => (
+          <g key={i}>
+            <text x={left - 6} y={top + (i + 0.5) * cell} textAnchor="end" dominantBaseline="middle"
+              fontSize={annotate ? 11 : 9} fill="#475569">{label}</text>
+            <text transform={`translate(${left + (i + 0.5) * cell} ${top + size + 8}) rotate(-90)`} textAnchor="end"
+              dominantBaseline="middle" fontSize={annotate ? 11 : 9} fill="#475569">{label}</text>
+          </g>
+        ))}
+      </svg>
+    </div>
+  );
+}
+
 function App() {
+  const [datasetId, setDatasetId] = useState(null); // 上传返回的数据集 ID
   const [columns, setColumns] = useState([]);
   const [numericColumns, setNumericColumns] = useState([]);
   const [baselineColumn, setBaselineColumn] = useState("");
   const [dataColumns, setDataColumns] = useState([]);
   const [analysisResult, setAnalysisResult] = useState(null);
+  const [chartData, setChartData] = useState(null); // /api/charts 返回的绘图汇总数据
   const [fileName, setFileName] = useState("未选择文件");
   const [uploading, setUploading] = useState(false);
   const [analyzing, setAnalyzing] = useState(false);
+  const [analysisProgress, setAnalysisProgress] = useState(0);
   const [showRawData, setShowRawData] = useState(false);
   const [columnAliases, setColumnAliases] = useState({}); // 存储列别名
 
@@ -23,6 +268,8 @@ function App() {
     const pairwiseComparison = analysisResult.pairwiseComparison || [];
     const baselineComparison = analysisResult.baselineComparison || [];
     const bestModel = analysisResult.bestModel || null;
+    // 指定了多重比较校正时，显示所选方法校正后的 p 值
+    const adjustedColumn = dataOverview.correction?.column;
 
     const html = `<!DOCTYPE html>
 <html lang="zh-CN">
@@ -262,6 +509,7 @@ function App() {
                         <th>均值差异</th>
                         <th>检验统计量</th>
                         <th>p值</th>
+                        ${adjustedColumn ? '<th>校正后p值</th>' : ''}
                         <th>是否显著</th>
                     </tr>
                 </thead>
@@ -275,6 +523,7 @@ function App() {
                         <td>${(comp['均值差异'] ?? comp.mean_diff)?.toFixed(4)}</td>
                         <td>${(comp['检验统计量'] ?? comp.statistic)?.toFixed(4)}</td>
                         <td>${(comp['p值'] ?? comp.p_value)?.toFixed(6)}</td>
+                        ${adjustedColumn ? `<td>${comp[adjustedColumn]?.toFixed(6)}</td>` : ''}
                         <td class="${(comp['是否显著'] ?? comp.significant) ? 'significant' : 'not-significant'}">
                             ${(comp['是否显著'] ?? comp.significant) ? '✅ 是' : '❌ 否'}
                         </td>
@@ -314,6 +563,7 @@ function App() {
                         <th>均值差异</th>
                         <th>统计量</th>
                         <th>p值</th>
+                        ${adjustedColumn ? '<th>校正后p值</th>' : ''}
                         <th>是否显著</th>
                         <th>优于基线</th>
                     </tr>
@@ -327,6 +577,7 @@ function App() {
                         <td>${(comp['均值差异'] ?? comp.mean_diff)?.toFixed(4)}</td>
                         <td>${(comp['检验统计量'] ?? comp.statistic)?.toFixed(4)}</td>
                         <td>${(comp['p值'] ?? comp.p_value)?.toFixed(6)}</td>
+                        ${adjustedColumn ? `<td>${comp[adjustedColumn]?.toFixed(6)}</td>` : ''}
                         <td class="${(comp['是否显著'] ?? comp.significant) ? 'significant' : 'not-significant'}">
                             ${(comp['是否显著'] ?? comp.significant) ? '✅ 是' : '❌ 否'}
                         </td>
@@ -433,6 +684,8 @@ function App() {
     const pairwiseComparison = analysisResult.pairwiseComparison || [];
     const baselineComparison = analysisResult.baselineComparison || [];
     const bestModel = analysisResult.bestModel || null;
+    // 指定了多重比较校正时，显示所选方法校正后的 p 值
+    const adjustedColumn = dataOverview.correction?.column;
 
     return (
       <div className="result-card">
@@ -508,6 +761,36 @@ function App() {
           </div>
         )}
 
+        {/* 可视化图表（由 /api/charts 的汇总数据在浏览器中绘制） */}
+        {chartData && chartData.models && (
+          <div className="result-section">
+            <h3><span className="emoji">📉</span> 可视化图表</h3>
+            {(() => {
+              const labels = chartData.models.map(getDisplayName);
+              return (
+                <div className="chart-grid">
+                  <div className="chart-card">
+                    <h4>模型得分分布箱线图</h4>
+                    <BoxPlotChart chartData={chartData} labels={labels} />
+                  </div>
+                  <div className="chart-card">
+                    <h4>模型得分分布直方图</h4>
+                    <HistogramChart chartData={chartData} labels={labels} />
+                  </div>
+                  <div className="chart-card">
+                    <h4>模型平均得分对比</h4>
+                    <MeansChart chartData={chartData} labels={labels} />
+                  </div>
+                  <div className="chart-card">
+                    <h4>模型得分相关性热力图</h4>
+                    <CorrelationHeatmap chartData={chartData} labels={labels} />
+                  </div>
+                </div>
+              );
+            })()}
+          </div>
+        )}
+
         {/* 两两对比 */}
         {pairwiseComparison && pairwiseComparison.length > 0 && (
           <div className="result-section">
@@ -522,6 +805,7 @@ function App() {
                   <th>均值差异</th>
                   <th>检验统计量</th>
                   <th>p值</th>
+                  {adjustedColumn && <th>校正后p值</th>}
                   <th>是否显著</th>
                 </tr>
               </thead>
@@ -535,6 +819,7 @@ function App() {
                     <td>{(comp['均值差异'] ?? comp.mean_diff)?.toFixed(4)}</td>
                     <td>{(comp['检验统计量'] ?? comp.statistic)?.toFixed(4)}</td>
                     <td>{(comp['p值'] ?? comp.p_value)?.toFixed(6)}</td>
+                    {adjustedColumn && <td>{comp[adjustedColumn]?.toFixed(6)}</td>}
                     <td className={(comp['是否显著'] ?? comp.significant) ? "significant" : "not-significant"}>
                       {(comp['是否显著'] ?? comp.significant) ? "✅ 是" : "❌ 否"}
                     </td>
@@ -580,6 +865,7 @@ function App() {
                   <th>均值差异</th>
                   <th>统计量</th>
                   <th>p值</th>
+                  {adjustedColumn && <th>校正后p值</th>}
                   <th>是否显著</th>
                   <th>优于基线</th>
                 </tr>
@@ -593,6 +879,7 @@ function App() {
                     <td>{(comp['均值差异'] ?? comp.mean_diff)?.toFixed(4)}</td>
                     <td>{(comp['检验统计量'] ?? comp.statistic)?.toFixed(4)}</td>
                     <td>{(comp['p值'] ?? comp.p_value)?.toFixed(6)}</td>
+                    {adjustedColumn && <td>{comp[adjustedColumn]?.toFixed(6)}</td>}
                     <td className={(comp['是否显著'] ?? comp.significant) ? "significant" : "not-significant"}>
                       {(comp['是否显著'] ?? comp.significant) ? "✅ 是" : "❌ 否"}
                     </td>
@@ -676,6 +963,7 @@ function App() {
     setFileName(file.name);
     setUploading(true);
     setAnalysisResult(null);
+    setChartData(null);
 
     try {
       // 使用 FormData 上传文件到后端
@@ -694,7 +982,8 @@ function App() {
 
       const result = await response.json();
       
-      // 设置列信息（包括数值列）
+      // 设置数据集 ID 和列信息（包括数值列）
+      setDatasetId(result.datasetId);
       setColumns(result.columns || []);
       setNumericColumns(result.numeric_columns || []);
       setBaselineColumn("");
@@ -706,6 +995,7 @@ function App() {
     } catch (error) {
       console.error("上传文件出错:", error);
       alert(`上传文件失败: ${error.message}`);
+      setDatasetId(null);
       setColumns([]);
     } finally {
       setUploading(false);
@@ -720,12 +1010,14 @@ function App() {
 
     setAnalyzing(true);
     setAnalysisResult(null);
+    setChartData(null);
 
     try {
       const response = await fetch("/api/analyze", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
+          datasetId: datasetId,
           baseline: baselineColumn,
           dataColumns: dataColumns,
           testType: "wilcoxon",
@@ -738,14 +1030,60 @@ function App() {
         throw new Error(errorData.error || `请求失败: ${response.status}`);
       }
 
-      const result = await response.json();
+      // 分析在后台执行，轮询任务状态直至完成
+      const { jobId } = await response.json();
+      const result = await pollAnalysisJob(jobId);
       setAnalysisResult(result);
       console.log("分析结果:", result);
+      loadChartData();
     } catch (error) {
       console.error("分析出错:", error);
       setAnalysisResult({ error: error.message });
     } finally {
       setAnalyzing(false);
+      setAnalysisProgress(0);
+    }
+  };
+
+  // 获取绘图汇总数据（与分析使用相同的列），失败时只是不显示图表
+  const loadChartData = async () => {
+    try {
+      const response = await fetch("/api/charts", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({
+          datasetId: datasetId,
+          baseline: baselineColumn,
+          dataColumns: dataColumns
+        }),
+      });
+      const result = await response.json();
+      if (!response.ok) {
+        throw new Error(result.error || `请求失败: ${response.status}`);
+      }
+      setChartData(result);
+    } catch (error) {
+      console.warn("获取图表数据失败:", error);
+    }
+  };
+
+  const pollAnalysisJob = async (jobId) => {
+    while (true) {
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+
+      const response = await fetch(`/api/jobs/${jobId}`);
+      const job = await response.json();
+      if (!response.ok) {
+        throw new Error(job.error || `请求失败: ${response.status}`);
+      }
+
+      if (job.state === "completed") {
+        return job.result;
+      }
+      if (job.state === "failed") {
+        throw new Error(job.error || "分析失败");
+      }
+      setAnalysisProgress(job.progress || 0);
     }
   };
 
@@ -841,7 +1179,7 @@ function App() {
                 onClick={handleRunAnalysis}
                 disabled={!baselineColumn || dataColumns.length === 0 || analyzing}
               >
-                {analyzing ? "分析中..." : "运行分析"}
+                {analyzing ? `分析中... ${Math.round(analysisProgress)}%` : "运行分析"}
               </button>
             </div>
           </>